@@ -0,0 +1,111 @@
+# =====================================================================
+# analysis_memo.py — Résultats de SignalAnalyzer mémoïsés par bougie
+# =====================================================================
+# Tant que ni la bougie H1 ni la bougie H4 n'ont changé, les gates CPU
+# (structure, momentum, sorties, RR) redonnent exactement le même
+# résultat : on le garde, motif de rejet compris.
+#
+#   - clé    : (symbole, ts + dernière ligne H1, ts + dernière ligne H4,
+#               empreinte des settings / paramètres de l'analyzer)
+#     → en mode bougies clôturées la clé ne change qu'à la clôture ;
+#       sinon chaque tick de la bougie ouverte donne une nouvelle clé.
+#   - valeur : résultat des gates CPU + institutionnel éventuel
+#   - l'institutionnel (OI, funding, CVD, liquidations) bouge sans
+#     nouvelle bougie : il a sa propre expiration (INST_MEMO_TTL_S) et
+#     est ré-interrogé seul quand il est périmé.
+#   - LRU borné (ANALYSIS_MEMO_SIZE)
+# =====================================================================
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+import settings
+from feature_context import frame_key
+
+# jamais dans l'empreinte (et jamais loggés)
+_SECRET_MARKERS = ("KEY", "SECRET", "PASSPHRASE", "TOKEN", "CHAT_ID")
+
+
+def settings_digest(*extra: Any) -> str:
+    """Empreinte des settings publics (+ paramètres passés en `extra`)."""
+    items = sorted(
+        (k, repr(v))
+        for k, v in vars(settings).items()
+        if k.isupper() and not any(m in k for m in _SECRET_MARKERS)
+    )
+    return hashlib.sha1(repr((items, extra)).encode()).hexdigest()[:16]
+
+
+class AnalysisMemo:
+    """LRU symbole → (clé de bougies, {"res", "inst", "inst_ts"})."""
+
+    def __init__(self, max_entries: int = 1024, inst_ttl_s: float = 300.0):
+        self.max_entries = max(int(max_entries), 1)
+        self.inst_ttl_s = float(inst_ttl_s)
+        self._entries: "OrderedDict[str, Tuple[Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.inst_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(symbol: str, df_h1: pd.DataFrame, df_h4: pd.DataFrame, digest: str) -> Tuple:
+        return (symbol, frame_key(df_h1), frame_key(df_h4), digest)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            slot = self._entries.get(key[0])
+            if slot is None or slot[0] != key:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key[0])
+            self.hits += 1
+            return slot[1]
+
+    def put(self, key: Tuple, res: Dict[str, Any]) -> Dict[str, Any]:
+        """Remplace l'entrée du symbole (l'ancienne bougie ne reviendra pas)."""
+        entry = {"res": res, "inst": None, "inst_ts": None}
+        with self._lock:
+            self._entries[key[0]] = (key, entry)
+            self._entries.move_to_end(key[0])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def fresh_inst(self, entry: Dict[str, Any], now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Institutionnel mémorisé s'il n'a pas expiré, sinon None."""
+        if entry.get("inst") is None or entry.get("inst_ts") is None:
+            return None
+        now = time.monotonic() if now is None else now
+        if now - entry["inst_ts"] > self.inst_ttl_s:
+            return None
+        self.inst_hits += 1
+        return entry["inst"]
+
+    def store_inst(self, entry: Dict[str, Any], inst: Dict[str, Any], now: Optional[float] = None) -> None:
+        entry["inst"] = inst
+        entry["inst_ts"] = time.monotonic() if now is None else now
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "inst_hits": self.inst_hits,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,156 @@
+# =====================================================================
+# analysis_worker.py — Analyse CPU hors de l'event loop
+# =====================================================================
+# structure / BOS / momentum / stops / TP sont du pandas synchrone : sur
+# l'event loop ils bloquent toutes les réponses HTTP en attente.
+#
+# ANALYSIS_EXECUTOR :
+#   - inline  : comportement historique (pas d'executor)
+#   - thread  : ThreadPoolExecutor, DataFrames et contextes partagés
+#   - process : ProcessPoolExecutor, payload numpy compact
+#               (colonnes + matrice float64) au lieu de DataFrames picklés
+#
+# Le worker exécute toutes les gates CPU (dans l'ordre fourni par le
+# GateModel) ; seul l'institutionnel (réseau) reste sur l'event loop.
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analyze_signal import run_analysis
+from settings import ANALYSIS_EXECUTOR, ANALYSIS_WORKERS
+
+LOGGER = logging.getLogger(__name__)
+
+Payload = Tuple[Tuple[str, ...], np.ndarray]
+
+
+# =====================================================================
+# PAYLOAD NUMPY
+# =====================================================================
+
+def frame_to_payload(df: pd.DataFrame) -> Payload:
+    """DataFrame → (colonnes numériques, matrice float64 contiguë)."""
+    cols = tuple(c for c in df.columns if np.issubdtype(df[c].dtype, np.number))
+    return cols, np.ascontiguousarray(df[list(cols)].to_numpy(dtype=float))
+
+
+def payload_to_frame(payload: Payload) -> pd.DataFrame:
+    cols, arr = payload
+    return pd.DataFrame(arr, columns=list(cols))
+
+
+def _analyze_payload(
+    symbol: str,
+    h1: Payload,
+    h4: Payload,
+    rr_min_inst: float,
+    order: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Point d'entrée exécuté dans le process worker."""
+    return run_analysis(
+        symbol,
+        payload_to_frame(h1),
+        payload_to_frame(h4),
+        rr_min_inst,
+        order=order,
+    )
+
+
+# =====================================================================
+# EXECUTOR
+# =====================================================================
+
+class AnalysisExecutor:
+    """
+    Exécute run_analysis dans un pool (thread ou process).
+
+    `run` a la même sortie que analyze_signal.run_analysis.
+    """
+
+    def __init__(self, mode: str = ANALYSIS_EXECUTOR, workers: int = ANALYSIS_WORKERS):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"unsupported analysis executor: {mode}")
+        self.mode = mode
+        self.workers = int(workers) if int(workers) > 0 else (os.cpu_count() or 1)
+        self._pool: Optional[Executor] = None
+        self.submitted = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+            LOGGER.info("🧵 Analysis executor: %s x%d", self.mode, self.workers)
+        return self._pool
+
+    async def run(
+        self,
+        symbol: str,
+        df_h1: pd.DataFrame,
+        df_h4: pd.DataFrame,
+        rr_min_inst: float,
+        ctx_h1=None,
+        ctx_h4=None,
+        order: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        self.submitted += 1
+
+        if self.mode == "process":
+            # contextes non transmis : le worker recalcule (et garde son propre LRU)
+            return await loop.run_in_executor(
+                pool,
+                _analyze_payload,
+                symbol,
+                frame_to_payload(df_h1),
+                frame_to_payload(df_h4),
+                float(rr_min_inst),
+                tuple(order) if order is not None else None,
+            )
+
+        return await loop.run_in_executor(
+            pool,
+            lambda: run_analysis(symbol, df_h1, df_h4, rr_min_inst, ctx_h1, ctx_h4, order=order),
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# =====================================================================
+# SINGLETON
+# =====================================================================
+
+_executor: Optional[AnalysisExecutor] = None
+
+
+def get_analysis_executor() -> Optional[AnalysisExecutor]:
+    """Executor configuré, ou None en mode inline."""
+    global _executor
+    if ANALYSIS_EXECUTOR not in ("thread", "process"):
+        if ANALYSIS_EXECUTOR != "inline":
+            LOGGER.warning("⚠️ ANALYSIS_EXECUTOR=%s inconnu → inline", ANALYSIS_EXECUTOR)
+        return None
+    if _executor is None:
+        _executor = AnalysisExecutor()
+    return _executor
+
+
+def shutdown_analysis_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
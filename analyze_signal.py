@@ -6,10 +6,13 @@
 import logging
 import pandas as pd
 import math
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Sequence, Tuple
 
 from structure_utils import (
+    _trend,
     analyze_structure,
+    find_swings,
     htf_trend_ok,
     bos_quality_details,
     commitment_score,
@@ -24,12 +27,28 @@ from indicators import (
     volatility_regime,
     extension_signal,
     composite_momentum,
+    true_atr,
 )
 
 from stops import protective_stop_long, protective_stop_short
 from tp_clamp import compute_tp1
+from feature_context import get_feature_context
+from coarse_screen import PhaseCounters
+from gate_order import DEFAULT_GATE_ORDER, LEAD_GATES, GateModel
 
 from institutional_data import compute_full_institutional_analysis
+from analysis_memo import AnalysisMemo, settings_digest
+from settings import (
+    NEAR_TRIGGER_ATR,
+    GATE_ORDER_ADAPTIVE,
+    GATE_EWMA_ALPHA,
+    ANALYSIS_MEMO_ENABLED,
+    ANALYSIS_MEMO_SIZE,
+    INST_MEMO_TTL_S,
+    RR_MIN_INST,
+    STOP_ATR_BUFFER,
+    OB_IMPULSE_PCT,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -72,16 +91,216 @@ def _safe_rr(entry: float, sl: float, tp1: float, bias: str) -> Optional[float]:
         return None
 
 
-def _compute_exits(df, entry, bias, tick):
+def _compute_exits(df, entry, bias, tick, ctx=None, atr_buffer=0.2):
     if bias == "LONG":
-        sl, meta = protective_stop_long(df, entry, tick, return_meta=True)
+        sl, meta = protective_stop_long(df, entry, tick, return_meta=True, ctx=ctx, atr_buffer=atr_buffer)
     else:
-        sl, meta = protective_stop_short(df, entry, tick, return_meta=True)
+        sl, meta = protective_stop_short(df, entry, tick, return_meta=True, ctx=ctx, atr_buffer=atr_buffer)
 
-    tp1, rr_used = compute_tp1(entry, sl, bias, df=df, tick=tick)
+    tp1, rr_used = compute_tp1(entry, sl, bias, df=df, tick=tick, ctx=ctx)
     return {"sl": sl, "tp1": tp1, "rr_used": rr_used, "sl_meta": meta}
 
 
+def _trigger_distance(struct, bias, entry, df, ctx=None) -> Optional[float]:
+    """Distance (en ATR) entre le prix et le swing dont la cassure ferait le BOS."""
+    swings = struct.get("swings") or {}
+    pts = swings.get("highs" if bias == "LONG" else "lows") or []
+    if not pts:
+        return None
+    try:
+        atr_val = float(true_atr(df, length=14, ctx=ctx).iloc[-1])
+    except Exception:
+        return None
+    if not math.isfinite(atr_val) or atr_val <= 0:
+        return None
+    return abs(float(entry) - float(pts[-1][1])) / atr_val
+
+
+# =====================================================================
+# GATES CPU (pures, exécutables hors event loop)
+# =====================================================================
+# Aucune I/O ni log ici : chaque gate lit les entrées `inp`, écrit ses
+# valeurs dans `out` et renvoie un motif de rejet (ou None).
+# La décision est le ET de toutes les gates : leur ordre (gate_order)
+# ne change que le coût d'un rejet. L'institutionnel (réseau) n'est
+# interrogé par SignalAnalyzer qu'une fois toutes les gates CPU passées.
+
+
+def _gate_trend(inp, out) -> Optional[str]:
+    """1 — tendance H1 (même règle que analyze_structure()["trend"])."""
+    df_h1 = inp["df_h1"]
+    trend = "RANGE" if len(df_h1) < 30 else _trend(df_h1, inp["ctx_h1"])
+    out["bias"] = trend.upper()
+    if out["bias"] not in ("LONG", "SHORT"):
+        return "No clear trend (RANGE)"
+    return None
+
+
+def _gate_htf(inp, out) -> Optional[str]:
+    """2 — alignement HTF."""
+    out["htf_ok"] = htf_trend_ok(inp["df_h4"], out["bias"], ctx=inp["ctx_h4"])
+    return None if out["htf_ok"] else "HTF trend veto"
+
+
+def _gate_bos(inp, out) -> Optional[str]:
+    """3 — structure complète, qualité du BOS / liquidité / commitment."""
+    df_h1, ctx_h1 = inp["df_h1"], inp["ctx_h1"]
+    struct = analyze_structure(df_h1, ctx=ctx_h1, ob_impulse_pct=inp["params"]["ob_impulse_pct"])
+    oi_series = struct.get("oi_series", None)
+    bos_q = bos_quality_details(df_h1, oi_series=oi_series, df_liq=df_h1, price=out["entry"], ctx=ctx_h1)
+    out["struct"] = struct
+    out["bos_q"] = bos_q
+
+    if not struct.get("bos", False) or not bos_q.get("ok", False):
+        return "BOS invalid or weak"
+    return None
+
+
+def _gate_momentum(inp, out) -> Optional[str]:
+    """5 — momentum directionnel."""
+    mom = institutional_momentum(inp["df_h1"], ctx=inp["ctx_h1"])
+    out["mom"] = mom
+    bias = out["bias"]
+    if bias == "LONG" and mom not in ("BULLISH", "STRONG_BULLISH"):
+        return "Momentum not bullish for LONG"
+    if bias == "SHORT" and mom not in ("BEARISH", "STRONG_BEARISH"):
+        return "Momentum not bearish for SHORT"
+    return None
+
+
+def _gate_extension(inp, out) -> Optional[str]:
+    """Filtre d'extension : évite d'entrer dans un move déjà trop étendu."""
+    ext_sig = extension_signal(inp["df_h1"], ctx=inp["ctx_h1"])
+    out["ext_sig"] = ext_sig
+    bias = out["bias"]
+    if ext_sig == "OVEREXTENDED_LONG" and bias == "LONG":
+        return "Extension signal OVEREXTENDED_LONG for LONG bias"
+    if ext_sig == "OVEREXTENDED_SHORT" and bias == "SHORT":
+        return "Extension signal OVEREXTENDED_SHORT for SHORT bias"
+    return None
+
+
+def dynamic_rr_min(rr_min_inst: float, vol_regime: str, comp_score: float) -> float:
+    """RR minimum exigé selon le régime de volatilité et le momentum composite."""
+    rr_min = float(rr_min_inst)
+
+    if vol_regime == "HIGH":
+        # marché nerveux : on exige un RR un peu meilleur
+        rr_min = max(rr_min, 1.6)
+    elif vol_regime == "LOW" and comp_score >= 70:
+        # marché calme mais momentum fort : on tolère un RR légèrement plus faible
+        rr_min = max(rr_min - 0.1, 1.1)
+
+    # si le momentum composite est faible, on demande plus de RR
+    if comp_score <= 40:
+        rr_min = max(rr_min, 1.5)
+    return rr_min
+
+
+def _gate_rr(inp, out) -> Optional[str]:
+    """6-7 — premium / discount, SL / TP et RR dynamique."""
+    df_h1, ctx_h1 = inp["df_h1"], inp["ctx_h1"]
+    entry, bias = out["entry"], out["bias"]
+
+    comp = composite_momentum(df_h1, ctx=ctx_h1)
+    vol_regime = volatility_regime(df_h1, ctx=ctx_h1)
+    out["comp"] = comp
+    out["vol_regime"] = vol_regime
+
+    discount, premium = compute_premium_discount(df_h1)
+    out["discount"] = discount
+    out["premium"] = premium
+
+    exits = _compute_exits(df_h1, entry, bias, tick=0.1, ctx=ctx_h1, atr_buffer=inp["params"]["atr_buffer"])
+    rr = _safe_rr(entry, exits["sl"], exits["tp1"], bias)
+    out["exits"] = exits
+    out["rr"] = rr
+
+    # Seuil RR dynamique en fonction du régime de volatilité et du momentum composite
+    comp_score = float(comp.get("score", 50.0)) if isinstance(comp, dict) else 50.0
+    rr_min = dynamic_rr_min(inp["rr_min_inst"], vol_regime, comp_score)
+
+    out["rr_min"] = rr_min
+    out["comp_score"] = comp_score
+
+    if rr is None or rr < rr_min:
+        return "RR < dynamic minimum"
+    return None
+
+
+CPU_GATES = {
+    "trend": _gate_trend,
+    "htf": _gate_htf,
+    "bos": _gate_bos,
+    "momentum": _gate_momentum,
+    "extension": _gate_extension,
+    "rr": _gate_rr,
+}
+
+
+def run_analysis(
+    symbol,
+    df_h1,
+    df_h4,
+    rr_min_inst,
+    ctx_h1=None,
+    ctx_h4=None,
+    order: Optional[Sequence[str]] = None,
+    params: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Tendance H1 puis les gates CPU dans `order` (ordre historique par
+    défaut), arrêt au premier rejet.
+
+    `params` surcharge les seuils des gates (optimizer) : "atr_buffer"
+    (STOP_ATR_BUFFER), "ob_impulse_pct" (OB_IMPULSE_PCT).
+
+    Renvoie les valeurs calculées + "reject" / "gate" (motif et gate
+    fatale, None si tout passe) + "timings" {gate: secondes}.
+    """
+    # swings / ATR / EMA calculés une fois et partagés par tous les modules
+    # (contextes éventuellement pré-remplis par le panel du scanner)
+    if ctx_h1 is None:
+        ctx_h1 = get_feature_context(df_h1, symbol, "1H")
+    if ctx_h4 is None:
+        ctx_h4 = get_feature_context(df_h4, symbol, "4H")
+
+    inp = {
+        "df_h1": df_h1,
+        "df_h4": df_h4,
+        "ctx_h1": ctx_h1,
+        "ctx_h4": ctx_h4,
+        "rr_min_inst": rr_min_inst,
+        "params": {"atr_buffer": STOP_ATR_BUFFER, "ob_impulse_pct": OB_IMPULSE_PCT, **(params or {})},
+    }
+    out: Dict[str, Any] = {
+        "entry": float(df_h1["close"].iloc[-1]),
+        "bias": "",
+        "reject": None,
+        "gate": None,
+        "timings": {},
+    }
+
+    for name in LEAD_GATES + tuple(order or DEFAULT_GATE_ORDER):
+        t0 = time.perf_counter()
+        reject = CPU_GATES[name](inp, out)
+        out["timings"][name] = time.perf_counter() - t0
+        if reject:
+            out["reject"] = reject
+            out["gate"] = name
+            break
+
+    # proximité du niveau de déclenchement (re-check intra-bougie) :
+    # renseignée dès que tendance + HTF passent, quel que soit l'ordre
+    bias = out["bias"]
+    if bias in ("LONG", "SHORT"):
+        htf_ok = out["htf_ok"] if "htf_ok" in out else htf_trend_ok(df_h4, bias, ctx=ctx_h4)
+        if htf_ok:
+            struct = out.get("struct") or {"swings": find_swings(df_h1, ctx=ctx_h1)}
+            out["trigger_dist"] = _trigger_distance(struct, bias, out["entry"], df_h1, ctx_h1)
+    return out
+
+
 # =====================================================================
 # CLASS ANALYZER AVEC LOGGAGE COMPLET
 # =====================================================================
@@ -89,116 +308,121 @@ def _compute_exits(df, entry, bias, tick):
 
 class SignalAnalyzer:
 
-    def __init__(self, api_key, api_secret, api_passphrase):
-        self.rr_min_inst = 1.3
+    def __init__(self, api_key, api_secret, api_passphrase, executor=None):
+        self.rr_min_inst = RR_MIN_INST
+        # analysis_worker.AnalysisExecutor (thread / process) ou None = inline
+        self.executor = executor
+        # symboles proches d'un déclenchement → distance en ATR
+        self.watchlist: Dict[str, float] = {}
+        # taux de passage par phase (cpu_gates / institutional)
+        self.phase_stats = PhaseCounters()
+        # coût / taux de rejet par gate → ordre d'évaluation
+        self.gates = GateModel(alpha=GATE_EWMA_ALPHA, adaptive=GATE_ORDER_ADAPTIVE)
+        # résultat par (symbole, bougies H1 / H4, settings) ; institutionnel à part
+        self.memo: Optional[AnalysisMemo] = (
+            AnalysisMemo(ANALYSIS_MEMO_SIZE, INST_MEMO_TTL_S) if ANALYSIS_MEMO_ENABLED else None
+        )
+        self._digest: Optional[Tuple[float, str]] = None
+
+    def _settings_digest(self) -> str:
+        # recalculé si rr_min_inst est modifié à chaud
+        if self._digest is None or self._digest[0] != self.rr_min_inst:
+            self._digest = (self.rr_min_inst, settings_digest(self.rr_min_inst))
+        return self._digest[1]
+
+    def _track_trigger(self, symbol, res) -> None:
+        dist = res.get("trigger_dist")
+        if dist is not None and dist <= float(NEAR_TRIGGER_ATR):
+            self.watchlist[symbol] = dist
+        else:
+            self.watchlist.pop(symbol, None)
 
-    async def analyze(self, symbol, df_h1, df_h4, macro=None):
+    async def analyze(self, symbol, df_h1, df_h4, macro=None, ctx_h1=None, ctx_h4=None):
         LOGGER.info(f"[EVAL] ▶ START {symbol}")
 
-        entry = float(df_h1["close"].iloc[-1])
-
-        # 1 — STRUCTURE
-        struct = analyze_structure(df_h1)
-        bias = struct.get("trend", "").upper()
-        LOGGER.info(f"[EVAL_PRE] STRUCT={struct}")
-
-        if bias not in ("LONG", "SHORT"):
-            LOGGER.info("[EVAL_REJECT] No clear trend (RANGE)")
-            return None
-
-        # 2 — HTF ALIGNEMENT
-        if not htf_trend_ok(df_h4, bias):
-            LOGGER.info("[EVAL_REJECT] HTF trend veto")
-            return None
-
-        # 3 — BOS QUALITY / LIQUIDITY / COMMITMENT
-        bos_flag = struct.get("bos", False)
-        bos_dir = struct.get("bos_direction", None)
-        bos_type = struct.get("bos_type", None)
-        oi_series = struct.get("oi_series", None)
-
-        bos_q = bos_quality_details(df_h1, oi_series=oi_series, df_liq=df_h1, price=entry)
-        LOGGER.info(f"[EVAL_PRE] BOS_QUALITY={bos_q} bos_flag={bos_flag} bos_type={bos_type}")
+        # bougies H1 / H4 inchangées → même résultat qu'au cycle précédent
+        memo_entry = None
+        if self.memo is not None:
+            memo_key = AnalysisMemo.key(symbol, df_h1, df_h4, self._settings_digest())
+            memo_entry = self.memo.get(memo_key)
 
-        if not bos_flag or not bos_q.get("ok", False):
-            LOGGER.info("[EVAL_REJECT] BOS invalid or weak")
+        if memo_entry is not None:
+            res = memo_entry["res"]
+            LOGGER.info(f"[EVAL] ♻️ MEMO {symbol} (bougies inchangées)")
+        else:
+            # 1-3, 5-7 — gates CPU dans l'ordre coût / rejet (hors event loop si executor)
+            order = self.gates.order()
+            if self.executor is not None:
+                res = await self.executor.run(symbol, df_h1, df_h4, self.rr_min_inst, ctx_h1, ctx_h4, order=order)
+            else:
+                res = run_analysis(symbol, df_h1, df_h4, self.rr_min_inst, ctx_h1, ctx_h4, order=order)
+            self.gates.record_timings(res["timings"], res["gate"])
+            if self.memo is not None:
+                memo_entry = self.memo.put(memo_key, res)
+
+        self._track_trigger(symbol, res)
+        entry = res["entry"]
+        bias = res["bias"]
+
+        struct = res.get("struct")
+        bos_q = res.get("bos_q")
+        if struct is not None:
+            LOGGER.info(f"[EVAL_PRE] STRUCT={struct}")
+            LOGGER.info(
+                f"[EVAL_PRE] BOS_QUALITY={bos_q} bos_flag={struct.get('bos', False)} "
+                f"bos_type={struct.get('bos_type', None)}"
+            )
+
+        if "mom" in res:
+            LOGGER.info(f"[EVAL_PRE] MOMENTUM={res['mom']}")
+        if "comp" in res:
+            comp = res["comp"]
+            LOGGER.info(
+                f"[EVAL_PRE] MOMENTUM_COMPOSITE score={comp.get('score')} "
+                f"label={comp.get('label')} components={comp.get('components')}"
+            )
+        if "ext_sig" in res or "vol_regime" in res:
+            LOGGER.info(f"[EVAL_PRE] VOL_REGIME={res.get('vol_regime')} EXTENSION={res.get('ext_sig')}")
+
+        if "exits" in res:
+            exits = res["exits"]
+            rr = res["rr"]
+            LOGGER.info(f"[EVAL_PRE] PREMIUM={res['premium']} DISCOUNT={res['discount']}")
+            LOGGER.info(
+                f"[EVAL_PRE] RR={rr} raw_rr={exits['rr_used']} sl={exits['sl']} tp1={exits['tp1']}"
+            )
+            LOGGER.info(
+                f"[EVAL_PRE] RR_DYNAMIC rr={rr} rr_min={res['rr_min']} "
+                f"vol_regime={res['vol_regime']} comp_score={res['comp_score']}"
+            )
+
+        self.phase_stats.record("cpu_gates", not res["reject"])
+        if res["reject"]:
+            LOGGER.info(f"[EVAL_REJECT] {res['reject']}")
             return None
 
-        # 4 — INSTITUTIONAL
-        inst = await compute_full_institutional_analysis(symbol, bias)
+        # 4 — INSTITUTIONAL (réseau, 6 appels) : seulement si toutes les gates CPU passent
+        # (mémoïsé à part : expire après INST_MEMO_TTL_S même sans nouvelle bougie)
+        inst = self.memo.fresh_inst(memo_entry) if memo_entry is not None else None
+        if inst is None:
+            t0 = time.perf_counter()
+            inst = await compute_full_institutional_analysis(symbol, bias)
+            self.gates.record(
+                "institutional", time.perf_counter() - t0, inst.get("institutional_score", 0) < 2
+            )
+            if memo_entry is not None:
+                self.memo.store_inst(memo_entry, inst)
         inst_score = inst.get("institutional_score", 0)
         LOGGER.info(f"[INST_RAW] score={inst_score} details={inst}")
 
+        self.phase_stats.record("institutional", inst_score >= 2)
         if inst_score < 2:
             LOGGER.info("[EVAL_REJECT] Institutional score < 2")
             return None
 
-        # 5 — MOMENTUM & MOMENTUM COMPOSITE
-        mom = institutional_momentum(df_h1)
-        comp = composite_momentum(df_h1)
-        vol_regime = volatility_regime(df_h1)
-        ext_sig = extension_signal(df_h1)
-
-        LOGGER.info(f"[EVAL_PRE] MOMENTUM={mom}")
-        LOGGER.info(
-            f"[EVAL_PRE] MOMENTUM_COMPOSITE score={comp.get('score')} "
-            f"label={comp.get('label')} components={comp.get('components')}"
-        )
-        LOGGER.info(f"[EVAL_PRE] VOL_REGIME={vol_regime} EXTENSION={ext_sig}")
-
-        # Momentum directionnel : on garde la logique existante
-        if bias == "LONG" and mom not in ("BULLISH", "STRONG_BULLISH"):
-            LOGGER.info("[EVAL_REJECT] Momentum not bullish for LONG")
-            return None
-        if bias == "SHORT" and mom not in ("BEARISH", "STRONG_BEARISH"):
-            LOGGER.info("[EVAL_REJECT] Momentum not bearish for SHORT")
-            return None
-
-        # Filtre d'extension : évite d'entrer dans un move déjà trop étendu
-        if ext_sig == "OVEREXTENDED_LONG" and bias == "LONG":
-            LOGGER.info("[EVAL_REJECT] Extension signal OVEREXTENDED_LONG for LONG bias")
-            return None
-        if ext_sig == "OVEREXTENDED_SHORT" and bias == "SHORT":
-            LOGGER.info("[EVAL_REJECT] Extension signal OVEREXTENDED_SHORT for SHORT bias")
-            return None
-
-        # 6 — PREMIUM / DISCOUNT
-        discount, premium = compute_premium_discount(df_h1)
-        LOGGER.info(f"[EVAL_PRE] PREMIUM={premium} DISCOUNT={discount}")
-
-        # 7 — RR / SL / TP
-        exits = _compute_exits(df_h1, entry, bias, tick=0.1)
-        rr = _safe_rr(entry, exits["sl"], exits["tp1"], bias)
-        LOGGER.info(
-            f"[EVAL_PRE] RR={rr} raw_rr={exits['rr_used']} sl={exits['sl']} tp1={exits['tp1']}"
-        )
-
-        # Seuil RR dynamique en fonction du régime de volatilité et du momentum composite
-        comp_score = float(comp.get("score", 50.0)) if isinstance(comp, dict) else 50.0
-        rr_min = float(self.rr_min_inst)
-
-        if vol_regime == "HIGH":
-            # marché nerveux : on exige un RR un peu meilleur
-            rr_min = max(rr_min, 1.6)
-        elif vol_regime == "LOW" and comp_score >= 70:
-            # marché calme mais momentum fort : on tolère un RR légèrement plus faible
-            rr_min = max(rr_min - 0.1, 1.1)
-
-        # si le momentum composite est faible, on demande plus de RR
-        if comp_score <= 40:
-            rr_min = max(rr_min, 1.5)
-
-        LOGGER.info(
-            f"[EVAL_PRE] RR_DYNAMIC rr={rr} rr_min={rr_min} "
-            f"vol_regime={vol_regime} comp_score={comp_score}"
-        )
-
-        if rr is None or rr < rr_min:
-            LOGGER.info("[EVAL_REJECT] RR < dynamic minimum")
-            return None
-
         # 8 — VALIDATION FINALE
         LOGGER.info(f"[EVAL] VALID {symbol} RR={rr}")
+        self.watchlist.pop(symbol, None)
 
         return {
             "valid": True,
@@ -215,7 +439,7 @@ class SignalAnalyzer:
             "structure": struct,
             "bos_quality": bos_q,
             "institutional": inst,
-            "momentum": mom,
-            "premium": premium,
-            "discount": discount,
+            "momentum": res["mom"],
+            "premium": res["premium"],
+            "discount": res["discount"],
         }
@@ -0,0 +1,630 @@
+# =====================================================================
+# backtest.py — Backtest événementiel hors ligne sur la logique du scanner
+# =====================================================================
+# Rejoue des OHLCV H1 stockés bougie par bougie à travers les mêmes gates
+# que SignalAnalyzer (analyze_signal.run_analysis : tendance, HTF, BOS,
+# momentum, extension, SL / TP / RR), puis simule les exécutions.
+#
+# Pour tenir ~1 an de H1 x 300 symboles en minutes :
+#   1. Indicateurs calculés UNE fois sur tout l'historique (EMA20/50,
+#      RSI14, MACD 12/26/9, ATR14 — état convergé, équivalent au moteur
+#      incrémental) et pivots vectorisés (find_swing_indices).
+#   2. Pré-filtre vectoriel exact sur chaque barre : tendance H1, veto
+#      HTF (H4 clôturées), momentum directionnel, conditions nécessaires
+#      du BOS (clôture au-delà du dernier pivot confirmé, volume, corps,
+#      pente OI).
+#   3. Gates exactes (run_analysis) seulement sur les candidates, avec un
+#      FeatureContext pré-rempli par les tranches des indicateurs globaux.
+#   4. Un process par symbole (ProcessPoolExecutor).
+#
+# Hypothèses de simulation :
+#   - décision à la clôture de la bougie H1 (bougies clôturées uniquement)
+#   - entrée LIMIT au prix de clôture, valable ENTRY_TIMEOUT barres
+#   - SL prioritaire quand SL et TP1 sont touchés dans la même barre
+#   - sortie complète au TP1 / SL, ou à la clôture après MAX_HOLD barres
+#   - une position (ou un ordre en attente) à la fois par symbole
+#   - l'institutionnel (OI / funding / CVD en direct) n'a pas d'historique :
+#     il est considéré comme validé
+#
+# Données : un fichier par symbole dans --data, <SYMBOL>.csv[.gz] ou
+# <SYMBOL>_1H.csv[.gz], colonnes time, open, high, low, close, volume
+# (+ oi facultatif). Un <SYMBOL>_4H.csv éventuel est utilisé tel quel,
+# sinon le H4 est dérivé du H1 (mtf_builder).
+#
+#   python backtest.py --data ./ohlcv --workers 8 --out trades.csv
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analyze_signal import run_analysis
+from feature_context import FeatureContext
+from gate_order import DEFAULT_GATE_ORDER
+from indicators import ema, macd, rsi, true_atr
+from kline_cache import INTERVAL_MS, OHLCV_COLUMNS
+from mtf_builder import resample_frame
+from settings import OB_IMPULSE_PCT, RR_MIN_INST, STOP_ATR_BUFFER
+from structure_utils import find_swing_indices
+
+LOGGER = logging.getLogger(__name__)
+
+H1_MS = INTERVAL_MS["1H"]
+H4_MS = INTERVAL_MS["4H"]
+
+
+# =====================================================================
+# CONFIG / RÉSULTATS
+# =====================================================================
+
+@dataclass
+class BacktestConfig:
+    # fenêtres passées aux gates (comme le scanner : 200 H1 / 200 H4)
+    window_h1: int = 200
+    window_h4: int = 200
+    # seuils des gates (settings par défaut, balayés par optimizer.py)
+    rr_min_inst: float = RR_MIN_INST
+    atr_buffer: float = STOP_ATR_BUFFER
+    ob_impulse_pct: float = OB_IMPULSE_PCT
+    # exécution
+    entry_timeout: int = 3      # barres de validité de l'ordre LIMIT
+    max_hold: int = 96          # barres max en position
+    fee_bps: float = 0.0        # frais par côté (bps du notionnel)
+    # pivots (find_swings par défaut)
+    swing_left: int = 3
+    swing_right: int = 3
+    # False : gates exactes sur toutes les barres (validation du pré-filtre)
+    prefilter: bool = True
+
+
+@dataclass
+class Trade:
+    symbol: str
+    side: str
+    signal_time: int
+    entry_time: int
+    exit_time: int
+    entry: float
+    sl: float
+    tp1: float
+    exit_price: float
+    outcome: str                # TP / SL / TIMEOUT
+    r_multiple: float
+    bars_held: int
+    rr_planned: float
+
+
+@dataclass
+class SymbolResult:
+    symbol: str
+    bars: int = 0
+    candidates: int = 0
+    signals: int = 0
+    unfilled: int = 0
+    trades: List[Trade] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+
+@dataclass
+class PreparedSymbol:
+    """Tout ce qui ne dépend pas des seuils des gates (optimizer : calculé une fois)."""
+    symbol: str
+    df_h1: pd.DataFrame
+    df_h4: pd.DataFrame
+    f1: Dict[str, np.ndarray]
+    f4: Dict[str, np.ndarray]
+    htf_count: np.ndarray
+    mask: np.ndarray
+    t: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+
+
+# =====================================================================
+# DONNÉES
+# =====================================================================
+
+def _read_frame(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    missing = [c for c in OHLCV_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path}: colonnes manquantes {missing}")
+    cols = OHLCV_COLUMNS + (["oi"] if "oi" in df.columns else [])
+    df = df[cols].astype(float)
+    df = df.drop_duplicates("time", keep="last").sort_values("time")
+    return df.reset_index(drop=True)
+
+
+def discover_symbols(data_dir: str) -> Dict[str, str]:
+    """{symbol: chemin H1} pour les fichiers de `data_dir`."""
+    out: Dict[str, str] = {}
+    for name in sorted(os.listdir(data_dir)):
+        base = name
+        for ext in (".csv.gz", ".csv"):
+            if base.endswith(ext):
+                base = base[: -len(ext)]
+                break
+        else:
+            continue
+        if base.endswith("_4H"):
+            continue
+        sym = base[:-3] if base.endswith("_1H") else base
+        out[sym] = os.path.join(data_dir, name)
+    return out
+
+
+def load_symbol(path_h1: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    df_h1 = _read_frame(path_h1)
+    path_h4 = None
+    for suffix in ("_1H.csv.gz", "_1H.csv", ".csv.gz", ".csv"):
+        if path_h1.endswith(suffix):
+            stem = path_h1[: -len(suffix)]
+            for ext in (".csv.gz", ".csv"):
+                if os.path.exists(stem + "_4H" + ext):
+                    path_h4 = stem + "_4H" + ext
+            break
+    df_h4 = _read_frame(path_h4) if path_h4 else resample_frame(df_h1, "1H", "4H")
+    return df_h1, df_h4
+
+
+# =====================================================================
+# INDICATEURS GLOBAUX (une passe sur tout l'historique)
+# =====================================================================
+
+def _features(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    close = df["close"].astype(float)
+    macd_line, signal_line, hist = macd(close)
+    return {
+        "ema20": ema(close, 20).to_numpy(),
+        "ema50": ema(close, 50).to_numpy(),
+        "rsi": rsi(close, length=14).to_numpy(),
+        "macd": macd_line.to_numpy(),
+        "signal": signal_line.to_numpy(),
+        "hist": hist.to_numpy(),
+        "atr": true_atr(df, length=14).to_numpy(),
+    }
+
+
+def _trend_codes(ema20: np.ndarray, ema50: np.ndarray) -> np.ndarray:
+    """+1 LONG / -1 SHORT / 0 RANGE par barre (structure_utils._trend_label)."""
+    n = len(ema20)
+    code = np.zeros(n, dtype=np.int8)
+    if n < 5:
+        return code
+    slope = np.full(n, np.nan)
+    slope[4:] = ema20[4:] - ema20[:-4]
+    code[(ema20 > ema50) & (slope > 0)] = 1
+    code[(ema20 < ema50) & (slope < 0)] = -1
+    return code
+
+
+def _last_pivot_level(idx: np.ndarray, levels: np.ndarray, n: int, right: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pour chaque barre i : niveau et position du dernier pivot confirmé
+    (pivot j avec j + right <= i), NaN / -1 si aucun.
+    """
+    pos = np.full(n, -1, dtype=np.int64)
+    if idx.size:
+        confirm = idx + right
+        ok = confirm < n
+        pos[confirm[ok]] = idx[ok]
+        pos = np.maximum.accumulate(pos)
+    level = np.where(pos >= 0, levels[np.clip(pos, 0, None)], np.nan)
+    return level, pos
+
+
+def _slice_series(arr: np.ndarray, a: int, b: int) -> pd.Series:
+    return pd.Series(arr[a:b])
+
+
+def _seeded_context(df_w: pd.DataFrame, feats: Dict[str, np.ndarray], a: int, b: int, symbol: str, tf: str) -> FeatureContext:
+    ctx = FeatureContext(df_w, symbol=symbol, tf=tf)
+    ctx.seed({
+        ("ema", 20): _slice_series(feats["ema20"], a, b),
+        ("ema", 50): _slice_series(feats["ema50"], a, b),
+        ("rsi", 14): _slice_series(feats["rsi"], a, b),
+        ("macd", 12, 26, 9): (
+            _slice_series(feats["macd"], a, b),
+            _slice_series(feats["signal"], a, b),
+            _slice_series(feats["hist"], a, b),
+        ),
+        ("atr", 14): _slice_series(feats["atr"], a, b),
+    })
+    return ctx
+
+
+# =====================================================================
+# PRÉ-FILTRE VECTORIEL
+# =====================================================================
+
+def candidate_mask(
+    df_h1: pd.DataFrame,
+    f1: Dict[str, np.ndarray],
+    htf_code: np.ndarray,
+    htf_count: np.ndarray,
+    cfg: BacktestConfig,
+) -> np.ndarray:
+    """
+    Barres pouvant produire un signal. Chaque condition est une condition
+    nécessaire des gates exactes (mêmes indicateurs que le contexte) :
+    aucun signal n'est perdu, les gates exactes tranchent ensuite.
+    """
+    n = len(df_h1)
+    close = df_h1["close"].to_numpy(dtype=float)
+    idx = np.arange(n)
+    start = idx - cfg.window_h1 + 1          # début de la fenêtre de la barre i
+
+    # 1 — tendance H1 (fenêtres >= 55 barres, sinon RANGE)
+    trend = _trend_codes(f1["ema20"], f1["ema50"])
+    trend[np.minimum(idx + 1, cfg.window_h1) < 55] = 0
+
+    # 2 — veto HTF (ignoré sous 40 bougies H4, comme htf_trend_ok)
+    htf_on = np.minimum(htf_count, cfg.window_h4) >= 40
+    veto = htf_on & (htf_code != 0) & (htf_code == -trend)
+
+    # 5 — momentum directionnel (institutional_momentum ∈ BULLISH* / BEARISH*)
+    e20, e50, r, hist = f1["ema20"], f1["ema50"], f1["rsi"], f1["hist"]
+    mom_long = (hist > 0) & (e20 > e50) & (r > 50)
+    mom_short = (hist < 0) & (e20 < e50) & (r < 50)
+    mom_ok = np.where(trend > 0, mom_long, np.where(trend < 0, mom_short, False))
+
+    # 3 — BOS : la clôture doit dépasser le dernier pivot haut ou bas confirmé
+    # (pivot hors fenêtre → on laisse passer, la gate exacte décide)
+    hi_idx, lo_idx = find_swing_indices(df_h1, cfg.swing_left, cfg.swing_right)
+    highs = df_h1["high"].to_numpy(dtype=float)
+    lows = df_h1["low"].to_numpy(dtype=float)
+    hi_lvl, hi_pos = _last_pivot_level(hi_idx, highs, n, cfg.swing_right)
+    lo_lvl, lo_pos = _last_pivot_level(lo_idx, lows, n, cfg.swing_right)
+    in_win = start + cfg.swing_left
+    hi_unknown = hi_pos < in_win
+    lo_unknown = lo_pos < in_win
+    with np.errstate(invalid="ignore"):
+        bos_possible = hi_unknown | lo_unknown | (close > hi_lvl) | (close < lo_lvl)
+
+    # _detect_bos_choch_cos : < 40 barres → pas de BOS
+    enough = np.minimum(idx + 1, cfg.window_h1) >= 40
+
+    # 3 bis — qualité du BOS (bos_quality_details, paramètres par défaut) :
+    # volume >= 1.8x moyenne 60, corps >= 35 % du range, |pente OI 10| >= 0.3 %.
+    # Petite tolérance : la moyenne glissante peut différer de la moyenne
+    # pandas au dernier ulp, on laisse passer les cas limites.
+    tol = 1.0 - 1e-9
+    opens = df_h1["open"].to_numpy(dtype=float)
+    vol = df_h1["volume"].to_numpy(dtype=float)
+    avg_vol = pd.Series(vol).rolling(60, min_periods=1).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vf = np.where(avg_vol > 0, vol / avg_vol, 1.0)
+        rng = highs - lows
+        body_ratio = np.where(rng > 0, np.abs(close - opens) / rng, 0.0)
+    quality = (vf >= 1.8 * tol) & (body_ratio >= 0.35 * tol)
+    if "oi" in df_h1.columns:
+        oi = df_h1["oi"].to_numpy(dtype=float)
+        base = np.full(n, np.nan)
+        base[9:] = oi[:-9]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(np.abs(base) > 1e-12, (oi - base) / np.abs(base), 0.0)
+        quality &= np.abs(np.nan_to_num(slope)) >= 0.003 * tol
+    else:
+        # pas d'OI → "weak_oi" systématique, aucun BOS valide
+        quality[:] = False
+
+    return (trend != 0) & ~veto & mom_ok & bos_possible & quality & enough
+
+
+# =====================================================================
+# SIMULATION D'EXÉCUTION
+# =====================================================================
+
+def _simulate(
+    symbol: str,
+    i: int,
+    side: str,
+    entry: float,
+    sl: float,
+    tp1: float,
+    rr: float,
+    t: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,
+    c: np.ndarray,
+    cfg: BacktestConfig,
+) -> Tuple[Optional[Trade], int]:
+    """
+    Ordre LIMIT posé à la clôture de la barre i → (Trade ou None si non
+    rempli, index de la dernière barre occupée).
+    """
+    n = len(c)
+    long = side == "LONG"
+    risk = (entry - sl) if long else (sl - entry)
+    if risk <= 0 or tp1 is None:
+        return None, i
+
+    # remplissage
+    fill = -1
+    for j in range(i + 1, min(i + 1 + cfg.entry_timeout, n)):
+        if (long and l[j] <= entry) or (not long and h[j] >= entry):
+            fill = j
+            break
+    if fill < 0:
+        return None, min(i + cfg.entry_timeout, n - 1)
+
+    # sortie : SL prioritaire dans une même barre (y compris la barre de remplissage)
+    exit_j, exit_px, outcome = -1, 0.0, "TIMEOUT"
+    last = min(fill + cfg.max_hold, n - 1)
+    for j in range(fill, last + 1):
+        hit_sl = l[j] <= sl if long else h[j] >= sl
+        hit_tp = h[j] >= tp1 if long else l[j] <= tp1
+        if hit_sl:
+            exit_j, exit_px, outcome = j, sl, "SL"
+            break
+        if hit_tp:
+            exit_j, exit_px, outcome = j, tp1, "TP"
+            break
+    if exit_j < 0:
+        exit_j, exit_px = last, float(c[last])
+
+    pnl = (exit_px - entry) if long else (entry - exit_px)
+    fees = (entry + exit_px) * cfg.fee_bps / 10_000.0
+    trade = Trade(
+        symbol=symbol,
+        side=side,
+        signal_time=int(t[i]),
+        entry_time=int(t[fill]),
+        exit_time=int(t[exit_j]),
+        entry=float(entry),
+        sl=float(sl),
+        tp1=float(tp1),
+        exit_price=float(exit_px),
+        outcome=outcome,
+        r_multiple=float((pnl - fees) / risk),
+        bars_held=int(exit_j - fill),
+        rr_planned=float(rr) if rr is not None else float("nan"),
+    )
+    return trade, exit_j
+
+
+# =====================================================================
+# BACKTEST D'UN SYMBOLE
+# =====================================================================
+
+def prepare_frames(
+    symbol: str,
+    df_h1: pd.DataFrame,
+    df_h4: pd.DataFrame,
+    cfg: BacktestConfig,
+) -> Optional[PreparedSymbol]:
+    """Indicateurs globaux, H4 clôturées par barre H1 et pré-filtre (None si trop court)."""
+    if len(df_h1) < 60 or df_h4.empty:
+        return None
+
+    f1 = _features(df_h1)
+    f4 = _features(df_h4)
+    code4 = _trend_codes(f4["ema20"], f4["ema50"])
+
+    # H4 clôturées à la clôture de chaque barre H1
+    t1 = df_h1["time"].to_numpy(dtype=float)
+    t4 = df_h4["time"].to_numpy(dtype=float)
+    htf_count = np.searchsorted(t4 + H4_MS, t1 + H1_MS, side="right")
+    last4 = htf_count - 1
+    # tendance du contexte H4 : RANGE sous 55 bougies dans la fenêtre
+    htf_code = np.where(
+        (last4 >= 0) & (np.minimum(htf_count, cfg.window_h4) >= 55),
+        code4[np.clip(last4, 0, None)],
+        0,
+    )
+
+    if cfg.prefilter:
+        mask = candidate_mask(df_h1, f1, htf_code, htf_count, cfg)
+    else:
+        mask = np.ones(len(df_h1), dtype=bool)
+    mask[: 60] = False
+    mask &= htf_count > 0
+
+    return PreparedSymbol(
+        symbol=symbol,
+        df_h1=df_h1,
+        df_h4=df_h4,
+        f1=f1,
+        f4=f4,
+        htf_count=htf_count,
+        mask=mask,
+        t=t1,
+        h=df_h1["high"].to_numpy(dtype=float),
+        l=df_h1["low"].to_numpy(dtype=float),
+        c=df_h1["close"].to_numpy(dtype=float),
+    )
+
+
+def bar_inputs(
+    prep: PreparedSymbol,
+    i: int,
+    cfg: BacktestConfig,
+) -> Tuple[pd.DataFrame, pd.DataFrame, FeatureContext, FeatureContext]:
+    """Fenêtres H1 / H4 vues à la clôture de la barre i + contextes pré-remplis."""
+    a = max(0, i + 1 - cfg.window_h1)
+    b4 = int(prep.htf_count[i])
+    a4 = max(0, b4 - cfg.window_h4)
+    w1 = prep.df_h1.iloc[a:i + 1].reset_index(drop=True)
+    w4 = prep.df_h4.iloc[a4:b4].reset_index(drop=True)
+    ctx1 = _seeded_context(w1, prep.f1, a, i + 1, prep.symbol, "1H")
+    ctx4 = _seeded_context(w4, prep.f4, a4, b4, prep.symbol, "4H")
+    return w1, w4, ctx1, ctx4
+
+
+def gate_params(cfg: BacktestConfig) -> Dict[str, float]:
+    """Seuils de cfg au format run_analysis(params=...)."""
+    return {"atr_buffer": cfg.atr_buffer, "ob_impulse_pct": cfg.ob_impulse_pct}
+
+
+def backtest_frames(
+    symbol: str,
+    df_h1: pd.DataFrame,
+    df_h4: pd.DataFrame,
+    cfg: Optional[BacktestConfig] = None,
+) -> SymbolResult:
+    """Rejoue un symbole barre par barre (décision à chaque clôture H1)."""
+    cfg = cfg or BacktestConfig()
+    t0 = time.perf_counter()
+    res = SymbolResult(symbol=symbol, bars=len(df_h1))
+    prep = prepare_frames(symbol, df_h1, df_h4, cfg)
+    if prep is None:
+        return res
+    res.candidates = int(prep.mask.sum())
+    params = gate_params(cfg)
+
+    busy_until = -1
+    for i in np.flatnonzero(prep.mask):
+        if i <= busy_until:
+            continue
+
+        w1, w4, ctx1, ctx4 = bar_inputs(prep, i, cfg)
+        out = run_analysis(symbol, w1, w4, cfg.rr_min_inst, ctx1, ctx4, order=DEFAULT_GATE_ORDER, params=params)
+        if out["reject"]:
+            continue
+
+        res.signals += 1
+        exits = out["exits"]
+        trade, busy_until = _simulate(
+            symbol, i, out["bias"], out["entry"], exits["sl"], exits["tp1"], out["rr"],
+            prep.t, prep.h, prep.l, prep.c, cfg,
+        )
+        if trade is None:
+            res.unfilled += 1
+        else:
+            res.trades.append(trade)
+
+    res.elapsed_s = time.perf_counter() - t0
+    return res
+
+
+def _backtest_file(symbol: str, path: str, cfg: BacktestConfig) -> SymbolResult:
+    """Point d'entrée du process worker (charge lui-même ses données)."""
+    try:
+        df_h1, df_h4 = load_symbol(path)
+        return backtest_frames(symbol, df_h1, df_h4, cfg)
+    except Exception as exc:
+        LOGGER.error(f"[BACKTEST] {symbol}: {exc}")
+        return SymbolResult(symbol=symbol)
+
+
+# =====================================================================
+# STATISTIQUES
+# =====================================================================
+
+def trades_frame(results: List[SymbolResult]) -> pd.DataFrame:
+    rows = [asdict(tr) for r in results for tr in r.trades]
+    cols = list(Trade.__dataclass_fields__)
+    return pd.DataFrame(rows, columns=cols).sort_values("entry_time").reset_index(drop=True) if rows else pd.DataFrame(columns=cols)
+
+
+def summarize(trades: pd.DataFrame) -> Dict[str, Any]:
+    """Statistiques agrégées en R (multiples du risque initial)."""
+    n = len(trades)
+    if n == 0:
+        return {"trades": 0}
+    r = trades["r_multiple"].to_numpy(dtype=float)
+    wins = r[r > 0]
+    losses = r[r <= 0]
+    equity = np.cumsum(r)
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+    gross_loss = float(-losses.sum())
+    return {
+        "trades": n,
+        "win_rate": round(float(len(wins) / n), 4),
+        "avg_r": round(float(r.mean()), 4),
+        "total_r": round(float(r.sum()), 3),
+        "profit_factor": round(float(wins.sum() / gross_loss), 3) if gross_loss > 0 else float("inf"),
+        "max_drawdown_r": round(float(drawdown.max()), 3),
+        "avg_bars_held": round(float(trades["bars_held"].mean()), 2),
+        "long": int((trades["side"] == "LONG").sum()),
+        "short": int((trades["side"] == "SHORT").sum()),
+        "outcomes": trades["outcome"].value_counts().to_dict(),
+    }
+
+
+# =====================================================================
+# RUN
+# =====================================================================
+
+def run_backtest(
+    files: Dict[str, str],
+    cfg: Optional[BacktestConfig] = None,
+    workers: int = 0,
+) -> Tuple[List[SymbolResult], pd.DataFrame, Dict[str, Any]]:
+    """Backtest de {symbol: chemin H1} ; un process par symbole."""
+    cfg = cfg or BacktestConfig()
+    workers = int(workers) if int(workers) > 0 else (os.cpu_count() or 1)
+    t0 = time.perf_counter()
+
+    if workers == 1:
+        results = [_backtest_file(s, p, cfg) for s, p in files.items()]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_backtest_file, s, p, cfg) for s, p in files.items()]
+            results = [f.result() for f in futures]
+
+    trades = trades_frame(results)
+    stats = summarize(trades)
+    stats.update({
+        "symbols": len(results),
+        "bars": int(sum(r.bars for r in results)),
+        "candidates": int(sum(r.candidates for r in results)),
+        "signals": int(sum(r.signals for r in results)),
+        "unfilled": int(sum(r.unfilled for r in results)),
+        "elapsed_s": round(time.perf_counter() - t0, 2),
+    })
+    return results, trades, stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Backtest H1/H4 des gates SignalAnalyzer")
+    ap.add_argument("--data", required=True, help="dossier des CSV OHLCV par symbole")
+    ap.add_argument("--symbols", default="", help="liste séparée par des virgules (défaut : tous)")
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--rr-min", type=float, default=RR_MIN_INST)
+    ap.add_argument("--atr-buffer", type=float, default=STOP_ATR_BUFFER)
+    ap.add_argument("--ob-impulse", type=float, default=OB_IMPULSE_PCT)
+    ap.add_argument("--entry-timeout", type=int, default=3)
+    ap.add_argument("--max-hold", type=int, default=96)
+    ap.add_argument("--fee-bps", type=float, default=0.0)
+    ap.add_argument("--no-prefilter", action="store_true", help="gates exactes sur chaque barre (lent)")
+    ap.add_argument("--out", default="", help="CSV des trades")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+
+    files = discover_symbols(args.data)
+    if args.symbols:
+        wanted = {s.strip().upper() for s in args.symbols.split(",") if s.strip()}
+        files = {s: p for s, p in files.items() if s.upper() in wanted}
+
+    cfg = BacktestConfig(
+        rr_min_inst=args.rr_min,
+        atr_buffer=args.atr_buffer,
+        ob_impulse_pct=args.ob_impulse,
+        entry_timeout=args.entry_timeout,
+        max_hold=args.max_hold,
+        fee_bps=args.fee_bps,
+        prefilter=not args.no_prefilter,
+    )
+    _, trades, stats = run_backtest(files, cfg, workers=args.workers)
+
+    for k, v in stats.items():
+        print(f"{k:>16}: {v}")
+    if args.out:
+        trades.to_csv(args.out, index=False)
+        print(f"📄 {len(trades)} trades → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
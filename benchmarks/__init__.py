@@ -0,0 +1 @@
+# Benchmarks : python -m benchmarks (suite complète → JSON) ou python -m benchmarks.<module>
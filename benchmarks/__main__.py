@@ -0,0 +1,45 @@
+# =====================================================================
+# python -m benchmarks — suite complète → un fichier JSON
+# =====================================================================
+# python -m benchmarks --out bench.json [--quick] [--skip-cycle]
+# python -m benchmarks.compare base.json bench.json
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from benchmarks import bench_cycle, bench_engines
+from benchmarks.results import save_results
+from benchmarks.synthetic import UNIVERSES
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="benchmark suite (engines + whole cycle)")
+    ap.add_argument("--out", default="bench.json")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--quick", action="store_true", help="petites tailles uniquement")
+    ap.add_argument("--skip-cycle", action="store_true", help="sans le cycle contre l'exchange local")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    results = bench_engines.run(args.repeat, args.quick, args.seed)
+    bench_engines.print_report(results)
+
+    if not args.skip_cycle:
+        universes = UNIVERSES[:1] if args.quick else UNIVERSES
+        results["cycle"] = asyncio.run(bench_cycle.bench_cycle(universes, args.latency_ms, seed=args.seed))
+        print()
+        bench_cycle.print_report(results["cycle"])
+
+    save_results(args.out, results, seed=args.seed, quick=args.quick, repeat=args.repeat, latency_ms=args.latency_ms)
+    print(f"📄 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# =====================================================================
+# bench_cycle.py — Cycle de scan complet contre un exchange local
+# =====================================================================
+# python -m benchmarks.bench_cycle [--symbols 50,500] [--latency-ms 20] [--inst-all] [--out cycle.json]
+#
+# mock_exchange.MockExchange (127.0.0.1, port libre) sert les endpoints
+# Bitget et Binance à partir d'OHLCV synthétiques seedés. Le cycle
+# mesuré est celui du scanner en mode inline : liste des contrats →
+# H1 / H4 (SCAN_CONCURRENCY en parallèle) → gates CPU (run_analysis) →
+# institutionnel Binance pour les survivants (--inst-all : pour tous
+# les symboles, charge maximale sur les endpoints Binance).
+#
+# Deux passes : "cold" (historique complet) puis "warm" (cache de
+# bougies incrémental si KLINE_CACHE_ENABLED, caches institutionnels).
+# Les limiteurs de débit sont levés : on mesure les clients, pas les
+# quotas.
+#
+# Cycles identiques hors réseau (http_recorder.py) :
+#   HTTP_RECORD_MODE=record HTTP_ARCHIVE_PATH=cycle.jsonl.gz python -m benchmarks.bench_cycle ...
+#   HTTP_RECORD_MODE=replay HTTP_ARCHIVE_PATH=cycle.jsonl.gz HTTP_REPLAY_SPEED=0 python -m benchmarks.bench_cycle ...
+# En replay, "requests" vaut 0 : tout est servi depuis l'archive.
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+from analyze_signal import run_analysis
+from benchmarks.results import save_results
+from benchmarks.synthetic import UNIVERSES
+from bitget_client import BitgetClient
+from feature_context import FeatureContext
+from institutional_data import BinanceFuturesClient, BinanceWeightLimiter, compute_full_institutional_analysis
+from mock_exchange import MockConfig, MockExchange
+from rate_limiter import EndpointRateLimiter
+from settings import SCAN_CONCURRENCY
+
+H1_LIMIT = 200
+H4_LIMIT = 200
+
+
+# =====================================================================
+# CYCLE
+# =====================================================================
+
+async def _cycle(
+    client: BitgetClient,
+    binance: BinanceFuturesClient,
+    concurrency: int,
+    inst_all: bool = False,
+) -> Dict[str, Any]:
+    sem = asyncio.Semaphore(max(int(concurrency), 1))
+    outcomes: Counter = Counter()
+    analyze_s = 0.0
+    inst_calls = 0
+
+    t0 = time.perf_counter()
+    symbols = await client.get_contracts_list()
+
+    async def _one(sym: str) -> None:
+        nonlocal analyze_s, inst_calls
+        async with sem:
+            df_h1 = await client.get_klines_df(sym, "1H", H1_LIMIT)
+            df_h4 = await client.get_klines_df(sym, "4H", H4_LIMIT)
+        if df_h1.empty or df_h4.empty:
+            outcomes["fetch_error"] += 1
+            return
+        t1 = time.perf_counter()
+        res = run_analysis(
+            sym, df_h1, df_h4, 1.3,
+            FeatureContext(df_h1, symbol=sym, tf="1H"),
+            FeatureContext(df_h4, symbol=sym, tf="4H"),
+        )
+        analyze_s += time.perf_counter() - t1
+        outcomes[res["gate"] or "signal"] += 1
+        if res["reject"] is None or inst_all:
+            async with sem:
+                await compute_full_institutional_analysis(sym, res["bias"] or "LONG", client=binance)
+            inst_calls += 1
+
+    await asyncio.gather(*[_one(s) for s in symbols])
+    cycle_s = time.perf_counter() - t0
+    return {
+        "cycle_s": round(cycle_s, 3),
+        "analyze_s": round(analyze_s, 3),
+        "per_symbol_ms": round(cycle_s / max(len(symbols), 1) * 1e3, 3),
+        "inst_calls": inst_calls,
+        "outcomes": dict(outcomes),
+    }
+
+
+async def bench_cycle(
+    universes: Sequence[int] = UNIVERSES,
+    latency_ms: float = 0.0,
+    concurrency: int = SCAN_CONCURRENCY,
+    seed: int = 7,
+    inst_all: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for n in universes:
+        mock = MockExchange(MockConfig(symbols=n, seed=seed, latency_ms=latency_ms))
+        base = await mock.start()
+        client = BitgetClient("bench", "bench", "bench")
+        client.BASE = base
+        client._limiter = EndpointRateLimiter({}, default=(1e9, 1e9), name="bench")
+        binance = BinanceFuturesClient(base_url=base)
+        binance.limiter = BinanceWeightLimiter(weight_per_min=1e9)
+        try:
+            for phase in ("cold", "warm"):
+                before = mock.stats()["total_requests"]
+                row = await _cycle(client, binance, concurrency, inst_all)
+                row["requests"] = mock.stats()["total_requests"] - before
+                row["latency_ms"] = latency_ms
+                out[f"symbols={n}/{phase}"] = row
+        finally:
+            if client.session is not None:
+                await client.session.close()
+            await binance.close()
+            await mock.stop()
+    return out
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'cycle':>22} {'total (s)':>10} {'analyze (s)':>12} {'requests':>9} {'inst':>6} {'per symbol (ms)':>16}")
+    for case, row in results.items():
+        print(
+            f"{case:>22} {row['cycle_s']:>10.3f} {row['analyze_s']:>12.3f} "
+            f"{row['requests']:>9} {row['inst_calls']:>6} {row['per_symbol_ms']:>16.3f}"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="whole scan cycle against a local mock exchange")
+    ap.add_argument("--symbols", default=",".join(str(n) for n in UNIVERSES), help="tailles d'univers")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--concurrency", type=int, default=SCAN_CONCURRENCY)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--inst-all", action="store_true", help="institutionnel pour tous les symboles")
+    ap.add_argument("--out", default="", help="fichier JSON de résultats")
+    args = ap.parse_args()
+
+    universes: List[int] = [int(x) for x in args.symbols.split(",") if x.strip()]
+    results = asyncio.run(bench_cycle(universes, args.latency_ms, args.concurrency, args.seed, args.inst_all))
+    print_report(results)
+    if args.out:
+        save_results(args.out, {"cycle": results}, seed=args.seed, latency_ms=args.latency_ms, inst_all=args.inst_all)
+        print(f"📄 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
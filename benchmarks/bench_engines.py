@@ -0,0 +1,127 @@
+# =====================================================================
+# bench_engines.py — Latence / allocations des moteurs indicateurs,
+# structure et sorties
+# =====================================================================
+# python -m benchmarks.bench_engines [--repeat 5] [--quick] [--out engines.json]
+#
+#   1. par fonction et par taille (100 / 1 000 / 10 000 bougies) : temps
+#      par appel (best / médiane) et pic d'allocation (tracemalloc),
+#      appel "à froid" (sans FeatureContext → rien de mémoïsé) ;
+#   2. par taille d'univers (50 / 500 / 2 000 symboles, 200 bougies H1 /
+#      H4) : run_analysis sur tout l'univers, contexte neuf par symbole.
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Sequence
+
+import pandas as pd
+
+from analyze_signal import run_analysis
+from benchmarks.results import alloc_call, save_results, time_call
+from benchmarks.synthetic import SIZES, UNIVERSES, synthetic_ohlcv, synthetic_universe
+from feature_context import FeatureContext
+from indicators import composite_momentum, institutional_momentum
+from stops import protective_stop_long, protective_stop_short
+from structure_utils import analyze_structure, bos_quality_details
+from tp_clamp import compute_tp1
+
+UNIVERSE_BARS = 200
+
+
+def engine_cases(df: pd.DataFrame) -> Dict[str, Callable[[], Any]]:
+    """Appels mesurés sur `df` (arguments comme dans analyze_signal)."""
+    entry = float(df["close"].iloc[-1])
+    sl_long, _ = protective_stop_long(df, entry)
+    sl_short, _ = protective_stop_short(df, entry)
+    oi = df["oi"] if "oi" in df.columns else None
+    return {
+        "analyze_structure": lambda: analyze_structure(df),
+        "bos_quality_details": lambda: bos_quality_details(df, oi_series=oi, df_liq=df, price=entry),
+        "institutional_momentum": lambda: institutional_momentum(df),
+        "composite_momentum": lambda: composite_momentum(df),
+        "protective_stop_long": lambda: protective_stop_long(df, entry),
+        "protective_stop_short": lambda: protective_stop_short(df, entry),
+        "compute_tp1_long": lambda: compute_tp1(entry, sl_long, "LONG", df=df),
+        "compute_tp1_short": lambda: compute_tp1(entry, sl_short, "SHORT", df=df),
+    }
+
+
+def bench_functions(sizes: Sequence[int] = SIZES, repeat: int = 5, seed: int = 7) -> Dict[str, Dict[str, Any]]:
+    """{"<fonction>@<bars>": {best_ms, median_ms, loops, peak_kib, retained_kib}}."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for n in sizes:
+        df = synthetic_ohlcv(n, seed)
+        for name, fn in engine_cases(df).items():
+            row = time_call(fn, repeat=repeat)
+            row.update(alloc_call(fn))
+            out[f"{name}@{n}"] = row
+    return out
+
+
+def bench_universe(
+    universes: Sequence[int] = UNIVERSES,
+    bars: int = UNIVERSE_BARS,
+    seed: int = 7,
+) -> Dict[str, Dict[str, Any]]:
+    """run_analysis (gates CPU, sans institutionnel) sur tout l'univers."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for n in universes:
+        h1 = synthetic_universe(n, bars, seed, tf="1H")
+        h4 = synthetic_universe(n, bars, seed, tf="4H")
+        rejects: Counter = Counter()
+        t0 = time.perf_counter()
+        for sym in h1:
+            ctx1 = FeatureContext(h1[sym], symbol=sym, tf="1H")
+            ctx4 = FeatureContext(h4[sym], symbol=sym, tf="4H")
+            res = run_analysis(sym, h1[sym], h4[sym], 1.3, ctx1, ctx4)
+            rejects[res["gate"] or "signal"] += 1
+        elapsed = time.perf_counter() - t0
+        out[f"symbols={n}"] = {
+            "analyze_s": round(elapsed, 3),
+            "per_symbol_ms": round(elapsed / n * 1e3, 3),
+            "bars": bars,
+            "outcomes": dict(rejects),
+        }
+    return out
+
+
+def run(repeat: int = 5, quick: bool = False, seed: int = 7) -> Dict[str, Dict[str, Any]]:
+    sizes = SIZES[:2] if quick else SIZES
+    universes = UNIVERSES[:1] if quick else UNIVERSES
+    return {
+        "functions": bench_functions(sizes, repeat, seed),
+        "universe": bench_universe(universes, UNIVERSE_BARS, seed),
+    }
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'function@bars':>32} {'best (ms)':>11} {'median (ms)':>12} {'peak (KiB)':>11}")
+    for case, row in results.get("functions", {}).items():
+        print(f"{case:>32} {row['best_ms']:>11.3f} {row['median_ms']:>12.3f} {row['peak_kib']:>11.1f}")
+    print()
+    print(f"{'universe':>14} {'analyze (s)':>12} {'per symbol (ms)':>16}  outcomes")
+    for case, row in results.get("universe", {}).items():
+        print(f"{case:>14} {row['analyze_s']:>12.3f} {row['per_symbol_ms']:>16.3f}  {row['outcomes']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="indicator / structure / exit engines benchmark")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--quick", action="store_true", help="100 / 1 000 bougies, 50 symboles")
+    ap.add_argument("--out", default="", help="fichier JSON de résultats")
+    args = ap.parse_args()
+
+    results = run(args.repeat, args.quick, args.seed)
+    print_report(results)
+    if args.out:
+        save_results(args.out, results, seed=args.seed, quick=args.quick)
+        print(f"📄 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# =====================================================================
+# bench_swings.py — find_swings vectorisé vs boucle historique
+# =====================================================================
+# python -m benchmarks.bench_swings [--repeat 5]
+#
+# Vérifie que les pivots sont identiques puis affiche le temps médian
+# par appel à 100, 1 000 et 10 000 barres.
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from structure_utils import find_swings, find_swing_indices
+
+SIZES = (100, 1_000, 10_000)
+
+
+def _find_swings_loop(df: pd.DataFrame, left: int = 3, right: int = 3) -> Dict[str, List[Tuple[int, float]]]:
+    """Implémentation d'origine (boucle Python, une fenêtre par barre)."""
+    highs: List[Tuple[int, float]] = []
+    lows: List[Tuple[int, float]] = []
+
+    if df is None or len(df) < left + right + 3:
+        return {"highs": highs, "lows": lows}
+
+    h = df["high"].to_numpy(dtype=float)
+    l = df["low"].to_numpy(dtype=float)
+
+    for i in range(left, len(df) - right):
+        window_h = h[i - left : i + right + 1]
+        window_l = l[i - left : i + right + 1]
+        if h[i] >= window_h.max():
+            highs.append((i, float(h[i])))
+        if l[i] <= window_l.min():
+            lows.append((i, float(l[i])))
+
+    return {"highs": highs, "lows": lows}
+
+
+def synthetic_ohlc(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1.0 + rng.random(n) * 0.004)
+    low = np.minimum(open_, close) * (1.0 - rng.random(n) * 0.004)
+    # quelques égalités pour exercer le cas ">=" / "<="
+    high[::50] = np.round(high[::50], 1)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+
+
+def _best(fn, repeat: int) -> float:
+    number = 1
+    while timeit.timeit(fn, number=number) < 0.05:
+        number *= 2
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="find_swings benchmark")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'bars':>8} {'loop (ms)':>12} {'vector (ms)':>12} {'indices (ms)':>13} {'speedup':>9}")
+    for n in SIZES:
+        df = synthetic_ohlc(n)
+        if find_swings(df) != _find_swings_loop(df):
+            raise SystemExit(f"pivot mismatch at n={n}")
+
+        t_loop = _best(lambda: _find_swings_loop(df), args.repeat)
+        t_vec = _best(lambda: find_swings(df), args.repeat)
+        t_idx = _best(lambda: find_swing_indices(df), args.repeat)
+        print(
+            f"{n:>8} {t_loop * 1e3:>12.3f} {t_vec * 1e3:>12.3f} "
+            f"{t_idx * 1e3:>13.3f} {t_loop / t_vec:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# =====================================================================
+# compare.py — Comparaison de deux fichiers de résultats JSON
+# =====================================================================
+# python -m benchmarks.compare base.json new.json [--threshold 0.10]
+#
+# Ratio new / base pour chaque métrique commune (temps, allocations) ;
+# au-delà de +threshold → régression (code retour 1), en deçà de
+# -threshold → amélioration.
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.results import flatten, load_results
+
+
+def compare(base: Dict, new: Dict, threshold: float = 0.10) -> List[Tuple[str, float, float, float, str]]:
+    """[(clé, base, new, ratio, verdict)] pour les métriques présentes des deux côtés."""
+    fb = flatten(base.get("results", {}))
+    fn = flatten(new.get("results", {}))
+    rows = []
+    for key in sorted(fb.keys() & fn.keys()):
+        b, n = fb[key], fn[key]
+        if b <= 0:
+            ratio = 1.0 if n <= 0 else float("inf")
+        else:
+            ratio = n / b
+        if ratio > 1.0 + threshold:
+            verdict = "REGRESSION"
+        elif ratio < 1.0 - threshold:
+            verdict = "faster" if not key.endswith("_kib") else "smaller"
+        else:
+            verdict = ""
+        rows.append((key, b, n, ratio, verdict))
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="compare two benchmark result files")
+    ap.add_argument("base")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=0.10, help="écart relatif toléré (0.10 = 10 %)")
+    ap.add_argument("--only-changes", action="store_true")
+    args = ap.parse_args()
+
+    base, new = load_results(args.base), load_results(args.new)
+    print(f"base: {base['meta'].get('git')} ({base['meta'].get('created')})")
+    print(f"new : {new['meta'].get('git')} ({new['meta'].get('created')})")
+
+    rows = compare(base, new, args.threshold)
+    width = max((len(r[0]) for r in rows), default=10)
+    regressions = 0
+    for key, b, n, ratio, verdict in rows:
+        regressions += verdict == "REGRESSION"
+        if args.only_changes and not verdict:
+            continue
+        print(f"{key:<{width}} {b:>12.3f} {n:>12.3f} {ratio:>7.2f}x  {verdict}")
+
+    print(f"{len(rows)} métriques comparées, {regressions} régression(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# =====================================================================
+# results.py — Mesures (temps / allocations) et fichiers JSON de résultats
+# =====================================================================
+# {
+#   "meta":    {"created", "git", "python", "numpy", "pandas", "platform", ...},
+#   "results": {"<bench>": {"<cas>": {"median_ms": ..., "peak_kib": ...}}}
+# }
+# Les métriques comparées par benchmarks.compare sont celles de COMPARED
+# (plus petit = meilleur).
+# =====================================================================
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+COMPARED = ("median_ms", "best_ms", "peak_kib", "per_symbol_ms", "cycle_s", "analyze_s")
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    """Temps par appel (ms) : best / median sur `repeat` séries calibrées."""
+    number = 1
+    while timeit.timeit(fn, number=number) < min_time:
+        number *= 2
+    runs = [t / number for t in timeit.repeat(fn, number=number, repeat=max(int(repeat), 1))]
+    return {
+        "best_ms": round(min(runs) * 1e3, 4),
+        "median_ms": round(statistics.median(runs) * 1e3, 4),
+        "loops": number,
+    }
+
+
+def alloc_call(fn: Callable[[], Any]) -> Dict[str, float]:
+    """Pic d'allocation pendant un appel et mémoire encore retenue après (KiB)."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.clear_traces()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        out = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        del out
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {
+        "peak_kib": round((peak - base) / 1024.0, 1),
+        "retained_kib": round((current - base) / 1024.0, 1),
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root, capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": _git_rev(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_results(path: str, results: Dict[str, Any], **meta: Any) -> None:
+    payload = {"meta": {**environment(), **meta}, "results": results}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True, default=str)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """{"bench/cas/métrique": valeur} pour les métriques de COMPARED."""
+    flat: Dict[str, float] = {}
+    for bench, cases in results.items():
+        for case, metrics in cases.items():
+            for m, v in metrics.items():
+                if m in COMPARED and isinstance(v, (int, float)):
+                    flat[f"{bench}/{case}/{m}"] = float(v)
+    return flat
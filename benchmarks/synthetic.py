@@ -0,0 +1,84 @@
+# =====================================================================
+# synthetic.py — OHLCV synthétiques reproductibles pour les benchmarks
+# =====================================================================
+# Marche aléatoire log-normale avec régimes de tendance (pour que les
+# gates passent de temps en temps), pics de volume et OI corrélé.
+# Même (symbole, seed) → mêmes bougies, quelle que soit la machine.
+# =====================================================================
+
+from __future__ import annotations
+
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kline_cache import INTERVAL_MS
+
+SIZES = (100, 1_000, 10_000)
+UNIVERSES = (50, 500, 2_000)
+
+
+def universe_symbols(n: int) -> List[str]:
+    return [f"SYN{i:04d}USDT" for i in range(int(n))]
+
+
+def symbol_seed(symbol: str, seed: int = 7) -> int:
+    """Seed stable par symbole (crc32, indépendant de PYTHONHASHSEED)."""
+    return (zlib.crc32(symbol.encode()) ^ int(seed)) & 0x7FFFFFFF
+
+
+def synthetic_ohlcv(
+    n: int,
+    seed: int = 7,
+    tf: str = "1H",
+    end_ms: Optional[int] = None,
+    with_oi: bool = True,
+) -> pd.DataFrame:
+    """
+    n bougies `tf` dont la dernière ouvre au début de la bougie courante
+    (ou à `end_ms` arrondi au TF) : colonnes time, open, high, low, close,
+    volume (+ oi).
+    """
+    rng = np.random.default_rng(seed)
+    tf_ms = INTERVAL_MS[tf]
+    end = int(time.time() * 1000) if end_ms is None else int(end_ms)
+    last_open = end - end % tf_ms
+    t = last_open - (n - 1 - np.arange(n)) * tf_ms
+
+    # dérive par régimes (~1 changement toutes les 150 bougies)
+    drift = np.repeat(rng.normal(0.0, 0.0015, n // 150 + 1), 150)[:n]
+    close = 100.0 * np.exp(np.cumsum(drift + rng.normal(0.0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1.0 + rng.random(n) * 0.004)
+    low = np.minimum(open_, close) * (1.0 - rng.random(n) * 0.004)
+
+    volume = np.abs(rng.normal(100.0, 40.0, n))
+    volume[rng.random(n) < 0.08] *= 5.0
+
+    df = pd.DataFrame({
+        "time": t.astype(float),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    })
+    if with_oi:
+        df["oi"] = 1_000.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.002, n)))
+    return df
+
+
+def synthetic_universe(
+    n_symbols: int,
+    n_bars: int,
+    seed: int = 7,
+    tf: str = "1H",
+    end_ms: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    return {
+        sym: synthetic_ohlcv(n_bars, symbol_seed(sym + tf, seed), tf=tf, end_ms=end_ms)
+        for sym in universe_symbols(n_symbols)
+    }
@@ -0,0 +1,296 @@
+# =====================================================================
+# binance_stream.py — All-market liquidation & mark-price aggregator
+# =====================================================================
+# Background WebSocket consumer for the Binance USDⓈ-M combined stream:
+#   - !forceOrder@arr     : every liquidation order of the market
+#   - !markPrice@arr@1s   : mark / index / funding of every contract
+#
+# Keeps, per symbol:
+#   - a fixed-size rolling window of liquidations (time + count bounded)
+#     with running BUY / SELL sums → O(1) reads
+#   - the latest mark price / funding rate
+#
+# institutional_data reads it instead of polling /fapi/v1/forceOrders.
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import aiohttp
+
+from settings import (
+    BINANCE_WS_URL,
+    HTTP_RECORD_MODE,
+    LIQ_STREAM_WINDOW_S,
+    LIQ_STREAM_MAX_EVENTS,
+    LIQ_STREAM_WARMUP_S,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+STREAMS = "!forceOrder@arr/!markPrice@arr@1s"
+
+
+def _f(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# =====================================================================
+# Rolling liquidation window
+# =====================================================================
+
+class LiquidationWindow:
+    """
+    Liquidations of one symbol over the last `window_ms`, capped at
+    `max_events`. BUY / SELL sums are maintained incrementally.
+    """
+
+    __slots__ = ("window_ms", "max_events", "events", "buy", "sell")
+
+    def __init__(self, window_ms: int, max_events: int):
+        self.window_ms = int(window_ms)
+        self.max_events = max(int(max_events), 1)
+        # (ts_ms, is_buy, qty)
+        self.events: Deque[Tuple[int, bool, float]] = deque()
+        self.buy = 0.0
+        self.sell = 0.0
+
+    def _pop_left(self) -> None:
+        _, is_buy, qty = self.events.popleft()
+        if is_buy:
+            self.buy -= qty
+        else:
+            self.sell -= qty
+
+    def add(self, ts_ms: int, is_buy: bool, qty: float) -> None:
+        if self.events:
+            tail = self.events[-1][0]
+            # late frame already outside the window: ignore
+            if ts_ms < tail - self.window_ms:
+                return
+            # out-of-order frame: clamp to the tail so `events` stays
+            # sorted (evict() stops at the first in-window head)
+            ts_ms = max(ts_ms, tail)
+        if len(self.events) >= self.max_events:
+            self._pop_left()
+        self.events.append((ts_ms, is_buy, qty))
+        if is_buy:
+            self.buy += qty
+        else:
+            self.sell += qty
+
+    def evict(self, now_ms: int) -> None:
+        cutoff = now_ms - self.window_ms
+        while self.events and self.events[0][0] < cutoff:
+            self._pop_left()
+        if not self.events:
+            # resync float drift
+            self.buy = 0.0
+            self.sell = 0.0
+
+
+# =====================================================================
+# Stream consumer
+# =====================================================================
+
+class BinanceMarketStream:
+    """
+    Background consumer of the all-market liquidation and mark-price
+    streams. `handle_message` is public so recorded frames can be
+    replayed without a network connection.
+    """
+
+    def __init__(
+        self,
+        url: str = BINANCE_WS_URL,
+        window_s: float = LIQ_STREAM_WINDOW_S,
+        max_events: int = LIQ_STREAM_MAX_EVENTS,
+        warmup_s: float = LIQ_STREAM_WARMUP_S,
+    ):
+        self.url = url.rstrip("/") + "/stream?streams=" + STREAMS
+        self.window_ms = int(float(window_s) * 1000)
+        self.max_events = int(max_events)
+        self.warmup_s = float(warmup_s)
+
+        self._liq: Dict[str, LiquidationWindow] = {}
+        # symbol → (event_ts_ms, mark, index, funding_rate, next_funding_ms)
+        self._marks: Dict[str, Tuple[int, float, float, float, int]] = {}
+
+        self._task: Optional[asyncio.Task] = None
+        self._connected_since: Optional[float] = None
+        self.messages = 0
+
+    # ---------------------------------------------------------------
+    # Frame handling
+    # ---------------------------------------------------------------
+
+    def handle_message(self, payload: Dict[str, Any]) -> None:
+        """Apply one combined-stream frame ({"stream": ..., "data": ...})."""
+        self.messages += 1
+        data = payload.get("data", payload)
+
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and item.get("e") == "markPriceUpdate":
+                    self._on_mark(item)
+            return
+
+        if isinstance(data, dict):
+            event = data.get("e")
+            if event == "forceOrder":
+                self._on_force_order(data)
+            elif event == "markPriceUpdate":
+                self._on_mark(data)
+
+    def _on_force_order(self, data: Dict[str, Any]) -> None:
+        order = data.get("o") or {}
+        sym = order.get("s")
+        if not sym:
+            return
+        ts = int(order.get("T") or data.get("E") or time.time() * 1000)
+        is_buy = str(order.get("S", "")).upper() == "BUY"
+        qty = _f(order.get("q"))
+
+        win = self._liq.get(sym)
+        if win is None:
+            win = LiquidationWindow(self.window_ms, self.max_events)
+            self._liq[sym] = win
+        win.add(ts, is_buy, qty)
+
+    def _on_mark(self, item: Dict[str, Any]) -> None:
+        sym = item.get("s")
+        if not sym:
+            return
+        self._marks[sym] = (
+            int(item.get("E") or 0),
+            _f(item.get("p")),
+            _f(item.get("i")),
+            _f(item.get("r")),
+            int(_f(item.get("T"))),
+        )
+
+    # ---------------------------------------------------------------
+    # O(1) readers
+    # ---------------------------------------------------------------
+
+    def is_warm(self, now: Optional[float] = None) -> bool:
+        """Connected long enough for the rolling windows to be meaningful."""
+        if self._connected_since is None:
+            return False
+        now = time.time() if now is None else now
+        return now - self._connected_since >= self.warmup_s
+
+    def liquidations(self, symbol: str, now: Optional[float] = None) -> Dict[str, float]:
+        win = self._liq.get(symbol)
+        if win is None:
+            return {"liq_buy": 0.0, "liq_sell": 0.0, "liq_count": 0.0}
+        now_ms = int((time.time() if now is None else now) * 1000)
+        win.evict(now_ms)
+        return {
+            "liq_buy": max(win.buy, 0.0),
+            "liq_sell": max(win.sell, 0.0),
+            "liq_count": float(len(win.events)),
+        }
+
+    def mark(self, symbol: str, max_age_s: float = 10.0, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        row = self._marks.get(symbol)
+        if row is None:
+            return None
+        now_ms = (time.time() if now is None else now) * 1000
+        if now_ms - row[0] > max_age_s * 1000:
+            return None
+        return {
+            "mark_price": row[1],
+            "index_price": row[2],
+            "funding_rate": row[3],
+            "next_funding_time": float(row[4]),
+        }
+
+    # ---------------------------------------------------------------
+    # Connection loop
+    # ---------------------------------------------------------------
+
+    async def run(self) -> None:
+        """Consume the stream forever, reconnecting with backoff."""
+        backoff = 1.0
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        LOGGER.info("🔌 Binance stream connected (%s)", self.url)
+                        self._connected_since = time.time()
+                        backoff = 1.0
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                try:
+                                    self.handle_message(json.loads(msg.data))
+                                except Exception as exc:
+                                    LOGGER.debug("stream frame error: %s", exc)
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                LOGGER.warning("⚠️ Binance stream error: %s", exc)
+
+            # after a disconnect the windows have a hole → not warm again
+            self._connected_since = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2.0, 60.0)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+        self._connected_since = None
+
+
+# =====================================================================
+# SINGLETON
+# =====================================================================
+
+_stream: Optional[BinanceMarketStream] = None
+
+
+def get_market_stream() -> Optional[BinanceMarketStream]:
+    """
+    Running stream, or None when it was never started. Always None while
+    HTTP_RECORD_MODE is record / replay: stream frames are not archived,
+    so institutional_data falls back to the recorded REST endpoints.
+    """
+    if HTTP_RECORD_MODE != "off":
+        return None
+    return _stream
+
+
+def start_market_stream(url: str = BINANCE_WS_URL) -> BinanceMarketStream:
+    global _stream
+    if _stream is None:
+        _stream = BinanceMarketStream(url=url)
+    _stream.start()
+    return _stream
+
+
+async def stop_market_stream() -> None:
+    global _stream
+    if _stream is not None:
+        await _stream.stop()
+        _stream = None
@@ -3,7 +3,10 @@
 # =====================================================================
 # - Contrats : /api/v2/mix/market/contracts  (USDT-FUTURES)
 # - Candles  : /api/v3/market/candles        (USDT-FUTURES)
+#              + pagination startTime/endTime au-delà de 100 barres
+#              + cache incrémental par (symbole, interval)
 # - Symbol   : BTCUSDT, ETHUSDT, etc. (SANS suffixe)
+# - Token buckets par endpoint (doc Bitget), adaptatifs sur 429
 # - Logs détaillés sur erreurs (429, 4xx, code != 00000)
 # =====================================================================
 
@@ -17,29 +20,93 @@ import base64
 import hashlib
 import json
 import logging
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Mapping, Optional, List, Tuple
 
+import numpy as np
 import pandas as pd
 
+from http_recorder import ReplayMiss, get_http_archive, request_keys
+from kline_cache import INTERVAL_MS, KlineCache, parse_candle_rows, rows_to_frame
+from rate_limiter import EndpointRateLimiter
+from settings import (
+    KLINE_CACHE_ENABLED, KLINE_CACHE_BARS, KLINE_PAGE_CONCURRENCY,
+    BITGET_IP_LIMIT_PER_MIN, BITGET_BASE_URL,
+)
+
 LOGGER = logging.getLogger(__name__)
 
+# Bitget doc : max 100 bougies par page
+CANDLES_PAGE_SIZE = 100
+
 
 # =====================================================================
 # RETRY ENGINE
 # =====================================================================
 
-async def _async_retry(fn, retries: int = 3, base_delay: float = 0.3):
+class RateLimitedError(RuntimeError):
+    """HTTP 429 : le limiteur a déjà été pénalisé, il suffit de redemander."""
+
+
+async def _async_retry(
+    fn,
+    retries: int = 3,
+    base_delay: float = 0.3,
+    rate_limit_retries: int = 5,
+):
     """
     Petit retry générique sur exceptions réseau/JSON.
-    NE GÈRE PAS les codes 429 dans le JSON, c'est fait dans _request.
+
+    Les 429 (RateLimitedError) ont leur propre compteur et pas de backoff
+    local : l'attente est faite par le token bucket au prochain acquire().
+    Un ReplayMiss (réponse absente de l'archive HTTP) n'est pas retenté.
     """
-    for attempt in range(retries + 1):
+    attempt = 0
+    throttled = 0
+    while True:
         try:
             return await fn()
-        except Exception as exc:
+        except ReplayMiss:
+            raise
+        except RateLimitedError:
+            throttled += 1
+            if throttled > rate_limit_retries:
+                raise
+        except Exception:
             if attempt >= retries:
                 raise
             await asyncio.sleep(base_delay * (2 ** attempt))
+            attempt += 1
+
+
+# =====================================================================
+# RATE LIMITS (doc Bitget)
+# =====================================================================
+
+# Limites par endpoint : (requêtes/s, burst)
+BITGET_ENDPOINT_LIMITS = {
+    "/api/v2/mix/market/contracts": (20.0, 20.0),      # 20 req/s/IP
+    "/api/v3/market/candles": (20.0, 20.0),            # 20 req/s/IP
+    "/api/v2/mix/order/place-order": (10.0, 10.0),     # 10 req/s/UID
+    "/api/v2/mix/order/place-plan-order": (10.0, 10.0),
+}
+
+_bitget_limiter: Optional[EndpointRateLimiter] = None
+
+
+def bitget_rate_limiter() -> EndpointRateLimiter:
+    """
+    Limiteur partagé par toutes les instances (client + trader) :
+    les quotas IP sont communs au process.
+    """
+    global _bitget_limiter
+    if _bitget_limiter is None:
+        _bitget_limiter = EndpointRateLimiter(
+            BITGET_ENDPOINT_LIMITS,
+            default=(10.0, 10.0),
+            global_limit=(BITGET_IP_LIMIT_PER_MIN / 60.0, BITGET_IP_LIMIT_PER_MIN / 60.0),
+            name="bitget",
+        )
+    return _bitget_limiter
 
 
 # =====================================================================
@@ -69,7 +136,7 @@ def normalize_symbol(sym: str) -> str:
 # =====================================================================
 
 class BitgetClient:
-    BASE = "https://api.bitget.com"
+    BASE = BITGET_BASE_URL
 
     def __init__(self, api_key: str, api_secret: str, passphrase: str):
         self.api_key = api_key
@@ -82,6 +149,17 @@ class BitgetClient:
         self._contracts_cache: Optional[List[str]] = None
         self._contracts_ts: float = 0.0
 
+        # token buckets par endpoint (attente au lieu de 429)
+        self._limiter = bitget_rate_limiter()
+
+        # pages d'historique profond demandées en parallèle
+        self._page_sem = asyncio.Semaphore(max(int(KLINE_PAGE_CONCURRENCY), 1))
+
+        # cache bougies incrémental (symbole, interval) → ring buffer
+        self._kline_cache: Optional[KlineCache] = (
+            KlineCache(min_capacity=int(KLINE_CACHE_BARS)) if KLINE_CACHE_ENABLED else None
+        )
+
     # ---------------------------------------------------------------
 
     async def _ensure_session(self):
@@ -108,7 +186,11 @@ class BitgetClient:
         auth: bool = True,
     ) -> Dict[str, Any]:
         """
-        Wrapper générique Bitget avec logging et retry.
+        Wrapper générique Bitget avec logging, rate limit et retry.
+
+        Chaque tentative attend d'abord sa place dans les token buckets
+        (endpoint + global IP). Un 429 pénalise le bucket et la requête
+        est simplement redemandée.
         """
         await self._ensure_session()
 
@@ -123,6 +205,8 @@ class BitgetClient:
         body = json.dumps(data, separators=(",", ":")) if data else ""
 
         async def _do():
+            await self._limiter.acquire(path)
+
             ts = str(int(time.time() * 1000))
             headers: Dict[str, str] = {}
 
@@ -136,41 +220,66 @@ class BitgetClient:
                     "Content-Type": "application/json",
                 }
 
-            async with self.session.request(
-                method.upper(),
-                url,
-                headers=headers,
-                data=body if data else None,
-            ) as resp:
-
-                txt = await resp.text()
-                status = resp.status
-
-                if status == 429:
-                    LOGGER.error(
-                        "HTTP 429 %s %s params=%s body=%s raw=%s",
-                        method, path, params, body, txt,
-                    )
-                    # on remonte l'erreur pour que _async_retry gère le backoff
-                    raise RuntimeError("HTTP 429 Too Many Requests")
-
-                if status >= 400:
-                    LOGGER.error(
-                        "HTTP %s %s %s params=%s body=%s raw=%s",
-                        status, method, path, params, body, txt,
-                    )
-                    raise RuntimeError(f"HTTP {status}")
-
-                try:
-                    js = json.loads(txt)
-                except Exception:
-                    LOGGER.error("❌ JSON ERROR %s %s → %s", method, path, txt)
-                    raise
-
-                return js
+            status, resp_headers, txt = await self._send(
+                method.upper(), url, headers, body if data else None,
+                request_keys("bitget", method, path, params, data),
+            )
+
+            if status == 429:
+                LOGGER.warning(
+                    "HTTP 429 %s %s params=%s body=%s raw=%s",
+                    method, path, params, body, txt,
+                )
+                # le bucket attend Retry-After / ralentit, puis on redemande
+                self._limiter.on_throttled(path, resp_headers)
+                raise RateLimitedError("HTTP 429 Too Many Requests")
+
+            self._limiter.on_response(path, resp_headers)
+
+            if status >= 400:
+                LOGGER.error(
+                    "HTTP %s %s %s params=%s body=%s raw=%s",
+                    status, method, path, params, body, txt,
+                )
+                raise RuntimeError(f"HTTP {status}")
+
+            try:
+                js = json.loads(txt)
+            except Exception:
+                LOGGER.error("❌ JSON ERROR %s %s → %s", method, path, txt)
+                raise
+
+            return js
 
         return await _async_retry(_do)
 
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        keys: Tuple[str, str],
+    ) -> Tuple[int, Mapping[str, str], str]:
+        """
+        Un échange HTTP → (status, headers, texte).
+
+        HTTP_RECORD_MODE=replay : servi depuis l'archive, sans réseau ;
+        record : la réponse est ajoutée à l'archive.
+        """
+        archive = get_http_archive()
+        if archive is not None and archive.replaying:
+            return await archive.replay(keys)
+
+        t0 = time.perf_counter()
+        async with self.session.request(method, url, headers=headers, data=body) as resp:
+            txt = await resp.text()
+            status, resp_headers = resp.status, resp.headers
+
+        if archive is not None:
+            archive.record(keys, status, resp_headers, txt, time.perf_counter() - t0)
+        return status, resp_headers, txt
+
     # =================================================================
     # CONTRACT LIST (v2)
     # =================================================================
@@ -213,41 +322,29 @@ class BitgetClient:
     # CANDLES (v3)
     # =================================================================
 
-    async def get_klines_df(
+    async def _fetch_candle_rows(
         self,
         symbol: str,
-        tf: str = "1H",
-        limit: int = 200,
-    ) -> pd.DataFrame:
+        interval: str,
+        limit: int,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+    ) -> Optional[np.ndarray]:
         """
-        Candles v3 :
-        GET /api/v3/market/candles
-        params:
-          category=USDT-FUTURES
-          symbol=BTCUSDT
-          interval=1H
-          type=market
-          limit<=100
+        Un appel GET /api/v3/market/candles → array (n x 6) trié.
+        Retourne None en cas d'erreur (déjà loggée).
         """
-        interval = tf.upper()
-        valid_intervals = {
-            "1M", "3M", "5M", "15M", "30M",
-            "1H", "4H", "6H", "12H", "1D",
-        }
-        if interval not in valid_intervals:
-            LOGGER.error("❌ INVALID INTERVAL %s (symbol=%s)", tf, symbol)
-            return pd.DataFrame()
-
-        # Bitget doc : max 100 par page (on se cale à 100)
-        limit_int = max(10, min(int(limit), 100))
-
         params = {
             "category": "USDT-FUTURES",
             "symbol": normalize_symbol(symbol),
             "interval": interval,
             "type": "market",
-            "limit": str(limit_int),
+            "limit": str(limit),
         }
+        if start_ts is not None:
+            params["startTime"] = str(int(start_ts))
+        if end_ts is not None:
+            params["endTime"] = str(int(end_ts))
 
         try:
             js = await self._request(
@@ -261,11 +358,11 @@ class BitgetClient:
                 "❌ REQUEST ERROR candles %s(%s) params=%s exc=%s",
                 symbol, interval, params, exc,
             )
-            return pd.DataFrame()
+            return None
 
         if not isinstance(js, dict):
             LOGGER.error("❌ NON-DICT RESPONSE candles %s(%s) → %s", symbol, interval, js)
-            return pd.DataFrame()
+            return None
 
         code = js.get("code")
         data = js.get("data")
@@ -275,32 +372,122 @@ class BitgetClient:
                 "⚠️ EMPTY/ERROR KLINES for %s (%s) → RAW=%s",
                 symbol, interval, js,
             )
-            return pd.DataFrame()
+            return None
 
         try:
-            # data[i] = [
-            #   ts, open, high, low, close, volume, turnover
-            # ]
-            cols = ["time", "open", "high", "low", "close", "volume", "turnover"]
-            df = pd.DataFrame(data, columns=cols[: len(data[0])])
+            # data[i] = [ts, open, high, low, close, volume, turnover]
+            return parse_candle_rows(data)
+        except Exception as exc:
+            LOGGER.exception("❌ PARSE ERROR candles %s(%s): %s", symbol, interval, exc)
+            return None
 
-            # conversion float
-            for c in ["time", "open", "high", "low", "close", "volume"]:
-                df[c] = df[c].astype(float)
+    async def _fetch_candle_history(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+    ) -> Tuple[Optional[np.ndarray], bool]:
+        """
+        Historique profond : découpe [now - limit*tf, now] en fenêtres de
+        100 bougies (startTime/endTime) demandées en parallèle, puis
+        recolle + dédoublonne en un seul bloc contigu.
 
-            df.rename(columns={"time": "ts"}, inplace=True)
-            df.sort_values("ts", inplace=True)
-            df.rename(columns={"ts": "time"}, inplace=True)
+        Si une page échoue (ou est vide : contrat trop récent), on ne garde
+        que les pages plus récentes qu'elle, pour rester contigu.
 
-            # on garde juste OHLCV
-            df = df[["time", "open", "high", "low", "close", "volume"]]
+        Retourne (rows, exhausted) ; exhausted=True quand la page la plus
+        ancienne est incomplète (l'exchange n'a pas plus d'historique).
+        """
+        if limit <= CANDLES_PAGE_SIZE:
+            rows = await self._fetch_candle_rows(symbol, interval, limit)
+            return rows, rows is not None and rows.shape[0] < limit
+
+        tf_ms = INTERVAL_MS[interval]
+        span = CANDLES_PAGE_SIZE * tf_ms
+        now_ms = int(time.time() * 1000)
+        n_pages = -(-limit // CANDLES_PAGE_SIZE)
+
+        async def _page(k: int) -> Optional[np.ndarray]:
+            end_ts = now_ms - k * span
+            async with self._page_sem:
+                return await self._fetch_candle_rows(
+                    symbol, interval, CANDLES_PAGE_SIZE,
+                    start_ts=end_ts - span + 1, end_ts=end_ts,
+                )
+
+        pages = await asyncio.gather(*[_page(k) for k in range(n_pages)])
+
+        chunks: List[np.ndarray] = []
+        for rows in pages:
+            if rows is None or rows.shape[0] == 0:
+                break
+            chunks.append(rows)
+
+        if not chunks:
+            return None, False
+
+        exhausted = chunks[-1].shape[0] < CANDLES_PAGE_SIZE
+        stitched = parse_candle_rows(np.concatenate(chunks[::-1]))
+        return stitched[-limit:], exhausted
 
-            return df.reset_index(drop=True)
+    async def get_klines_df(
+        self,
+        symbol: str,
+        tf: str = "1H",
+        limit: int = 200,
+    ) -> pd.DataFrame:
+        """
+        Candles v3 :
+        GET /api/v3/market/candles
+        params:
+          category=USDT-FUTURES
+          symbol=BTCUSDT
+          interval=1H
+          type=market
+          limit<=100 par page
+          startTime / endTime (pagination + mode incrémental)
 
-        except Exception as exc:
-            LOGGER.exception("❌ PARSE ERROR candles %s(%s): %s", symbol, interval, exc)
+        `limit` > 100 : plusieurs pages sont demandées en parallèle
+        (voir _fetch_candle_history).
+
+        Cache : après un premier chargement complet, on ne demande plus que
+        les barres >= dernier ts connu ; la bougie ouverte est écrasée en
+        place dans le ring buffer (voir kline_cache.py).
+        """
+        interval = tf.upper()
+        if interval not in INTERVAL_MS:
+            LOGGER.error("❌ INVALID INTERVAL %s (symbol=%s)", tf, symbol)
             return pd.DataFrame()
 
+        limit_int = max(10, int(limit))
+        sym = normalize_symbol(symbol)
+
+        buf = self._kline_cache.get(sym, interval) if self._kline_cache is not None else None
+
+        if buf is not None and buf.covers(limit_int):
+            # barres manquantes depuis le dernier ts (bougie ouverte incluse)
+            tf_ms = INTERVAL_MS[interval]
+            missing = int((time.time() * 1000 - buf.last_ts) // tf_ms) + 1
+
+            if missing < CANDLES_PAGE_SIZE:
+                rows = await self._fetch_candle_rows(
+                    sym, interval, min(missing + 1, CANDLES_PAGE_SIZE), start_ts=buf.last_ts,
+                )
+                if rows is None:
+                    return pd.DataFrame()
+                buf.merge(rows)
+                return buf.to_frame(limit_int)
+
+        # Chargement complet (warm-up, trou trop grand ou cache désactivé)
+        rows, exhausted = await self._fetch_candle_history(sym, interval, limit_int)
+        if rows is None:
+            return pd.DataFrame()
+
+        if self._kline_cache is not None:
+            self._kline_cache.store(sym, interval, rows, capacity=limit_int, exhausted=exhausted)
+
+        return rows_to_frame(rows[-limit_int:])
+
 
 # =====================================================================
 # SINGLETON
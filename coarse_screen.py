@@ -0,0 +1,156 @@
+# =====================================================================
+# coarse_screen.py — Pré-filtre bon marché avant l'analyse profonde
+# =====================================================================
+# La grande majorité des symboles est rejetée dès les deux premières
+# gates de SignalAnalyzer :
+#   1. "No clear trend (RANGE)"  (tendance EMA20/50 H1)
+#   2. "HTF trend veto"          (tendance EMA20/50 H4 opposée)
+#
+# Phase 1 (screen) : petite fenêtre H1 / H4 (une seule page de bougies,
+# servie par le cache incrémental) + tendance EMA du panel → éligible ?
+# Phase 2 : fetch profond, structure, institutionnel (6 appels) et
+# sorties uniquement pour les survivants.
+#
+# La fenêtre courte change l'amorçage des EMA (ewm adjust=False) : les
+# labels peuvent différer de l'analyse profonde au voisinage immédiat
+# d'un croisement EMA20/50. Les survivants repassent de toute façon par
+# les gates exactes.
+#
+# PhaseCounters : taux de passage par phase (screen, cpu_gates,
+# institutional) → log à chaque passe.
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from panel import IndicatorPanel
+from scan_scheduler import drop_open_bar
+from settings import SCREEN_H1_BARS, SCREEN_H4_BARS
+
+LOGGER = logging.getLogger(__name__)
+
+# même garde-fou que structure_utils.htf_trend_ok
+HTF_MIN_BARS = 40
+
+
+# =====================================================================
+# COMPTEURS PAR PHASE
+# =====================================================================
+
+class PhaseCounters:
+    """Entrées / sorties par phase, dans l'ordre d'enregistrement."""
+
+    def __init__(self):
+        self.seen: Dict[str, int] = {}
+        self.passed: Dict[str, int] = {}
+
+    def record(self, phase: str, ok: bool) -> None:
+        self.seen[phase] = self.seen.get(phase, 0) + 1
+        self.passed[phase] = self.passed.get(phase, 0) + (1 if ok else 0)
+
+    def pass_rate(self, phase: str) -> Optional[float]:
+        n = self.seen.get(phase, 0)
+        return self.passed.get(phase, 0) / n if n else None
+
+    def report(self) -> str:
+        parts = []
+        for phase, n in self.seen.items():
+            p = self.passed.get(phase, 0)
+            parts.append(f"{phase} {p}/{n} ({p / n:.0%})")
+        return " → ".join(parts) if parts else "aucune analyse"
+
+    def reset(self) -> None:
+        self.seen.clear()
+        self.passed.clear()
+
+
+# =====================================================================
+# VERDICT
+# =====================================================================
+
+def screen_verdict(trend_h1: str, trend_h4: str, h4_bars: int) -> Optional[str]:
+    """Motif de rejet des gates 1-2 (mêmes libellés que SignalAnalyzer), ou None."""
+    if trend_h1 not in ("LONG", "SHORT"):
+        return "No clear trend (RANGE)"
+    if h4_bars >= HTF_MIN_BARS:
+        if trend_h4 == "LONG" and trend_h1 == "SHORT":
+            return "HTF trend veto"
+        if trend_h4 == "SHORT" and trend_h1 == "LONG":
+            return "HTF trend veto"
+    return None
+
+
+def screen_frames(frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]) -> Dict[str, Optional[str]]:
+    """{symbol: (df_h1, df_h4)} courts → {symbol: motif de rejet ou None}."""
+    panel_h1 = IndicatorPanel.from_frames({s: f[0] for s, f in frames.items()})
+    panel_h4 = IndicatorPanel.from_frames({s: f[1] for s, f in frames.items()})
+
+    out: Dict[str, Optional[str]] = {}
+    for sym, (df_h1, df_h4) in frames.items():
+        v1 = panel_h1.view(sym)
+        v4 = panel_h4.view(sym)
+        trend_h1 = v1["trend"] if v1 is not None else "RANGE"
+        trend_h4 = v4["trend"] if v4 is not None else "RANGE"
+        out[sym] = screen_verdict(trend_h1, trend_h4, len(df_h4))
+    return out
+
+
+# =====================================================================
+# PHASE 1 — SCREEN DE L'UNIVERS
+# =====================================================================
+
+async def coarse_screen(
+    symbols,
+    client,
+    semaphore,
+    counters: Optional[PhaseCounters] = None,
+    tracker=None,
+    closed_only: bool = False,
+) -> List[str]:
+    """
+    Fenêtre courte (SCREEN_H1_BARS / SCREEN_H4_BARS) pour chaque symbole,
+    tendances H1 / H4 via le panel → symboles éligibles à l'analyse profonde.
+
+    Le tracker de bougies clôturées est appliqué ici (les symboles déjà
+    analysés sur cette bougie ne sont même pas screenés).
+    """
+
+    async def _fetch(sym: str):
+        async with semaphore:
+            try:
+                df_h1 = await client.get_klines_df(sym, "1H", int(SCREEN_H1_BARS))
+                df_h4 = await client.get_klines_df(sym, "4H", int(SCREEN_H4_BARS))
+                return sym, (df_h1, df_h4)
+            except Exception as e:
+                LOGGER.error(f"[{sym}] screen fetch error: {e}")
+                return sym, None
+
+    frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+    for sym, pair in await asyncio.gather(*[_fetch(s) for s in symbols]):
+        if pair is None or pair[0].empty or pair[1].empty:
+            continue
+        df_h1, df_h4 = pair
+        if tracker is not None and not tracker.update(sym, df_h1):
+            continue
+        if closed_only:
+            df_h1 = drop_open_bar(df_h1, "1H")
+            df_h4 = drop_open_bar(df_h4, "4H")
+        frames[sym] = (df_h1, df_h4)
+
+    verdicts = screen_frames(frames)
+    survivors = []
+    for sym, reject in verdicts.items():
+        if counters is not None:
+            counters.record("screen", reject is None)
+        if reject is None:
+            survivors.append(sym)
+        else:
+            LOGGER.debug(f"[SCREEN] {sym} → {reject}")
+
+    LOGGER.info(f"🔎 [SCREEN] {len(survivors)}/{len(frames)} symboles éligibles à l'analyse profonde")
+    return survivors
@@ -0,0 +1,190 @@
+# =====================================================================
+# feature_context.py — Features mémoïsées par (symbole, TF, dernière bougie)
+# =====================================================================
+# Une analyse complète relance find_swings, detect_equal_levels,
+# true_atr et les EMA20/50 dans structure_utils, indicators, stops et
+# tp_clamp. FeatureContext calcule chaque feature une seule fois, à la
+# demande, puis la partage entre tous ces modules.
+#
+# Usage :
+#   ctx = get_feature_context(df_h1, symbol, "1H")
+#   analyze_structure(df_h1, ctx=ctx)
+#   protective_stop_long(df_h1, entry, tick, ctx=ctx)
+#
+# Les fonctions n'utilisent le contexte que si ctx.covers(df) (même
+# DataFrame) ; sinon elles calculent comme avant. Les valeurs renvoyées
+# sont partagées : ne pas les modifier en place.
+# =====================================================================
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import pandas as pd
+
+from indicators import ema, macd, rsi, true_atr
+from structure_utils import _trend_label, detect_equal_levels, find_swings
+from indicator_engine import engine_frame_series, update_from_frame
+from settings import FEATURE_CTX_CACHE_SIZE, INDICATOR_ENGINE_ENABLED
+
+
+def frame_key(df: pd.DataFrame) -> Tuple:
+    """
+    Empreinte légère d'une série : longueur + horodatage de la première
+    bougie (fenêtre décalée / backfill) + dernière bougie complète.
+    """
+    if df is None or len(df) == 0:
+        return (0,)
+    last = df.iloc[-1]
+    first = (float(df["time"].iloc[0]),) if "time" in df.columns else ()
+    return (len(df),) + first + tuple(
+        float(last[c]) for c in ("time", "open", "high", "low", "close", "volume") if c in df.columns
+    )
+
+
+class FeatureContext:
+    """
+    Features paresseuses d'un DataFrame OHLCV.
+
+    Chaque accesseur est calculé au premier appel puis mémoïsé par
+    paramètres ; les résultats sont identiques à ceux des fonctions
+    d'origine appelées sans contexte.
+    """
+
+    __slots__ = ("df", "symbol", "tf", "key", "_memo", "hits", "misses")
+
+    def __init__(self, df: pd.DataFrame, symbol: str = "", tf: str = ""):
+        self.df = df
+        self.symbol = symbol
+        self.tf = tf
+        self.key = frame_key(df)
+        self._memo: Dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def covers(self, df: pd.DataFrame) -> bool:
+        return df is self.df
+
+    def _get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        try:
+            value = self._memo[key]
+            self.hits += 1
+            return value
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self._memo[key] = value
+            return value
+
+    # ---------------------------------------------------------------
+    # Colonnes
+    # ---------------------------------------------------------------
+
+    def close(self) -> pd.Series:
+        return self._get("close", lambda: self.df["close"].astype(float))
+
+    # ---------------------------------------------------------------
+    # Structure
+    # ---------------------------------------------------------------
+
+    def swings(self, left: int = 3, right: int = 3) -> Dict[str, List[Tuple[int, float]]]:
+        return self._get(("swings", left, right), lambda: find_swings(self.df, left=left, right=right))
+
+    def equal_levels(self, left: int = 3, right: int = 3, max_window: int = 200) -> Dict[str, List[float]]:
+        return self._get(
+            ("equal_levels", left, right, max_window),
+            lambda: detect_equal_levels(self.df, left=left, right=right, max_window=max_window),
+        )
+
+    def trend(self, fast: int = 20, slow: int = 50) -> str:
+        def _compute() -> str:
+            if len(self.df) < slow + 5:
+                return "RANGE"
+            return _trend_label(self.ema(fast), self.ema(slow))
+
+        return self._get(("trend", fast, slow), _compute)
+
+    # ---------------------------------------------------------------
+    # Indicateurs
+    # ---------------------------------------------------------------
+
+    def ema(self, length: int) -> pd.Series:
+        return self._get(("ema", length), lambda: ema(self.close(), length))
+
+    def rsi(self, length: int = 14) -> pd.Series:
+        return self._get(("rsi", length), lambda: rsi(self.close(), length=length))
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        return self._get(("macd", fast, slow, signal), lambda: macd(self.close(), fast, slow, signal))
+
+    def atr(self, length: int = 14) -> pd.Series:
+        return self._get(("atr", length), lambda: true_atr(self.df, length=length))
+
+    def seed(self, values: Dict[Hashable, Any]) -> None:
+        """Injecte des features déjà calculées ailleurs (moteur incrémental, panel)."""
+        self._memo.update(values)
+
+    def seed_from_engine(self, eng) -> bool:
+        """Pré-remplit EMA / RSI / MACD / ATR depuis un IndicatorEngine à jour."""
+        series = engine_frame_series(eng, self.df)
+        if series is None:
+            return False
+        values: Dict[Hashable, Any] = {("ema", L): series[f"ema{L}"] for L in eng.ema_lengths}
+        values[("rsi", eng.rsi_length)] = series["rsi"]
+        values[("macd",) + tuple(eng.macd_params)] = (series["macd"], series["signal"], series["hist"])
+        values[("atr", eng.atr_length)] = series["atr"]
+        self.seed(values)
+        return True
+
+
+# =====================================================================
+# LRU des contextes
+# =====================================================================
+
+_CONTEXTS: "OrderedDict[Tuple[str, str], FeatureContext]" = OrderedDict()
+# l'analyse peut tourner dans un pool de threads (analysis_worker)
+_LOCK = threading.Lock()
+
+
+def get_feature_context(df: pd.DataFrame, symbol: str = "", tf: str = "") -> FeatureContext:
+    """
+    Contexte de (symbol, tf). Réutilisé tant que la dernière bougie n'a
+    pas changé (les features de la bougie ouverte sont recalculées dès
+    qu'un tick la modifie).
+
+    Un contexte en cache n'est jamais modifié (il peut servir à une
+    analyse en cours dans un autre thread) : pour un autre DataFrame de
+    même empreinte, un nouveau contexte reprend une copie de ses features.
+    """
+    slot = (symbol, tf)
+    key = frame_key(df)
+    with _LOCK:
+        cached = _CONTEXTS.get(slot)
+        if cached is not None and symbol and cached.key == key:
+            if cached.df is df:
+                _CONTEXTS.move_to_end(slot)
+                return cached
+            ctx = FeatureContext(df, symbol=symbol, tf=tf)
+            ctx.seed(dict(cached._memo))
+            _CONTEXTS[slot] = ctx
+            _CONTEXTS.move_to_end(slot)
+            return ctx
+
+    ctx = FeatureContext(df, symbol=symbol, tf=tf)
+    if symbol and INDICATOR_ENGINE_ENABLED:
+        eng = update_from_frame(symbol, tf, df)
+        if eng is not None:
+            ctx.seed_from_engine(eng)
+    if symbol:
+        with _LOCK:
+            _CONTEXTS[slot] = ctx
+            while len(_CONTEXTS) > max(int(FEATURE_CTX_CACHE_SIZE), 1):
+                _CONTEXTS.popitem(last=False)
+    return ctx
+
+
+def clear_feature_contexts() -> None:
+    with _LOCK:
+        _CONTEXTS.clear()
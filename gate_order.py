@@ -0,0 +1,107 @@
+# =====================================================================
+# gate_order.py — Ordre des gates de SignalAnalyzer selon coût / rejet
+# =====================================================================
+# Le signal est valide si TOUTES les gates passent : l'ordre ne change
+# pas la décision, seulement le coût moyen d'un rejet. Pour des filtres
+# indépendants, l'ordre qui minimise le coût attendu trie les gates par
+# coût / probabilité de rejet croissant.
+#
+# GateModel garde, par gate, une EWMA du coût (ms) et du taux de rejet
+# (conditionnel : la gate n'est mesurée que lorsqu'elle est atteinte).
+# Priors identiques → ordre historique conservé tant qu'il n'y a pas de
+# mesure.
+#
+# Les gates réseau (institutionnel) ne sont jamais dans l'ordre adaptatif :
+# elles passent après toutes les gates CPU.
+# =====================================================================
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ordre historique des gates CPU (après la tendance H1, qui fixe le biais)
+# "trend" fixe le biais dont dépendent toutes les autres → toujours en tête
+LEAD_GATES: Tuple[str, ...] = ("trend",)
+DEFAULT_GATE_ORDER: Tuple[str, ...] = ("htf", "bos", "momentum", "extension", "rr")
+NETWORK_GATES: Tuple[str, ...] = ("institutional",)
+
+PRIOR_COST_MS = 1.0
+PRIOR_REJECT = 0.5
+MIN_REJECT = 1e-3
+
+
+class _GateStat:
+    __slots__ = ("cost_ms", "reject", "calls", "rejects", "total_ms")
+
+    def __init__(self):
+        self.cost_ms = PRIOR_COST_MS
+        self.reject = PRIOR_REJECT
+        # compteurs du cycle en cours
+        self.calls = 0
+        self.rejects = 0
+        self.total_ms = 0.0
+
+
+class GateModel:
+    """EWMA coût / taux de rejet par gate → ordre d'évaluation."""
+
+    def __init__(self, gates: Sequence[str] = DEFAULT_GATE_ORDER, alpha: float = 0.1, adaptive: bool = True):
+        self.gates: Tuple[str, ...] = tuple(gates)
+        self.alpha = float(alpha)
+        self.adaptive = bool(adaptive)
+        self._stats: Dict[str, _GateStat] = {
+            g: _GateStat() for g in LEAD_GATES + self.gates + NETWORK_GATES
+        }
+        # record() peut venir de plusieurs tâches / threads
+        self._lock = threading.Lock()
+
+    def record(self, gate: str, cost_s: float, rejected: bool) -> None:
+        ms = float(cost_s) * 1000.0
+        with self._lock:
+            st = self._stats.setdefault(gate, _GateStat())
+            a = self.alpha
+            st.cost_ms += a * (ms - st.cost_ms)
+            st.reject += a * ((1.0 if rejected else 0.0) - st.reject)
+            st.calls += 1
+            st.rejects += 1 if rejected else 0
+            st.total_ms += ms
+
+    def record_timings(self, timings: Dict[str, float], rejected_by: Optional[str] = None) -> None:
+        """timings {gate: secondes} d'une évaluation ; `rejected_by` = gate fatale."""
+        for gate, cost_s in timings.items():
+            self.record(gate, cost_s, gate == rejected_by)
+
+    def score(self, gate: str) -> float:
+        st = self._stats[gate]
+        return st.cost_ms / max(st.reject, MIN_REJECT)
+
+    def order(self) -> List[str]:
+        """Gates CPU triées par coût / p(rejet) ; tri stable sur l'ordre historique."""
+        with self._lock:
+            return self._order()
+
+    def _order(self) -> List[str]:
+        return sorted(self.gates, key=self.score) if self.adaptive else list(self.gates)
+
+    def report(self) -> str:
+        """Résumé du cycle : appels, taux de rejet, coût moyen, EWMA."""
+        parts = []
+        with self._lock:
+            for gate in list(LEAD_GATES) + self._order() + list(NETWORK_GATES):
+                st = self._stats.get(gate)
+                if st is None or st.calls == 0:
+                    continue
+                parts.append(
+                    f"{gate}: {st.calls} appels, rejet {st.rejects / st.calls:.0%}, "
+                    f"{st.total_ms / st.calls:.2f} ms (ewma {st.cost_ms:.2f} ms / {st.reject:.0%})"
+                )
+        return " | ".join(parts) if parts else "aucune gate évaluée"
+
+    def reset_cycle(self) -> None:
+        """Remet à zéro les compteurs du cycle (les EWMA sont conservées)."""
+        with self._lock:
+            for st in self._stats.values():
+                st.calls = 0
+                st.rejects = 0
+                st.total_ms = 0.0
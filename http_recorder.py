@@ -0,0 +1,260 @@
+# =====================================================================
+# http_recorder.py — Enregistrement / rejeu des réponses HTTP
+# =====================================================================
+# HTTP_RECORD_MODE :
+#   off     : comportement normal (défaut)
+#   record  : chaque réponse Bitget (BitgetClient._request) et Binance
+#             (institutional_data._fetch_json) est ajoutée à l'archive
+#             HTTP_ARCHIVE_PATH (JSONL gzip, une ligne par échange :
+#             clé, statut, en-têtes de rate limit, durée, corps)
+#   replay  : aucune requête réseau, les réponses sont servies depuis
+#             l'archive après la durée d'origine / HTTP_REPLAY_SPEED
+#             (0 = sans attente)
+#
+# Clés : source + méthode + chemin + paramètres triés (+ corps JSON sans
+# clientOid). startTime / endTime dépendent de l'heure de la requête :
+# ils entrent dans la clé exacte en minutes relatives à "maintenant",
+# et une clé lâche (sans eux) sert de repli. Plusieurs réponses pour
+# une même clé sont servies dans l'ordre d'enregistrement ; une fois
+# épuisées, la dernière est resservie.
+#
+# Les horodatages des bougies restent ceux de l'enregistrement : pour
+# des cycles identiques au bit près, rejouer depuis un process neuf le
+# même nombre de cycles que l'enregistrement.
+#
+# Seul le HTTP est archivé, pas le stream WebSocket Binance
+# (binance_stream) : en record comme en replay, le scanner ne le démarre
+# pas et get_market_stream() renvoie None, donc liquidations / mark /
+# funding viennent des endpoints REST enregistrés.
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+from settings import HTTP_ARCHIVE_PATH, HTTP_RECORD_MODE, HTTP_REPLAY_SPEED
+
+LOGGER = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+
+VOLATILE_PARAMS = ("startTime", "endTime")
+VOLATILE_BODY = ("clientOid",)
+TIME_QUANTUM_MS = 60_000
+
+# en-têtes utiles aux limiteurs (le reste n'est pas archivé)
+KEPT_HEADERS = ("Retry-After", "X-MBX-USED-WEIGHT-1M", "X-RateLimit-Remaining", "X-RateLimit-Limit")
+
+FLUSH_EVERY = 256
+
+
+class ReplayMiss(RuntimeError):
+    """Aucune réponse archivée pour cette requête (mode replay)."""
+
+
+def request_keys(
+    src: str,
+    method: str,
+    path: str,
+    params: Optional[Mapping[str, Any]] = None,
+    body: Optional[Mapping[str, Any]] = None,
+    now_ms: Optional[float] = None,
+) -> Tuple[str, str]:
+    """(clé exacte, clé lâche) d'une requête."""
+    params = params or {}
+    now_ms = time.time() * 1000 if now_ms is None else now_ms
+
+    fixed = sorted((k, str(v)) for k, v in params.items() if k not in VOLATILE_PARAMS)
+    loose = f"{src} {method.upper()} {path}?{urlencode(fixed)}"
+    if body:
+        stable = {k: v for k, v in body.items() if k not in VOLATILE_BODY}
+        digest = hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        loose += f"#{digest}"
+
+    rel = []
+    for k in VOLATILE_PARAMS:
+        if k in params:
+            try:
+                rel.append(f"{k}{round((float(params[k]) - now_ms) / TIME_QUANTUM_MS):+d}m")
+            except (TypeError, ValueError):
+                rel.append(f"{k}={params[k]}")
+    exact = loose + ("|" + ",".join(rel) if rel else "")
+    return exact, loose
+
+
+class HttpArchive:
+    """Archive JSONL gzip ; un seul mode (record ou replay) par instance."""
+
+    def __init__(self, path: str, mode: str, speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unsupported HTTP archive mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = max(float(speed), 0.0)
+        self._lock = threading.Lock()
+        # record
+        self._buffer: List[str] = []
+        self.recorded = 0
+        # replay : clé → file de réponses (+ dernière réponse servie)
+        self._exact: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._loose: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self.served = 0
+        self.fallbacks = 0
+        self.misses = 0
+
+        if mode == "record":
+            # nouvelle archive à chaque enregistrement
+            if os.path.exists(path):
+                os.remove(path)
+            self._buffer.append(json.dumps({"meta": {"created": time.time(), "version": 1}}))
+        else:
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # =================================================================
+    # RECORD
+    # =================================================================
+
+    def record(
+        self,
+        keys: Tuple[str, str],
+        status: int,
+        headers: Optional[Mapping[str, str]],
+        text: str,
+        elapsed_s: float,
+    ) -> None:
+        kept = {h: headers[h] for h in KEPT_HEADERS if headers and headers.get(h) is not None}
+        line = json.dumps(
+            {"k": keys[0], "lk": keys[1], "s": int(status), "h": kept, "t": round(float(elapsed_s), 4), "b": text},
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self._buffer.append(line)
+            self.recorded += 1
+            if len(self._buffer) >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        # gzip multi-membres : chaque flush ajoute un membre, relu d'un bloc
+        with gzip.open(self.path, "at", encoding="utf-8") as fh:
+            fh.write("\n".join(self._buffer) + "\n")
+        self._buffer.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    # =================================================================
+    # REPLAY
+    # =================================================================
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"HTTP archive not found: {self.path}")
+        n = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            for raw in fh:
+                if not raw.strip():
+                    continue
+                entry = json.loads(raw)
+                if "meta" in entry:
+                    continue
+                self._exact.setdefault(entry["k"], deque()).append(entry)
+                self._loose.setdefault(entry["lk"], deque()).append(entry)
+                n += 1
+        LOGGER.info(f"📼 [HTTP] replay de {n} réponses depuis {self.path}")
+
+    def _take(self, keys: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        exact, loose = keys
+        with self._lock:
+            for key, index, is_fallback in ((exact, self._exact, False), (loose, self._loose, True)):
+                q = index.get(key)
+                while q:
+                    entry = q.popleft()
+                    if entry.get("_used"):
+                        continue
+                    entry["_used"] = True
+                    self._last[exact] = self._last[loose] = entry
+                    self.served += 1
+                    self.fallbacks += is_fallback
+                    return entry
+            entry = self._last.get(exact) or self._last.get(loose)
+            if entry is not None:
+                self.served += 1
+                return entry
+            self.misses += 1
+            return None
+
+    async def replay(self, keys: Tuple[str, str]) -> Tuple[int, Dict[str, str], str]:
+        """(statut, en-têtes, corps) archivés, après la durée d'origine / speed."""
+        entry = self._take(keys)
+        if entry is None:
+            raise ReplayMiss(f"no archived response for {keys[0]}")
+        if self.speed > 0 and entry.get("t"):
+            await asyncio.sleep(float(entry["t"]) / self.speed)
+        return int(entry["s"]), dict(entry.get("h") or {}), entry.get("b", "")
+
+    # =================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        if self.recording:
+            return {"mode": self.mode, "recorded": self.recorded}
+        return {"mode": self.mode, "served": self.served, "fallbacks": self.fallbacks, "misses": self.misses}
+
+    def close(self) -> None:
+        if self.recording:
+            self.flush()
+        LOGGER.info(f"📼 [HTTP] {self.path} : {self.stats()}")
+
+
+# =====================================================================
+# SINGLETON (settings)
+# =====================================================================
+
+_archive: Optional[HttpArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_http_archive() -> Optional[HttpArchive]:
+    """Archive du process selon HTTP_RECORD_MODE, ou None en mode off."""
+    global _archive
+    mode = (HTTP_RECORD_MODE or "off").strip().lower()
+    if mode == "off":
+        return None
+    if mode not in MODES:
+        raise ValueError(f"unsupported HTTP_RECORD_MODE: {mode}")
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = HttpArchive(HTTP_ARCHIVE_PATH, mode, HTTP_REPLAY_SPEED)
+                LOGGER.info(f"📼 [HTTP] mode {mode} → {HTTP_ARCHIVE_PATH}")
+                atexit.register(close_http_archive)
+    return _archive
+
+
+def close_http_archive() -> None:
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
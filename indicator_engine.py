@@ -0,0 +1,316 @@
+# =====================================================================
+# indicator_engine.py — EMA / RSI / MACD / ATR incrémentaux (O(1) par bougie)
+# =====================================================================
+# Les fonctions de indicators.py recalculent toute la récursion ewm à
+# chaque cycle. Ici on garde, par (symbole, TF), l'état des récursions
+# après la dernière bougie clôturée :
+#   - nouvelle bougie     → on fige (commit) la précédente, O(1)
+#   - bougie ouverte qui bouge → recalcul depuis l'état figé, O(1)
+#
+# La récursion reproduit exactement pandas ewm(adjust=False) :
+#   w = (old_wt * w + alpha * x) / (old_wt + alpha)
+# → résultats identiques bit à bit aux fonctions d'origine appliquées à
+#   toute la série vue depuis l'ancrage du moteur.
+#
+# Sur une fenêtre glissante (df.tail(200)), pandas repart du premier
+# point de la fenêtre : l'écart avec le moteur est de l'ordre de
+# (1 - alpha)^200, d'où l'opt-in INDICATOR_ENGINE_ENABLED.
+# =====================================================================
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kline_cache import OHLCV_COLUMNS
+from settings import INDICATOR_ENGINE_HISTORY
+
+NAN = float("nan")
+
+# (weighted, old_wt, nobs)
+EwmState = Tuple[float, float, int]
+EWM_INIT: EwmState = (NAN, 1.0, 0)
+
+
+def ewm_alpha(span: Optional[float] = None, alpha: Optional[float] = None) -> float:
+    """alpha tel que calculé par pandas (via le centre de masse)."""
+    if span is not None:
+        com = (float(span) - 1.0) / 2.0
+    elif alpha is not None:
+        com = 1.0 / float(alpha) - 1.0
+    else:
+        raise ValueError("span or alpha required")
+    return 1.0 / (1.0 + com)
+
+
+def ewm_step(state: EwmState, x: float, alpha: float) -> EwmState:
+    """Un pas de pandas ewm(adjust=False, ignore_na=False)."""
+    weighted, old_wt, nobs = state
+    is_obs = x == x
+    if is_obs:
+        nobs += 1
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if is_obs:
+            # pandas évite de toucher une série constante
+            if weighted != x:
+                weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+            old_wt = 1.0
+    elif is_obs:
+        weighted = x
+    return weighted, old_wt, nobs
+
+
+# =====================================================================
+# ÉTAT COMPLET D'UNE SÉRIE
+# =====================================================================
+
+class _State:
+    """États ewm figés après une bougie (immutable par convention)."""
+
+    __slots__ = ("prev_close", "emas", "macd_fast", "macd_slow", "macd_signal", "gain", "loss", "atr")
+
+    def __init__(self, n_ema: int):
+        self.prev_close = NAN
+        self.emas: Tuple[EwmState, ...] = (EWM_INIT,) * n_ema
+        self.macd_fast = EWM_INIT
+        self.macd_slow = EWM_INIT
+        self.macd_signal = EWM_INIT
+        self.gain = EWM_INIT
+        self.loss = EWM_INIT
+        self.atr = EWM_INIT
+
+
+class IndicatorEngine:
+    """
+    Indicateurs récursifs d'un couple (symbole, TF).
+
+    Colonnes produites (une ligne par bougie) :
+        time, ema{L} pour chaque L de ema_lengths, rsi, macd, signal, hist, atr
+    `atr` est la sortie ewm brute (sans bfill) ; `rsi` est déjà fillna(50).
+    """
+
+    def __init__(
+        self,
+        history: int = INDICATOR_ENGINE_HISTORY,
+        ema_lengths: Sequence[int] = (20, 50),
+        rsi_length: int = 14,
+        macd_params: Tuple[int, int, int] = (12, 26, 9),
+        atr_length: int = 14,
+    ):
+        self.history = max(int(history), 2)
+        self.ema_lengths = tuple(int(x) for x in ema_lengths)
+        self.rsi_length = int(rsi_length)
+        self.macd_params = tuple(int(x) for x in macd_params)
+        self.atr_length = int(atr_length)
+
+        self.columns = (
+            ("time",)
+            + tuple(f"ema{L}" for L in self.ema_lengths)
+            + ("rsi", "macd", "signal", "hist", "atr")
+        )
+        self._col = {c: i for i, c in enumerate(self.columns)}
+
+        self._a_ema = tuple(ewm_alpha(span=L) for L in self.ema_lengths)
+        fast, slow, sig = self.macd_params
+        self._a_fast = ewm_alpha(span=fast)
+        self._a_slow = ewm_alpha(span=slow)
+        self._a_sig = ewm_alpha(span=sig)
+        self._a_rsi = ewm_alpha(alpha=1.0 / self.rsi_length)
+        self._a_atr = ewm_alpha(alpha=1.0 / self.atr_length)
+
+        self.reset()
+
+    # ---------------------------------------------------------------
+
+    def reset(self) -> None:
+        self._state = _State(len(self.ema_lengths))
+        self._last_row: Optional[np.ndarray] = None
+        self.bars = 0                         # bougies figées depuis l'ancrage
+        self._hist = np.empty((self.history, len(self.columns)), dtype=float)
+        self._hist_start = 0
+        self._hist_size = 0
+        self._open_row: Optional[np.ndarray] = None
+        self._open_out: Optional[np.ndarray] = None
+        self.rebuilds = 0
+
+    def col(self, name: str) -> int:
+        return self._col[name]
+
+    # ---------------------------------------------------------------
+    # Récursion (pure)
+    # ---------------------------------------------------------------
+
+    def _advance(self, st: _State, row: np.ndarray) -> Tuple[_State, np.ndarray]:
+        ts, _o, h, l, c, _v = (float(x) for x in row[:6])
+        new = _State.__new__(_State)
+
+        new.emas = tuple(ewm_step(s, c, a) for s, a in zip(st.emas, self._a_ema))
+
+        new.macd_fast = ewm_step(st.macd_fast, c, self._a_fast)
+        new.macd_slow = ewm_step(st.macd_slow, c, self._a_slow)
+        line = new.macd_fast[0] - new.macd_slow[0]
+        new.macd_signal = ewm_step(st.macd_signal, line, self._a_sig)
+        signal = new.macd_signal[0]
+
+        # RSI Wilder : delta.clip(lower=0) garde les NaN
+        delta = c - st.prev_close
+        if delta != delta:
+            gain = loss = NAN
+        else:
+            gain = delta if delta >= 0 else 0.0
+            loss = -delta if -delta >= 0 else 0.0
+        new.gain = ewm_step(st.gain, gain, self._a_rsi)
+        new.loss = ewm_step(st.loss, loss, self._a_rsi)
+        rs = new.gain[0] / (new.loss[0] + 1e-10)
+        rsi_val = 100.0 - (100.0 / (1.0 + rs))
+        if rsi_val != rsi_val:
+            rsi_val = 50.0
+
+        # True range : max des composantes non-NaN
+        tr = np.fmax(np.fmax(h - l, abs(h - st.prev_close)), abs(l - st.prev_close))
+        new.atr = ewm_step(st.atr, float(tr), self._a_atr)
+        new.prev_close = c
+
+        out = np.empty(len(self.columns), dtype=float)
+        out[0] = ts
+        for i, s in enumerate(new.emas):
+            out[1 + i] = s[0]
+        k = 1 + len(new.emas)
+        out[k:k + 5] = (rsi_val, line, signal, line - signal, new.atr[0])
+        return new, out
+
+    def _commit(self, row: np.ndarray) -> None:
+        self._state, out = self._advance(self._state, row)
+        self._last_row = np.array(row[:6], dtype=float)
+        self.bars += 1
+        if self._hist_size < self.history:
+            self._hist[(self._hist_start + self._hist_size) % self.history] = out
+            self._hist_size += 1
+        else:
+            self._hist[self._hist_start] = out
+            self._hist_start = (self._hist_start + 1) % self.history
+
+    # ---------------------------------------------------------------
+    # Mise à jour
+    # ---------------------------------------------------------------
+
+    def update(self, rows: np.ndarray) -> None:
+        """
+        Intègre un tableau OHLCV trié (n x 6) dont la dernière ligne est la
+        bougie en cours. Les bougies déjà figées sont ignorées ; si la
+        dernière bougie figée n'est plus dans `rows` ou a été révisée, le
+        moteur est reconstruit depuis `rows`.
+        """
+        if rows is None or rows.shape[0] == 0:
+            return
+        n = rows.shape[0]
+        start = 0
+
+        if self._last_row is not None:
+            idx = int(np.searchsorted(rows[:, 0], self._last_row[0]))
+            if idx < n and rows[idx, 0] == self._last_row[0] and np.array_equal(rows[idx, :6], self._last_row):
+                start = idx + 1
+            else:
+                self.reset()
+                self.rebuilds += 1
+
+        for i in range(start, n - 1):
+            self._commit(rows[i])
+
+        if start <= n - 1:
+            self._open_row = np.array(rows[-1, :6], dtype=float)
+            _, self._open_out = self._advance(self._state, rows[-1])
+        else:
+            self._open_row = None
+            self._open_out = None
+
+    # ---------------------------------------------------------------
+    # Lecture
+    # ---------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return self._hist_size + (1 if self._open_out is not None else 0)
+
+    def series(self, limit: Optional[int] = None) -> np.ndarray:
+        """Dernières `limit` lignes (bougie ouverte incluse), shape (m x K)."""
+        idx = (self._hist_start + np.arange(self._hist_size)) % self.history
+        out = self._hist[idx]
+        if self._open_out is not None:
+            out = np.vstack([out, self._open_out])
+        if limit is not None:
+            out = out[-int(limit):]
+        return out
+
+    def last(self) -> Dict[str, float]:
+        row = self._open_out
+        if row is None:
+            if self._hist_size == 0:
+                return {}
+            row = self._hist[(self._hist_start + self._hist_size - 1) % self.history]
+        return {c: float(row[i]) for i, c in enumerate(self.columns)}
+
+
+# =====================================================================
+# REGISTRE (symbole, TF) → moteur
+# =====================================================================
+
+_ENGINES: Dict[Tuple[str, str], IndicatorEngine] = {}
+
+
+def get_indicator_engine(symbol: str, tf: str) -> IndicatorEngine:
+    key = (symbol, tf)
+    eng = _ENGINES.get(key)
+    if eng is None:
+        eng = IndicatorEngine()
+        _ENGINES[key] = eng
+    return eng
+
+
+def update_from_frame(symbol: str, tf: str, df: pd.DataFrame) -> Optional[IndicatorEngine]:
+    """Met à jour le moteur de (symbol, tf) avec un DataFrame OHLCV."""
+    if df is None or df.empty or any(c not in df.columns for c in OHLCV_COLUMNS):
+        return None
+    eng = get_indicator_engine(symbol, tf)
+    eng.update(df[OHLCV_COLUMNS].to_numpy(dtype=float))
+    return eng
+
+
+def engine_frame_series(eng: IndicatorEngine, df: pd.DataFrame) -> Optional[Dict[str, pd.Series]]:
+    """
+    Séries du moteur alignées sur `df`, avec les mêmes garde-fous de
+    longueur que indicators.py (ema, rsi, macd, true_atr). None si le
+    moteur ne couvre pas toute la fenêtre.
+    """
+    m = len(df)
+    if m < 2 or eng.size < m:
+        return None
+    arr = eng.series(m)
+    times = df["time"].to_numpy(dtype=float)
+    if arr[0, 0] != times[0] or arr[-1, 0] != times[-1]:
+        return None
+
+    idx = df.index
+    out: Dict[str, pd.Series] = {}
+    for L in eng.ema_lengths:
+        out[f"ema{L}"] = pd.Series(arr[:, eng.col(f"ema{L}")], index=idx)
+
+    if m <= eng.rsi_length:
+        out["rsi"] = pd.Series([50.0] * m, index=idx)
+    else:
+        out["rsi"] = pd.Series(arr[:, eng.col("rsi")], index=idx)
+
+    fast, slow, sig = eng.macd_params
+    if m < slow + sig:
+        nan = pd.Series([math.nan] * m, index=idx)
+        out["macd"], out["signal"], out["hist"] = nan, nan, nan
+    else:
+        for c in ("macd", "signal", "hist"):
+            out[c] = pd.Series(arr[:, eng.col(c)], index=idx)
+
+    out["atr"] = pd.Series(arr[:, eng.col("atr")], index=idx).bfill().fillna(0.0)
+    return out
@@ -29,6 +29,11 @@ def _safe_len(obj) -> int:
         return 0
 
 
+def _ctx_ok(ctx, df) -> bool:
+    """True si le FeatureContext `ctx` porte bien sur ce DataFrame."""
+    return ctx is not None and ctx.covers(df)
+
+
 def _safe_series(series, fill: float = 0.0) -> pd.Series:
     if series is None:
         return pd.Series([fill])
@@ -116,11 +121,14 @@ def macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) ->
 # TRUE ATR
 # =====================================================================
 
-def true_atr(df: pd.DataFrame, length: int = 14) -> pd.Series:
+def true_atr(df: pd.DataFrame, length: int = 14, ctx=None) -> pd.Series:
     """
     Average True Range (Wilder) sur length périodes.
     Utilisé pour SL institutionnel, RR, régimes de volatilité, etc.
     """
+    if _ctx_ok(ctx, df):
+        return ctx.atr(length)
+
     if df is None or _safe_len(df) < 2:
         return pd.Series([0.0])
 
@@ -142,7 +150,7 @@ def true_atr(df: pd.DataFrame, length: int = 14) -> pd.Series:
 # VOLATILITY REGIME
 # =====================================================================
 
-def volatility_regime(df: pd.DataFrame, length: int = 14) -> str:
+def volatility_regime(df: pd.DataFrame, length: int = 14, ctx=None) -> str:
     """
     Classe le marché en régime de volatilité :
       - "LOW"    : ATR% < 1 %
@@ -152,7 +160,7 @@ def volatility_regime(df: pd.DataFrame, length: int = 14) -> str:
     if df is None or _safe_len(df) < length + 2:
         return "UNKNOWN"
 
-    atr = true_atr(df, length=length)
+    atr = true_atr(df, length=length, ctx=ctx)
     last_atr = float(atr.iloc[-1])
     last_price = float(df["close"].iloc[-1])
 
@@ -237,6 +245,7 @@ def extension_signal(
     ema_slow_len: int = 50,
     atr_len: int = 14,
     k: float = 1.5,
+    ctx=None,
 ) -> str:
     """
     Détecte une situation d'over-extension par rapport aux EMA + ATR.
@@ -255,9 +264,13 @@ def extension_signal(
         return "NORMAL"
 
     close = df["close"].astype(float)
-    ema_fast = ema(close, ema_fast_len)
-    ema_slow = ema(close, ema_slow_len)
-    atr = true_atr(df, length=atr_len)
+    if _ctx_ok(ctx, df):
+        ema_fast = ctx.ema(ema_fast_len)
+        ema_slow = ctx.ema(ema_slow_len)
+    else:
+        ema_fast = ema(close, ema_fast_len)
+        ema_slow = ema(close, ema_slow_len)
+    atr = true_atr(df, length=atr_len, ctx=ctx)
 
     last_price = float(close.iloc[-1])
     last_ema = float(ema_fast.iloc[-1])
@@ -284,7 +297,16 @@ def extension_signal(
 # MOMENTUM INSTITUTIONNEL & COMPOSITE
 # =====================================================================
 
-def institutional_momentum(df: pd.DataFrame) -> str:
+def _momentum_inputs(df: pd.DataFrame, ctx=None):
+    """(close, volume, rsi14, macd 12/26/9, ema20, ema50), via le contexte si fourni."""
+    close = df["close"].astype(float)
+    volume = df["volume"].astype(float)
+    if _ctx_ok(ctx, df):
+        return close, volume, ctx.rsi(14), ctx.macd(), ctx.ema(20), ctx.ema(50)
+    return close, volume, rsi(close, length=14), macd(close), ema(close, 20), ema(close, 50)
+
+
+def institutional_momentum(df: pd.DataFrame, ctx=None) -> str:
     """
     Version label simple (BACKWARD COMPATIBLE avec analyze_signal.py) :
 
@@ -303,13 +325,7 @@ def institutional_momentum(df: pd.DataFrame) -> str:
     if df is None or _safe_len(df) < 40:
         return "NEUTRAL"
 
-    close = df["close"].astype(float)
-    volume = df["volume"].astype(float)
-
-    r = rsi(close, length=14)
-    macd_line, signal_line, hist = macd(close)
-    ema20 = ema(close, 20)
-    ema50 = ema(close, 50)
+    close, volume, r, (macd_line, signal_line, hist), ema20, ema50 = _momentum_inputs(df, ctx)
 
     if _safe_len(macd_line) < 5:
         return "NEUTRAL"
@@ -365,7 +381,7 @@ def institutional_momentum(df: pd.DataFrame) -> str:
     return "NEUTRAL"
 
 
-def composite_momentum(df: pd.DataFrame) -> Dict[str, Any]:
+def composite_momentum(df: pd.DataFrame, ctx=None) -> Dict[str, Any]:
     """
     Version "desk lead++" : momentum composite sur 0–100.
 
@@ -387,14 +403,8 @@ def composite_momentum(df: pd.DataFrame) -> Dict[str, Any]:
     if df is None or _safe_len(df) < 40:
         return {"score": 50.0, "label": "NEUTRAL", "components": {}}
 
-    close = df["close"].astype(float)
-    volume = df["volume"].astype(float)
-
     # Base components
-    r = rsi(close, length=14)
-    macd_line, signal_line, hist = macd(close)
-    ema20 = ema(close, 20)
-    ema50 = ema(close, 50)
+    close, volume, r, (macd_line, signal_line, hist), ema20, ema50 = _momentum_inputs(df, ctx)
 
     if _safe_len(macd_line) < 5:
         return {"score": 50.0, "label": "NEUTRAL", "components": {}}
@@ -429,7 +439,7 @@ def composite_momentum(df: pd.DataFrame) -> Dict[str, Any]:
         vol_score = 0.0
 
     # Extension signal
-    ext = extension_signal(df)
+    ext = extension_signal(df, ctx=ctx)
     if ext == "OVEREXTENDED_LONG":
         ext_score = -0.7  # trop étiré à l'achat => risque de mean reversion
     elif ext == "OVEREXTENDED_SHORT":
@@ -5,37 +5,286 @@
 # Fully compatible with analyze_signal.py (expects "institutional_score")
 # =====================================================================
 
-from typing import Dict, Any, Optional, List
+import asyncio
+import json
+import time
+from typing import Dict, Any, Optional, List, Mapping, Tuple
 
 import aiohttp
 import numpy as np
 
-BINANCE_FUTURES = "https://fapi.binance.com"
+from binance_stream import get_market_stream
+from http_recorder import ReplayMiss, get_http_archive, request_keys
+from periodic_cache import PeriodicCache
+from symbol_map import SymbolMapIndex
+from rate_limiter import TokenBucket
+from settings import (
+    BINANCE_MIN_INTERVAL_S,
+    BINANCE_HTTP_TIMEOUT_S,
+    BINANCE_HTTP_RETRIES,
+    BINANCE_HTTP_POOL_PER_HOST,
+    BINANCE_DNS_TTL_S,
+    BINANCE_WEIGHT_LIMIT_1M,
+    BINANCE_WEIGHT_SAFETY,
+    INST_CACHE_MAX_ENTRIES,
+    INST_CACHE_MAX_MB,
+    INST_CACHE_GRACE_S,
+    UNIVERSE_SNAPSHOT_TTL_S,
+    UNIVERSE_SNAPSHOT_RETRY_S,
+    BINANCE_FUTURES_URL,
+)
+
+BINANCE_FUTURES = BINANCE_FUTURES_URL
+
+
+# =====================================================================
+# Request weights / rate limits (Binance USDⓈ-M docs)
+# =====================================================================
+
+# REQUEST_WEIGHT per call (with symbol). Endpoints not listed weigh 1.
+BINANCE_ENDPOINT_WEIGHTS = {
+    "/fapi/v1/openInterest": 1,
+    "/fapi/v1/fundingRate": 1,
+    "/fapi/v1/forceOrders": 20,
+    "/futures/data/openInterestHist": 0,
+    "/futures/data/globalLongShortAccountRatio": 0,
+}
+
+# Endpoints with their own request-count limits: (requests, window_s)
+BINANCE_ENDPOINT_LIMITS = {
+    "/fapi/v1/fundingRate": (500, 300),
+    "/futures/data/openInterestHist": (1000, 300),
+    "/futures/data/globalLongShortAccountRatio": (1000, 300),
+}
+
+
+# All-symbols form of an endpoint (no "symbol" param) weighs more.
+BINANCE_BULK_WEIGHTS = {
+    "/fapi/v1/premiumIndex": 10,
+    "/fapi/v1/ticker/24hr": 40,
+    "/fapi/v1/forceOrders": 50,
+}
+
+
+def _binance_weight(path: str, params: Optional[dict] = None) -> int:
+    """REQUEST_WEIGHT of one call; klines weight depends on `limit`."""
+    if path in BINANCE_BULK_WEIGHTS and not (params or {}).get("symbol"):
+        return BINANCE_BULK_WEIGHTS[path]
+    if path == "/fapi/v1/klines":
+        limit = int((params or {}).get("limit", 500))
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+    return BINANCE_ENDPOINT_WEIGHTS.get(path, 1)
+
+
+class BinanceWeightLimiter:
+    """
+    Enforces Binance's per-minute REQUEST_WEIGHT budget plus the
+    per-endpoint request limits of the /futures/data family.
+
+    The weight bucket refills 80% of the effective budget per minute and
+    allows a 20% burst, so no rolling minute can exceed the budget.
+    Callers wait for capacity; X-MBX-USED-WEIGHT-1M resyncs the bucket.
+    """
+
+    def __init__(
+        self,
+        weight_per_min: float = BINANCE_WEIGHT_LIMIT_1M,
+        safety: float = BINANCE_WEIGHT_SAFETY,
+    ):
+        self.limit_1m = float(weight_per_min)
+        budget = self.limit_1m * float(safety)
+        self.weight = TokenBucket(
+            rate=budget * 0.8 / 60.0,
+            capacity=max(budget * 0.2, 50.0),
+            name="binance:weight",
+        )
+        self._endpoints: Dict[str, TokenBucket] = {
+            path: TokenBucket(rate=n * float(safety) / window, capacity=max(n * 0.1, 1.0), name=f"binance:{path}")
+            for path, (n, window) in BINANCE_ENDPOINT_LIMITS.items()
+        }
+
+    async def acquire(self, path: str, weight: int) -> None:
+        bucket = self._endpoints.get(path)
+        if bucket is not None:
+            await bucket.acquire(1.0)
+        if weight > 0:
+            await self.weight.acquire(weight)
+
+    def on_headers(self, headers: Mapping[str, str]) -> None:
+        used = headers.get("X-MBX-USED-WEIGHT-1M") if headers else None
+        if used is None:
+            return
+        try:
+            self.weight.sync_remaining(self.limit_1m - float(used), self.limit_1m)
+            self.weight.on_success()
+        except (TypeError, ValueError):
+            pass
+
+    def on_throttled(self, path: str, headers: Optional[Mapping[str, str]]) -> None:
+        retry_after = None
+        try:
+            if headers and headers.get("Retry-After") is not None:
+                retry_after = float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            retry_after = None
+        self.weight.on_throttled(retry_after)
+        bucket = self._endpoints.get(path)
+        if bucket is not None:
+            bucket.on_throttled(retry_after)
+
+
+# =====================================================================
+# Shared HTTP client (connection pool)
+# =====================================================================
+
+class BinanceFuturesClient:
+    """
+    Long-lived Binance USDⓈ-M REST client.
+
+    One aiohttp session for the whole scan loop:
+      - keep-alive connection pool (limit_per_host)
+      - DNS cache (ttl_dns_cache)
+    so each symbol reuses warm TCP+TLS connections instead of paying a
+    fresh handshake. Every request goes through the weight limiter.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BINANCE_FUTURES,
+        timeout_s: float = BINANCE_HTTP_TIMEOUT_S,
+        limit_per_host: int = BINANCE_HTTP_POOL_PER_HOST,
+        dns_ttl_s: int = BINANCE_DNS_TTL_S,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=float(timeout_s))
+        self.limit_per_host = int(limit_per_host)
+        self.dns_ttl_s = int(dns_ttl_s)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.limiter = BinanceWeightLimiter()
+        # universe-wide funding / mark / 24h volume (see refresh_universe_snapshot)
+        self.snapshot: Optional["UniverseSnapshot"] = None
+        self._snapshot_lock = asyncio.Lock()
+        # last failed bulk fetch (0 = none) → retry backoff
+        self.snapshot_failed_at = 0.0
+        # Bitget → Binance symbol mapping (see refresh_symbol_index)
+        self.symbol_index = SymbolMapIndex()
+        self._index_lock = asyncio.Lock()
+        # slow-moving metrics, expiring at their next bucket boundary
+        self.cache = PeriodicCache(
+            max_entries=int(INST_CACHE_MAX_ENTRIES),
+            max_bytes=int(float(INST_CACHE_MAX_MB) * 1024 * 1024),
+            grace_s=float(INST_CACHE_GRACE_S),
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl_s,
+                keepalive_timeout=60,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+            )
+        return self.session
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+_binance_client: Optional[BinanceFuturesClient] = None
+
+
+def get_binance_client() -> BinanceFuturesClient:
+    """Process-wide Binance client, created on first use."""
+    global _binance_client
+    if _binance_client is None:
+        _binance_client = BinanceFuturesClient()
+    return _binance_client
+
+
+async def close_binance_client() -> None:
+    global _binance_client
+    if _binance_client is not None:
+        await _binance_client.close()
+        _binance_client = None
 
 
 # =====================================================================
 # HTTP helper
 # =====================================================================
 
+async def _http_get(
+    client: BinanceFuturesClient,
+    url: str,
+    path: str,
+    params: Optional[dict],
+) -> Tuple[int, Mapping[str, str], str]:
+    """GET → (status, headers, texte) ; rejoué / enregistré selon HTTP_RECORD_MODE."""
+    keys = request_keys("binance", "GET", path, params)
+    archive = get_http_archive()
+    if archive is not None and archive.replaying:
+        return await archive.replay(keys)
+
+    t0 = time.perf_counter()
+    session = await client.get_session()
+    async with session.get(url, params=params) as resp:
+        text = await resp.text()
+        status, headers = resp.status, resp.headers
+
+    if archive is not None:
+        archive.record(keys, status, headers, text, time.perf_counter() - t0)
+    return status, headers, text
+
+
 async def _fetch_json(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     path: str,
     params: Optional[dict] = None,
 ) -> Optional[Any]:
     """
     Light HTTP GET helper on Binance Futures REST.
 
+    - Waits for request-weight capacity before each attempt.
+    - 429/418 penalise the limiter and are retried; 5xx / network errors
+      are retried with backoff (BINANCE_HTTP_RETRIES).
     - Returns parsed JSON on success.
-    - Returns None on any network / parsing error.
+    - Returns None on any network / parsing error (or replay miss).
     """
-    url = BINANCE_FUTURES + path
-    try:
-        async with session.get(url, params=params, timeout=5) as resp:
-            if resp.status != 200:
+    url = client.base_url + path
+    weight = _binance_weight(path, params)
+    retries = max(int(BINANCE_HTTP_RETRIES), 0)
+
+    for attempt in range(retries + 1):
+        backoff = float(BINANCE_MIN_INTERVAL_S) * (2 ** attempt)
+        try:
+            await client.limiter.acquire(path, weight)
+            status, headers, text = await _http_get(client, url, path, params)
+            client.limiter.on_headers(headers)
+            if status in (418, 429):
+                client.limiter.on_throttled(path, headers)
+                continue
+            if status >= 500:
+                await asyncio.sleep(backoff)
+                continue
+            if status != 200:
                 return None
-            return await resp.json()
-    except Exception:
-        return None
+            return json.loads(text)
+        except ReplayMiss:
+            return None
+        except Exception:
+            if attempt < retries:
+                await asyncio.sleep(backoff)
+    return None
 
 
 def _to_float(v: Any, default: float = 0.0) -> float:
@@ -53,7 +302,7 @@ def _to_float(v: Any, default: float = 0.0) -> float:
 # =====================================================================
 
 async def _fetch_open_interest_hist(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     symbol: str,
     period: str = "4h",
     limit: int = 30,
@@ -71,7 +320,7 @@ async def _fetch_open_interest_hist(
         "period": period,
         "limit": limit,
     }
-    data = await _fetch_json(session, "/futures/data/openInterestHist", params=params)
+    data = await _fetch_json(client, "/futures/data/openInterestHist", params=params)
     if not data or not isinstance(data, list):
         return np.asarray([], dtype=float)
 
@@ -85,7 +334,7 @@ async def _fetch_open_interest_hist(
 
 
 async def _fetch_open_interest_snapshot(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     symbol: str,
 ) -> float:
     """
@@ -93,14 +342,14 @@ async def _fetch_open_interest_snapshot(
       GET /fapi/v1/openInterest
     """
     params = {"symbol": symbol}
-    data = await _fetch_json(session, "/fapi/v1/openInterest", params=params)
+    data = await _fetch_json(client, "/fapi/v1/openInterest", params=params)
     if not data or not isinstance(data, dict):
         return 0.0
     return _to_float(data.get("openInterest"), default=0.0)
 
 
 async def _fetch_funding_rates(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     symbol: str,
     limit: int = 16,
 ) -> List[float]:
@@ -112,7 +361,7 @@ async def _fetch_funding_rates(
     - Returns a list of floats (can be empty).
     """
     params = {"symbol": symbol, "limit": limit}
-    data = await _fetch_json(session, "/fapi/v1/fundingRate", params=params)
+    data = await _fetch_json(client, "/fapi/v1/fundingRate", params=params)
     if not data or not isinstance(data, list):
         return []
 
@@ -123,7 +372,7 @@ async def _fetch_funding_rates(
 
 
 async def _fetch_klines_for_cvd_and_taker(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     symbol: str,
     interval: str = "1h",
     limit: int = 120,
@@ -146,7 +395,7 @@ async def _fetch_klines_for_cvd_and_taker(
       }
     """
     params = {"symbol": symbol, "interval": interval, "limit": limit}
-    data = await _fetch_json(session, "/fapi/v1/klines", params=params)
+    data = await _fetch_json(client, "/fapi/v1/klines", params=params)
     if not data or not isinstance(data, list):
         return {"cvd": np.asarray([], dtype=float), "taker_buy_ratio": 0.0, "price_slope": 0.0}
 
@@ -206,7 +455,7 @@ async def _fetch_klines_for_cvd_and_taker(
 
 
 async def _fetch_liquidations(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     symbol: str,
     limit: int = 100,
 ) -> Dict[str, float]:
@@ -217,7 +466,7 @@ async def _fetch_liquidations(
     Aggregates BUY vs SELL liquidation volumes.
     """
     params = {"symbol": symbol, "limit": limit}
-    data = await _fetch_json(session, "/fapi/v1/forceOrders", params=params)
+    data = await _fetch_json(client, "/fapi/v1/forceOrders", params=params)
     if not data or not isinstance(data, list):
         return {"liq_buy": 0.0, "liq_sell": 0.0}
 
@@ -236,7 +485,7 @@ async def _fetch_liquidations(
 
 
 async def _fetch_global_long_short_ratio(
-    session: aiohttp.ClientSession,
+    client: BinanceFuturesClient,
     symbol: str,
     period: str = "4h",
     limit: int = 30,
@@ -254,12 +503,13 @@ async def _fetch_global_long_short_ratio(
     or neutral defaults if any issue.
     """
     params = {"symbol": symbol, "period": period, "limit": limit}
-    data = await _fetch_json(session, "/futures/data/globalLongShortAccountRatio", params=params)
+    data = await _fetch_json(client, "/futures/data/globalLongShortAccountRatio", params=params)
     if not data or not isinstance(data, list):
         return {
             "long_short_ratio": 1.0,
             "long_account": 0.5,
             "short_account": 0.5,
+            "_ok": False,
         }
 
     last = data[-1]
@@ -280,20 +530,266 @@ async def _fetch_global_long_short_ratio(
         "long_short_ratio": lsr,
         "long_account": long_acc,
         "short_account": short_acc,
+        "_ok": True,
     }
 
 
+# =====================================================================
+# Bulk universe snapshot (all-symbol endpoints)
+# =====================================================================
+
+class UniverseSnapshot:
+    """
+    Funding / mark / 24h volume for every USDⓈ-M contract, built from two
+    all-symbol calls:
+      GET /fapi/v1/premiumIndex   (weight 10)
+      GET /fapi/v1/ticker/24hr    (weight 40)
+    """
+
+    __slots__ = ("ts", "data")
+
+    def __init__(self, ts: float, data: Dict[str, Dict[str, float]]):
+        self.ts = ts
+        self.data = data
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def get(self, symbol: str) -> Optional[Dict[str, float]]:
+        return self.data.get(symbol)
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.ts
+
+
+async def _fetch_universe_snapshot(client: BinanceFuturesClient) -> Optional[UniverseSnapshot]:
+    premium, tickers = await asyncio.gather(
+        _fetch_json(client, "/fapi/v1/premiumIndex"),
+        _fetch_json(client, "/fapi/v1/ticker/24hr"),
+    )
+    if not isinstance(premium, list) or not premium:
+        return None
+
+    data: Dict[str, Dict[str, float]] = {}
+    for item in premium:
+        sym = item.get("symbol")
+        if not sym:
+            continue
+        data[sym] = {
+            "funding_rate": _to_float(item.get("lastFundingRate"), 0.0),
+            "mark_price": _to_float(item.get("markPrice"), 0.0),
+            "index_price": _to_float(item.get("indexPrice"), 0.0),
+            "next_funding_time": _to_float(item.get("nextFundingTime"), 0.0),
+            "quote_volume_24h": 0.0,
+            "price_change_pct_24h": 0.0,
+        }
+
+    if isinstance(tickers, list):
+        for item in tickers:
+            row = data.get(item.get("symbol"))
+            if row is None:
+                continue
+            row["quote_volume_24h"] = _to_float(item.get("quoteVolume"), 0.0)
+            row["price_change_pct_24h"] = _to_float(item.get("priceChangePercent"), 0.0)
+
+    return UniverseSnapshot(time.time(), data)
+
+
+async def refresh_universe_snapshot(
+    client: Optional[BinanceFuturesClient] = None,
+    max_age_s: Optional[float] = None,
+) -> Optional[UniverseSnapshot]:
+    """
+    Returns the client's universe snapshot, refetching it when older than
+    `max_age_s` (default UNIVERSE_SNAPSHOT_TTL_S; 0 forces a refresh).
+    Concurrent callers share a single refresh. On failure the previous
+    snapshot (if any) is kept, and unforced callers do not refetch for
+    UNIVERSE_SNAPSHOT_RETRY_S: they get the last good snapshot (or None)
+    and fall back to per-symbol requests.
+    """
+    client = client or get_binance_client()
+    max_age = float(UNIVERSE_SNAPSHOT_TTL_S if max_age_s is None else max_age_s)
+    forced = max_age <= 0
+
+    def _usable() -> bool:
+        snap = client.snapshot
+        if snap is not None and snap.age() < max_age:
+            return True
+        return not forced and time.time() - client.snapshot_failed_at < float(UNIVERSE_SNAPSHOT_RETRY_S)
+
+    if _usable():
+        return client.snapshot
+
+    async with client._snapshot_lock:
+        if _usable():
+            return client.snapshot
+        fresh = await _fetch_universe_snapshot(client)
+        if fresh is not None:
+            client.snapshot = fresh
+            client.snapshot_failed_at = 0.0
+        else:
+            client.snapshot_failed_at = time.time()
+        return client.snapshot
+
+
+# =====================================================================
+# Bitget → Binance symbol index
+# =====================================================================
+
+async def _fetch_binance_perpetuals(client: BinanceFuturesClient) -> List[str]:
+    """
+    Exchange info :
+      GET /fapi/v1/exchangeInfo
+
+    Returns the trading USDT-margined perpetual symbols.
+    """
+    data = await _fetch_json(client, "/fapi/v1/exchangeInfo")
+    if not data or not isinstance(data, dict):
+        return []
+    out: List[str] = []
+    for item in data.get("symbols", []) or []:
+        if item.get("contractType") != "PERPETUAL":
+            continue
+        if item.get("status") != "TRADING":
+            continue
+        if item.get("quoteAsset") != "USDT":
+            continue
+        if item.get("symbol"):
+            out.append(item["symbol"])
+    return out
+
+
+async def refresh_symbol_index(
+    bitget_symbols: Optional[List[str]] = None,
+    client: Optional[BinanceFuturesClient] = None,
+    force: bool = False,
+) -> SymbolMapIndex:
+    """
+    (Re)builds the client's Bitget → Binance index from both contract
+    lists when older than BINANCE_SYMBOLS_TTL_S. If Binance cannot be
+    reached the previous index is kept.
+    """
+    client = client or get_binance_client()
+    index = client.symbol_index
+    if not force and not index.is_stale():
+        return index
+
+    async with client._index_lock:
+        if not force and not index.is_stale():
+            return index
+        binance_symbols = await _fetch_binance_perpetuals(client)
+        if binance_symbols:
+            index.build(binance_symbols, bitget_symbols or [])
+        elif not index.ready:
+            index.note_failure()
+    return index
+
+
+def _unavailable_analysis(symbol: str, reason: str) -> Dict[str, Any]:
+    """Neutral result for symbols with no usable Binance data (score 0)."""
+    return {
+        "institutional_score": 0,
+        "directional_score": 0,
+        "crowding_score": 0,
+        "directional_bias": "AGAINST_BIAS",
+        "crowding_regime": "NEUTRAL",
+        "flow_regime": "MIXED",
+        "available": False,
+        "binance_symbol": None,
+        "details": {"symbol": symbol, "reason": reason},
+    }
+
+
+# =====================================================================
+# Periodicity-aware caching
+# =====================================================================
+# Funding settles every 8h, OI / long-short history is bucketed at the
+# requested period and the OI snapshot is sampled on 5m buckets: they are
+# served from the client's PeriodicCache until their next boundary.
+# CVD (klines) and liquidations move every cycle and are never cached.
+
+def _non_empty(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.size > 0
+    if isinstance(value, (list, dict)):
+        return len(value) > 0
+    return value is not None
+
+
+async def _cached_open_interest_hist(
+    client: BinanceFuturesClient,
+    symbol: str,
+    period: str = "4h",
+    limit: int = 30,
+) -> np.ndarray:
+    return await client.cache.get_or_fetch(
+        (symbol, f"oi_hist:{limit}", period),
+        period,
+        lambda: _fetch_open_interest_hist(client, symbol, period=period, limit=limit),
+        cache_if=_non_empty,
+    )
+
+
+async def _cached_open_interest_snapshot(
+    client: BinanceFuturesClient,
+    symbol: str,
+) -> float:
+    return await client.cache.get_or_fetch(
+        (symbol, "oi_snapshot", "5m"),
+        "5m",
+        lambda: _fetch_open_interest_snapshot(client, symbol),
+        cache_if=lambda v: v > 0,
+    )
+
+
+async def _cached_funding_rates(
+    client: BinanceFuturesClient,
+    symbol: str,
+    limit: int = 16,
+) -> List[float]:
+    return await client.cache.get_or_fetch(
+        (symbol, f"funding:{limit}", "8h"),
+        "8h",
+        lambda: _fetch_funding_rates(client, symbol, limit=limit),
+        cache_if=_non_empty,
+    )
+
+
+async def _cached_global_long_short_ratio(
+    client: BinanceFuturesClient,
+    symbol: str,
+    period: str = "4h",
+    limit: int = 30,
+) -> Dict[str, float]:
+    # the fetcher returns neutral defaults on failure: only cache real data
+    return await client.cache.get_or_fetch(
+        (symbol, f"lsr:{limit}", period),
+        period,
+        lambda: _fetch_global_long_short_ratio(client, symbol, period=period, limit=limit),
+        cache_if=lambda v: v.get("_ok", False),
+    )
+
+
 # =====================================================================
 # High-level institutional analysis
 # =====================================================================
 
-async def compute_full_institutional_analysis(symbol: str, bias: str) -> Dict[str, Any]:
+async def compute_full_institutional_analysis(
+    symbol: str,
+    bias: str,
+    client: Optional[BinanceFuturesClient] = None,
+) -> Dict[str, Any]:
     """
     Main entrypoint used by analyze_signal.SignalAnalyzer.
 
     INPUT:
-      - symbol : "BTCUSDT", "AVAXUSDT", etc. (Bitget symbol mapped 1:1)
+      - symbol : "BTCUSDT", "AVAXUSDT", etc. (Bitget symbol, mapped through
+                 the client's SymbolMapIndex)
       - bias   : "LONG" or "SHORT" (direction of planned trade)
+      - client : shared BinanceFuturesClient (defaults to the process-wide one)
 
     RETURNS:
       - dict with:
@@ -307,17 +803,50 @@ async def compute_full_institutional_analysis(symbol: str, bias: str) -> Dict[st
     if bias not in ("LONG", "SHORT"):
         bias = "LONG"
 
-    # Mapping Bitget → Binance : "BTCUSDT" / "BTC-USDT" → "BTCUSDT"
-    binance_symbol = symbol.replace("-", "")
-
-    async with aiohttp.ClientSession() as session:
-        # Fetch everything sequentially to avoid rate-limit spikes.
-        oi_hist = await _fetch_open_interest_hist(session, binance_symbol, period="4h", limit=30)
-        oi_snap = await _fetch_open_interest_snapshot(session, binance_symbol)
-        funding_hist = await _fetch_funding_rates(session, binance_symbol, limit=16)
-        kline_data = await _fetch_klines_for_cvd_and_taker(session, binance_symbol, interval="1h", limit=120)
-        liq_data = await _fetch_liquidations(session, binance_symbol, limit=100)
-        lsr_data = await _fetch_global_long_short_ratio(session, binance_symbol, period="4h", limit=30)
+    client = client or get_binance_client()
+
+    # Mapping Bitget → Binance via the contract index (aliases, 1000x
+    # multipliers). No counterpart → no HTTP at all.
+    index = await refresh_symbol_index(client=client)
+    mapping = index.resolve(symbol)
+    if mapping is None:
+        return _unavailable_analysis(symbol, "no_binance_counterpart")
+    binance_symbol, multiplier = mapping
+
+    # Universe-wide funding / mark / volume: O(1) requests per cycle.
+    snapshot = await refresh_universe_snapshot(client)
+    snap_row = snapshot.get(binance_symbol) if snapshot is not None else None
+
+    # Live liquidations / mark from the WebSocket aggregator once warm (no HTTP).
+    stream = get_market_stream()
+    stream_warm = stream is not None and stream.is_warm()
+    if stream_warm:
+        live_mark = stream.mark(binance_symbol)
+        if live_mark is not None:
+            snap_row = dict(snap_row or {"quote_volume_24h": 0.0}, **live_mark)
+
+    async def _liquidations() -> Dict[str, float]:
+        if stream_warm:
+            return stream.liquidations(binance_symbol)
+        return await _fetch_liquidations(client, binance_symbol, limit=100)
+
+    # Concurrent fan-out; the client's weight limiter keeps us under budget.
+    # Slow-moving metrics come from the periodic cache when still valid.
+    (
+        oi_hist,
+        oi_snap,
+        funding_hist,
+        kline_data,
+        liq_data,
+        lsr_data,
+    ) = await asyncio.gather(
+        _cached_open_interest_hist(client, binance_symbol, period="4h", limit=30),
+        _cached_open_interest_snapshot(client, binance_symbol),
+        _cached_funding_rates(client, binance_symbol, limit=16),
+        _fetch_klines_for_cvd_and_taker(client, binance_symbol, interval="1h", limit=120),
+        _liquidations(),
+        _cached_global_long_short_ratio(client, binance_symbol, period="4h", limit=30),
+    )
 
     # ----------------------------
     # Derived metrics
@@ -333,7 +862,7 @@ async def compute_full_institutional_analysis(symbol: str, bias: str) -> Dict[st
         else:
             oi_slope = (last_oi - first_oi) / abs(first_oi)
 
-    # 2) Funding stats
+    # 2) Funding stats (current rate from the bulk snapshot, history for mean/max)
     if funding_hist:
         funding_last = float(funding_hist[-1])
         funding_mean = float(np.mean(funding_hist))
@@ -343,6 +872,15 @@ async def compute_full_institutional_analysis(symbol: str, bias: str) -> Dict[st
         funding_mean = 0.0
         funding_max_abs = 0.0
 
+    if snap_row is not None:
+        funding_last = float(snap_row["funding_rate"])
+        # Binance price units → Bitget units
+        mark_price = float(snap_row["mark_price"]) / multiplier
+        quote_volume_24h = float(snap_row["quote_volume_24h"])
+    else:
+        mark_price = 0.0
+        quote_volume_24h = 0.0
+
     # 3) CVD / taker / price slope
     cvd = kline_data.get("cvd") if isinstance(kline_data, dict) else None
     if cvd is None or not isinstance(cvd, np.ndarray) or cvd.size < 2:
@@ -480,6 +1018,9 @@ async def compute_full_institutional_analysis(symbol: str, bias: str) -> Dict[st
     return {
         # principaux
         "institutional_score": int(score),
+        "available": True,
+        "binance_symbol": binance_symbol,
+        "binance_multiplier": float(multiplier),
         "directional_score": int(directional_score),
         "crowding_score": int(crowding_score),
         "directional_bias": directional_bias,
@@ -492,6 +1033,8 @@ async def compute_full_institutional_analysis(symbol: str, bias: str) -> Dict[st
         "funding_last": float(funding_last),
         "funding_mean": float(funding_mean),
         "funding_max_abs": float(funding_max_abs),
+        "mark_price": float(mark_price),
+        "quote_volume_24h": float(quote_volume_24h),
         "cvd_slope": float(cvd_slope),
         "cvd_last": float(cvd_last),
         "taker_buy_ratio": float(taker_buy_ratio),
@@ -0,0 +1,227 @@
+# =====================================================================
+# kline_cache.py — Cache OHLCV incrémental (ring buffer par symbole / TF)
+# =====================================================================
+# Rôle :
+#   - Garder en mémoire les dernières bougies de chaque (symbole, interval)
+#   - Permettre à BitgetClient de ne télécharger que les barres nouvelles
+#     (startTime = dernier ts connu) et de les fusionner :
+#       * même ts que la dernière barre  → écrasement en place (bougie ouverte)
+#       * ts plus récent                 → ajout (écrase la plus ancienne)
+#   - Format interne : numpy float64 (capacity x 6)
+#       colonnes = time, open, high, low, close, volume
+# =====================================================================
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+
+# Durée d'une bougie Bitget (ms) par interval
+INTERVAL_MS: Dict[str, int] = {
+    "1M": 60_000,
+    "3M": 3 * 60_000,
+    "5M": 5 * 60_000,
+    "15M": 15 * 60_000,
+    "30M": 30 * 60_000,
+    "1H": 3_600_000,
+    "4H": 4 * 3_600_000,
+    "6H": 6 * 3_600_000,
+    "12H": 12 * 3_600_000,
+    "1D": 24 * 3_600_000,
+}
+
+
+def parse_candle_rows(data: Sequence[Sequence[Any]]) -> np.ndarray:
+    """
+    Convertit la payload Bitget [[ts, o, h, l, c, vol, turnover], ...]
+    (ou un array déjà parsé) en array float64 (n x 6) trié par ts
+    croissant, sans doublons de ts (la dernière occurrence gagne).
+    """
+    if data is None or len(data) == 0:
+        return np.empty((0, 6), dtype=float)
+
+    if isinstance(data, np.ndarray):
+        arr = data[:, :6].astype(float)
+    else:
+        arr = np.asarray([row[:6] for row in data], dtype=float)
+    if arr.ndim != 2 or arr.shape[1] != 6:
+        raise ValueError(f"unexpected candle shape {arr.shape}")
+
+    # tri stable puis dédoublonnage : on garde la dernière version d'un ts
+    arr = arr[np.argsort(arr[:, 0], kind="stable")]
+    if arr.shape[0] > 1:
+        keep = np.append(arr[1:, 0] != arr[:-1, 0], True)
+        arr = arr[keep]
+    return arr
+
+
+def rows_to_frame(rows: np.ndarray) -> pd.DataFrame:
+    """Array (n x 6) → DataFrame OHLCV au format historique de get_klines_df."""
+    if rows is None or rows.shape[0] == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+
+
+# =====================================================================
+# RING BUFFER
+# =====================================================================
+
+class KlineRingBuffer:
+    """
+    Ring buffer OHLCV de taille fixe pour un (symbole, interval).
+
+    Les lignes sont stockées dans un tableau circulaire ; l'ordre logique
+    (ancien → récent) est reconstruit à la lecture.
+    """
+
+    __slots__ = ("capacity", "exhausted", "_buf", "_start", "_size")
+
+    def __init__(self, capacity: int):
+        self.capacity = max(int(capacity), 1)
+        # True si l'exchange n'a pas plus d'historique que ce qui est stocké
+        self.exhausted = False
+        self._buf = np.empty((self.capacity, 6), dtype=float)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ---------------------------------------------------------------
+
+    def _phys(self, i: int) -> int:
+        return (self._start + i) % self.capacity
+
+    @property
+    def last_ts(self) -> Optional[float]:
+        if self._size == 0:
+            return None
+        return float(self._buf[self._phys(self._size - 1), 0])
+
+    @property
+    def first_ts(self) -> Optional[float]:
+        if self._size == 0:
+            return None
+        return float(self._buf[self._start, 0])
+
+    # ---------------------------------------------------------------
+
+    def to_array(self, limit: Optional[int] = None) -> np.ndarray:
+        """Copie ordonnée (ancien → récent) des `limit` dernières lignes."""
+        n = self._size if limit is None else max(0, min(int(limit), self._size))
+        if n == 0:
+            return np.empty((0, 6), dtype=float)
+        idx = (self._start + np.arange(self._size - n, self._size)) % self.capacity
+        return self._buf[idx].copy()
+
+    def to_frame(self, limit: Optional[int] = None) -> pd.DataFrame:
+        return rows_to_frame(self.to_array(limit))
+
+    # ---------------------------------------------------------------
+
+    def replace(self, rows: np.ndarray, exhausted: bool = False) -> None:
+        """Réinitialise le buffer avec `rows` (triées), en gardant les plus récentes."""
+        rows = rows[-self.capacity:]
+        n = rows.shape[0]
+        self._buf[:n] = rows
+        self._start = 0
+        self._size = n
+        self.exhausted = bool(exhausted)
+
+    def covers(self, limit: int) -> bool:
+        """Le buffer peut-il servir `limit` barres sans rechargement complet ?"""
+        if limit > self.capacity:
+            return False
+        return self._size >= limit or (self.exhausted and self._size > 0)
+
+    def _append(self, row: np.ndarray) -> None:
+        if self._size < self.capacity:
+            self._buf[self._phys(self._size)] = row
+            self._size += 1
+        else:
+            # buffer plein : on écrase la plus ancienne
+            self._buf[self._start] = row
+            self._start = (self._start + 1) % self.capacity
+
+    def merge(self, rows: np.ndarray) -> int:
+        """
+        Fusionne des lignes triées dans le buffer.
+
+        - ts == last_ts → la bougie ouverte est écrasée en place
+        - ts >  last_ts → ajout
+        - ts <  last_ts → mise à jour si le ts existe déjà, sinon ignorée
+
+        Retourne le nombre de lignes nouvelles ajoutées.
+        """
+        added = 0
+        for row in rows:
+            ts = row[0]
+            last = self.last_ts
+            if last is None or ts > last:
+                self._append(row)
+                added += 1
+            elif ts == last:
+                self._buf[self._phys(self._size - 1)] = row
+            else:
+                times = self.to_array()[:, 0]
+                pos = int(np.searchsorted(times, ts))
+                if pos < self._size and times[pos] == ts:
+                    self._buf[self._phys(pos)] = row
+        return added
+
+
+# =====================================================================
+# CACHE MULTI-SYMBOLES
+# =====================================================================
+
+class KlineCache:
+    """
+    Dictionnaire (symbole, interval) → KlineRingBuffer.
+
+    `min_capacity` fixe la taille minimale de chaque buffer ; un appel
+    demandant plus de barres agrandit le buffer au prochain rechargement.
+    """
+
+    def __init__(self, min_capacity: int = 300):
+        self.min_capacity = max(int(min_capacity), 1)
+        self._buffers: Dict[Tuple[str, str], KlineRingBuffer] = {}
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def get(self, symbol: str, interval: str) -> Optional[KlineRingBuffer]:
+        return self._buffers.get((symbol, interval))
+
+    def store(
+        self,
+        symbol: str,
+        interval: str,
+        rows: np.ndarray,
+        capacity: int,
+        exhausted: bool = False,
+    ) -> KlineRingBuffer:
+        """
+        Remplace (ou crée) le buffer de (symbole, interval) avec `rows`.
+        `exhausted` indique que l'exchange n'a pas renvoyé plus d'historique.
+        """
+        cap = max(int(capacity), self.min_capacity)
+        buf = self._buffers.get((symbol, interval))
+        if buf is None or buf.capacity < cap:
+            buf = KlineRingBuffer(cap)
+            self._buffers[(symbol, interval)] = buf
+        buf.replace(rows, exhausted=exhausted)
+        return buf
+
+    def drop(self, symbol: str, interval: Optional[str] = None) -> None:
+        if interval is not None:
+            self._buffers.pop((symbol, interval), None)
+            return
+        for key in [k for k in self._buffers if k[0] == symbol]:
+            del self._buffers[key]
+
+    def symbols(self) -> List[str]:
+        return sorted({k[0] for k in self._buffers})
@@ -0,0 +1,605 @@
+# =====================================================================
+# mock_exchange.py — Exchange Bitget / Binance local (aiohttp)
+# =====================================================================
+# Serveur autonome qui implémente les contrats HTTP utilisés par le bot,
+# pour des tests de charge hors ligne (cycles de 2 000 symboles sur un
+# portable) :
+#
+#   Bitget   GET  /api/v2/mix/market/contracts
+#            GET  /api/v3/market/candles
+#            POST /api/v2/mix/order/place-order
+#            POST /api/v2/mix/order/place-plan-order
+#   Binance  GET  /fapi/v1/exchangeInfo, /fapi/v1/premiumIndex,
+#                 /fapi/v1/ticker/24hr, /fapi/v1/openInterest,
+#                 /fapi/v1/fundingRate, /fapi/v1/klines,
+#                 /fapi/v1/forceOrders, /futures/data/openInterestHist,
+#                 /futures/data/globalLongShortAccountRatio
+#   Binance  WS   /stream?streams=!forceOrder@arr/!markPrice@arr@1s
+#   Mock     GET  /mock/stats
+#
+# Données synthétiques seedées (benchmarks.synthetic) : mêmes bougies
+# pour un même (symbole, seed). Latence (+ jitter), 429 (Retry-After),
+# erreurs HTTP et rejets d'ordres Bitget (code != "00000") injectés
+# avec des probabilités configurables, tirées d'un RNG seedé.
+#
+# Les deux exchanges partagent le même serveur (pas de chemin commun) :
+#
+#   python mock_exchange.py --port 8088 --symbols 2000 --latency-ms 30 --rate-429 0.01
+#   BITGET_BASE_URL=http://127.0.0.1:8088 BINANCE_FUTURES_URL=http://127.0.0.1:8088 python main.py
+#
+# Le stream WebSocket (BINANCE_WS_URL=http://127.0.0.1:8088) envoie
+# chaque ws_interval_ms une trame !markPrice@arr@1s de tout l'univers
+# et des liquidations !forceOrder@arr tirées du RNG seedé. Avec
+# --ws-frames (JSONL de trames combinées enregistrées), les trames sont
+# rejouées dans l'ordre, horodatées au présent. --ws-drop-after N coupe
+# la connexion toutes les N trames (test de reconnexion).
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from benchmarks.synthetic import symbol_seed, synthetic_ohlcv, universe_symbols
+from institutional_data import _binance_weight
+from kline_cache import INTERVAL_MS
+
+LOGGER = logging.getLogger(__name__)
+
+BINANCE_PREFIXES = ("/fapi/", "/futures/")
+ORDER_PATHS = ("/api/v2/mix/order/place-order", "/api/v2/mix/order/place-plan-order")
+BINANCE_INTERVALS = {"1h": "1H", "4h": "4H", "1d": "1D"}
+# bougies générées à l'avance (au-delà, la dernière bougie ne bouge plus)
+HORIZON_BARS = 500
+
+
+@dataclass
+class MockConfig:
+    symbols: int = 50
+    seed: int = 7
+    history_bars: int = 1_000
+    # réseau simulé
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # injections (probabilité par requête)
+    rate_429: float = 0.0
+    retry_after_s: float = 1.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    order_reject_rate: float = 0.0
+    order_reject_code: str = "40762"     # "order amount exceeds balance"
+    # stream WebSocket Binance
+    ws_interval_ms: float = 1_000.0
+    ws_liq_rate: float = 0.05            # probabilité de liquidation par symbole et par trame
+    ws_drop_after: int = 0               # coupe la connexion après N trames (0 = jamais)
+
+
+class MockExchange:
+    """Application aiohttp + état (données par symbole, ordres, compteurs)."""
+
+    def __init__(
+        self,
+        cfg: Optional[MockConfig] = None,
+        symbols: Optional[List[str]] = None,
+        ws_frames: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.cfg = cfg or MockConfig()
+        self.symbols: List[str] = list(symbols) if symbols else universe_symbols(self.cfg.symbols)
+        self._known = set(self.symbols)
+        self._rng = np.random.default_rng(self.cfg.seed)
+        self._frames: Dict[Tuple[str, str], np.ndarray] = {}
+        self.orders: List[Dict[str, Any]] = []
+        self.requests: Counter = Counter()
+        self.injected: Counter = Counter()
+        self._weight_minute = 0
+        self._weight_used = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._t0_ms = int(time.time() * 1000)
+        self.base_url = ""
+        # stream : trames enregistrées (None = synthétiques) + curseur
+        self.ws_frames = ws_frames
+        self._ws_cursor = 0
+        self._ws_shift: Optional[int] = None
+        self.ws_connections = 0
+        self.ws_sent = 0
+
+    # =================================================================
+    # DONNÉES
+    # =================================================================
+
+    def _rows(self, symbol: str, interval: str) -> np.ndarray:
+        """
+        (n x 7) time, open, high, low, close, volume, oi jusqu'à la bougie
+        courante incluse. La série est générée une fois avec HORIZON_BARS
+        bougies d'avance : une bougie garde les mêmes valeurs d'une
+        requête à l'autre (le cache incrémental du client reste cohérent).
+        """
+        key = (symbol, interval)
+        arr = self._frames.get(key)
+        if arr is None:
+            tf_ms = INTERVAL_MS[interval]
+            df = synthetic_ohlcv(
+                self.cfg.history_bars + HORIZON_BARS,
+                symbol_seed(symbol + interval, self.cfg.seed),
+                tf=interval,
+                end_ms=self._t0_ms + HORIZON_BARS * tf_ms,
+            )
+            arr = self._frames[key] = df[["time", "open", "high", "low", "close", "volume", "oi"]].to_numpy()
+        return arr[: int(np.searchsorted(arr[:, 0], time.time() * 1000, side="right"))]
+
+    def _sym_rng(self, symbol: str, salt: str) -> np.random.Generator:
+        return np.random.default_rng(symbol_seed(symbol + salt, self.cfg.seed))
+
+    @staticmethod
+    def _window(arr: np.ndarray, q, limit_default: int, limit_max: int) -> np.ndarray:
+        if "startTime" in q:
+            arr = arr[arr[:, 0] >= float(q["startTime"])]
+        if "endTime" in q:
+            arr = arr[arr[:, 0] <= float(q["endTime"])]
+        limit = min(int(q.get("limit", limit_default)), limit_max)
+        return arr[-limit:]
+
+    # =================================================================
+    # MIDDLEWARE : latence, 429, erreurs, compteurs
+    # =================================================================
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        path = request.path
+        self.requests[path] += 1
+        cfg = self.cfg
+
+        delay = cfg.latency_ms + (self._rng.random() * cfg.jitter_ms if cfg.jitter_ms > 0 else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+
+        binance = path.startswith(BINANCE_PREFIXES)
+        headers: Dict[str, str] = {}
+        if binance:
+            minute = int(time.time() // 60)
+            if minute != self._weight_minute:
+                self._weight_minute, self._weight_used = minute, 0
+            self._weight_used += _binance_weight(path, dict(request.query))
+            headers["X-MBX-USED-WEIGHT-1M"] = str(self._weight_used)
+
+        if path.startswith("/mock/") or path == "/stream":
+            return await handler(request)
+
+        if cfg.rate_429 > 0 and self._rng.random() < cfg.rate_429:
+            self.injected["429"] += 1
+            headers["Retry-After"] = f"{cfg.retry_after_s:g}"
+            body = {"code": -1003, "msg": "Too many requests."} if binance else {"code": "429", "msg": "Too Many Requests"}
+            return web.json_response(body, status=429, headers=headers)
+
+        if cfg.error_rate > 0 and self._rng.random() < cfg.error_rate:
+            self.injected[str(cfg.error_status)] += 1
+            body = {"code": -1000, "msg": "mock error"} if binance else {"code": "40000", "msg": "mock error"}
+            return web.json_response(body, status=cfg.error_status, headers=headers)
+
+        resp = await handler(request)
+        resp.headers.update(headers)
+        return resp
+
+    # =================================================================
+    # BITGET
+    # =================================================================
+
+    @staticmethod
+    def _bitget_ok(data: Any) -> web.Response:
+        return web.json_response({"code": "00000", "msg": "success", "requestTime": int(time.time() * 1000), "data": data})
+
+    async def bitget_contracts(self, request: web.Request) -> web.Response:
+        return self._bitget_ok([
+            {"symbol": s, "baseCoin": s[:-4], "quoteCoin": "USDT", "symbolStatus": "normal"}
+            for s in self.symbols
+        ])
+
+    async def bitget_candles(self, request: web.Request) -> web.Response:
+        q = request.query
+        symbol, interval = q.get("symbol", ""), q.get("interval", "")
+        if symbol not in self._known or interval not in INTERVAL_MS:
+            return web.json_response({"code": "40034", "msg": "Parameter does not exist"}, status=400)
+        arr = self._window(self._rows(symbol, interval), q, 100, 1_000)
+        # [ts, open, high, low, close, volume (base), turnover (quote)]
+        data = [
+            [str(int(r[0])), repr(r[1]), repr(r[2]), repr(r[3]), repr(r[4]), repr(r[5]), repr(r[5] * r[4])]
+            for r in arr.tolist()
+        ]
+        return self._bitget_ok(data)
+
+    async def bitget_order(self, request: web.Request) -> web.Response:
+        if not request.headers.get("ACCESS-KEY") or not request.headers.get("ACCESS-SIGN"):
+            return web.json_response({"code": "40006", "msg": "Invalid ACCESS_KEY"}, status=401)
+        try:
+            body = await request.json()
+        except Exception:
+            return web.json_response({"code": "40017", "msg": "Parameter verification failed"}, status=400)
+        if body.get("symbol") not in self._known:
+            return web.json_response({"code": "40034", "msg": "Parameter does not exist"}, status=400)
+
+        cfg = self.cfg
+        if cfg.order_reject_rate > 0 and self._rng.random() < cfg.order_reject_rate:
+            self.injected[cfg.order_reject_code] += 1
+            return web.json_response({"code": cfg.order_reject_code, "msg": "mock order rejected", "data": None})
+
+        order_id = str(10_000_000 + len(self.orders))
+        self.orders.append({"path": request.path, "orderId": order_id, "ts": time.time(), **body})
+        return self._bitget_ok({"orderId": order_id, "clientOid": body.get("clientOid")})
+
+    # =================================================================
+    # BINANCE USDⓈ-M
+    # =================================================================
+
+    def _binance_symbol(self, request: web.Request) -> Optional[str]:
+        sym = request.query.get("symbol")
+        return sym if sym in self._known else None
+
+    @staticmethod
+    def _bad_symbol() -> web.Response:
+        return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+
+    async def binance_exchange_info(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "symbols": [
+                {"symbol": s, "contractType": "PERPETUAL", "status": "TRADING", "quoteAsset": "USDT", "baseAsset": s[:-4]}
+                for s in self.symbols
+            ],
+        })
+
+    def _premium_row(self, s: str) -> Dict[str, Any]:
+        last = self._rows(s, "1H")[-1]
+        rng = self._sym_rng(s, "funding")
+        now = int(time.time() * 1000)
+        return {
+            "symbol": s,
+            "markPrice": f"{last[4]:.8f}",
+            "indexPrice": f"{last[4] * (1 + rng.normal(0, 2e-4)):.8f}",
+            "lastFundingRate": f"{rng.normal(1e-4, 2e-4):.8f}",
+            "nextFundingTime": now - now % (8 * 3_600_000) + 8 * 3_600_000,
+            "time": now,
+        }
+
+    async def binance_premium_index(self, request: web.Request) -> web.Response:
+        if "symbol" in request.query:
+            sym = self._binance_symbol(request)
+            return web.json_response(self._premium_row(sym)) if sym else self._bad_symbol()
+        return web.json_response([self._premium_row(s) for s in self.symbols])
+
+    def _ticker_row(self, s: str) -> Dict[str, Any]:
+        arr = self._rows(s, "1H")[-24:]
+        first, last = arr[0, 1], arr[-1, 4]
+        return {
+            "symbol": s,
+            "lastPrice": f"{last:.8f}",
+            "priceChangePercent": f"{(last / first - 1) * 100:.3f}",
+            "volume": f"{arr[:, 5].sum():.3f}",
+            "quoteVolume": f"{(arr[:, 5] * arr[:, 4]).sum():.3f}",
+        }
+
+    async def binance_ticker_24hr(self, request: web.Request) -> web.Response:
+        if "symbol" in request.query:
+            sym = self._binance_symbol(request)
+            return web.json_response(self._ticker_row(sym)) if sym else self._bad_symbol()
+        return web.json_response([self._ticker_row(s) for s in self.symbols])
+
+    async def binance_open_interest(self, request: web.Request) -> web.Response:
+        sym = self._binance_symbol(request)
+        if sym is None:
+            return self._bad_symbol()
+        last = self._rows(sym, "1H")[-1]
+        return web.json_response({"symbol": sym, "openInterest": f"{last[6]:.3f}", "time": int(time.time() * 1000)})
+
+    async def binance_funding_rate(self, request: web.Request) -> web.Response:
+        sym = self._binance_symbol(request)
+        if sym is None:
+            return self._bad_symbol()
+        limit = min(int(request.query.get("limit", 100)), 1_000)
+        rng = self._sym_rng(sym, "funding")
+        rates = rng.normal(1e-4, 2e-4, limit)
+        now = int(time.time() * 1000)
+        t0 = now - now % (8 * 3_600_000)
+        return web.json_response([
+            {"symbol": sym, "fundingRate": f"{r:.8f}", "fundingTime": t0 - (limit - 1 - k) * 8 * 3_600_000}
+            for k, r in enumerate(rates)
+        ])
+
+    async def binance_klines(self, request: web.Request) -> web.Response:
+        sym = self._binance_symbol(request)
+        interval = BINANCE_INTERVALS.get(request.query.get("interval", ""))
+        if sym is None or interval is None:
+            return self._bad_symbol()
+        arr = self._window(self._rows(sym, interval), request.query, 500, 1_500)
+        taker = self._sym_rng(sym, "taker" + interval).uniform(0.3, 0.7, len(self._rows(sym, interval)))[-len(arr):]
+        tf = INTERVAL_MS[interval]
+        out = []
+        for r, share in zip(arr.tolist(), taker.tolist()):
+            vol = r[5]
+            out.append([
+                int(r[0]), repr(r[1]), repr(r[2]), repr(r[3]), repr(r[4]), repr(vol),
+                int(r[0]) + tf - 1, repr(vol * r[4]), 100,
+                repr(vol * share), repr(vol * share * r[4]), "0",
+            ])
+        return web.json_response(out)
+
+    async def binance_force_orders(self, request: web.Request) -> web.Response:
+        sym = self._binance_symbol(request)
+        if sym is None:
+            return self._bad_symbol()
+        limit = min(int(request.query.get("limit", 50)), 100)
+        rng = self._sym_rng(sym, "liq")
+        n = int(rng.integers(0, limit + 1))
+        px = self._rows(sym, "1H")[-1, 4]
+        now = int(time.time() * 1000)
+        return web.json_response([
+            {
+                "symbol": sym,
+                "side": "BUY" if rng.random() < 0.5 else "SELL",
+                "origQty": f"{q:.3f}",
+                "executedQty": f"{q:.3f}",
+                "price": f"{px:.8f}",
+                "status": "FILLED",
+                "time": now - k * 60_000,
+            }
+            for k, q in enumerate(rng.exponential(10.0, n))
+        ])
+
+    async def binance_oi_hist(self, request: web.Request) -> web.Response:
+        sym = self._binance_symbol(request)
+        interval = BINANCE_INTERVALS.get(request.query.get("period", "4h"))
+        if sym is None or interval is None:
+            return self._bad_symbol()
+        arr = self._window(self._rows(sym, interval), request.query, 30, 500)
+        return web.json_response([
+            {
+                "symbol": sym,
+                "sumOpenInterest": f"{r[6]:.3f}",
+                "sumOpenInterestValue": f"{r[6] * r[4]:.3f}",
+                "timestamp": int(r[0]),
+            }
+            for r in arr.tolist()
+        ])
+
+    async def binance_long_short(self, request: web.Request) -> web.Response:
+        sym = self._binance_symbol(request)
+        interval = BINANCE_INTERVALS.get(request.query.get("period", "4h"))
+        if sym is None or interval is None:
+            return self._bad_symbol()
+        arr = self._window(self._rows(sym, interval), request.query, 30, 500)
+        longs = self._sym_rng(sym, "ls").uniform(0.35, 0.65, len(arr))
+        return web.json_response([
+            {
+                "symbol": sym,
+                "longShortRatio": f"{la / (1 - la):.4f}",
+                "longAccount": f"{la:.4f}",
+                "shortAccount": f"{1 - la:.4f}",
+                "timestamp": int(r[0]),
+            }
+            for r, la in zip(arr.tolist(), longs.tolist())
+        ])
+
+    # =================================================================
+    # BINANCE WEBSOCKET (/stream)
+    # =================================================================
+
+    def _ws_tick(self) -> List[Dict[str, Any]]:
+        """Une trame synthétique : mark price de l'univers + liquidations."""
+        now = int(time.time() * 1000)
+        marks = []
+        for s in self.symbols:
+            row = self._premium_row(s)
+            marks.append({
+                "e": "markPriceUpdate", "E": now, "s": s,
+                "p": row["markPrice"], "i": row["indexPrice"],
+                "r": row["lastFundingRate"], "T": row["nextFundingTime"],
+            })
+        frames: List[Dict[str, Any]] = [{"stream": "!markPrice@arr@1s", "data": marks}]
+        for s in self.symbols:
+            if self._rng.random() >= self.cfg.ws_liq_rate:
+                continue
+            qty = f"{self._rng.exponential(10.0):.3f}"
+            px = f"{self._rows(s, '1H')[-1, 4]:.8f}"
+            frames.append({"stream": "!forceOrder@arr", "data": {
+                "e": "forceOrder", "E": now,
+                "o": {
+                    "s": s, "S": "BUY" if self._rng.random() < 0.5 else "SELL",
+                    "o": "LIMIT", "f": "IOC", "q": qty, "p": px, "ap": px,
+                    "X": "FILLED", "l": qty, "z": qty, "T": now,
+                },
+            }})
+        return frames
+
+    @staticmethod
+    def _frame_ts(frame: Dict[str, Any]) -> Optional[int]:
+        data = frame.get("data", frame)
+        if isinstance(data, list):
+            data = data[0] if data else {}
+        return int(data["E"]) if isinstance(data, dict) and data.get("E") else None
+
+    @staticmethod
+    def _retime(frame: Dict[str, Any], shift: int) -> Dict[str, Any]:
+        """Décale E (et T des liquidations) de `shift` ms."""
+        frame = copy.deepcopy(frame)
+        data = frame.get("data", frame)
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                continue
+            if item.get("E"):
+                item["E"] = int(item["E"]) + shift
+            order = item.get("o")
+            if isinstance(order, dict) and order.get("T"):
+                order["T"] = int(order["T"]) + shift
+        return frame
+
+    def _ws_next_recorded(self) -> List[Dict[str, Any]]:
+        """Trame enregistrée suivante (curseur partagé entre connexions)."""
+        if self._ws_cursor >= len(self.ws_frames):
+            return []
+        frame = self.ws_frames[self._ws_cursor]
+        self._ws_cursor += 1
+        if self._ws_shift is None:
+            first = self._frame_ts(frame)
+            self._ws_shift = int(time.time() * 1000) - first if first else 0
+        return [self._retime(frame, self._ws_shift)]
+
+    async def binance_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.ws_connections += 1
+        cfg = self.cfg
+        sent = 0
+        try:
+            while not ws.closed:
+                batch = self._ws_tick() if self.ws_frames is None else self._ws_next_recorded()
+                for frame in batch:
+                    await ws.send_str(json.dumps(frame))
+                    sent += 1
+                    self.ws_sent += 1
+                    if cfg.ws_drop_after and sent >= cfg.ws_drop_after:
+                        self.injected["ws_drop"] += 1
+                        await ws.close()
+                        return ws
+                # attente de la trame suivante en lisant : une fermeture
+                # côté client est vue tout de suite (cleanup du serveur)
+                try:
+                    msg = await ws.receive(timeout=cfg.ws_interval_ms / 1000.0)
+                except asyncio.TimeoutError:
+                    continue
+                if msg.type in (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED, WSMsgType.ERROR):
+                    break
+        except ConnectionResetError:
+            pass
+        return ws
+
+    # =================================================================
+    # SERVEUR
+    # =================================================================
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self.symbols),
+            "requests": dict(self.requests),
+            "total_requests": int(sum(self.requests.values())),
+            "injected": dict(self.injected),
+            "orders": len(self.orders),
+            "ws_connections": self.ws_connections,
+            "ws_frames": self.ws_sent,
+        }
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        r = app.router
+        r.add_get("/api/v2/mix/market/contracts", self.bitget_contracts)
+        r.add_get("/api/v3/market/candles", self.bitget_candles)
+        for path in ORDER_PATHS:
+            r.add_post(path, self.bitget_order)
+        r.add_get("/fapi/v1/exchangeInfo", self.binance_exchange_info)
+        r.add_get("/fapi/v1/premiumIndex", self.binance_premium_index)
+        r.add_get("/fapi/v1/ticker/24hr", self.binance_ticker_24hr)
+        r.add_get("/fapi/v1/openInterest", self.binance_open_interest)
+        r.add_get("/fapi/v1/fundingRate", self.binance_funding_rate)
+        r.add_get("/fapi/v1/klines", self.binance_klines)
+        r.add_get("/fapi/v1/forceOrders", self.binance_force_orders)
+        r.add_get("/futures/data/openInterestHist", self.binance_oi_hist)
+        r.add_get("/futures/data/globalLongShortAccountRatio", self.binance_long_short)
+        r.add_get("/stream", self.binance_stream)
+        r.add_get("/mock/stats", self.stats_handler)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Démarre le serveur (port 0 = port libre) → URL de base."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# =====================================================================
+# CLI
+# =====================================================================
+
+def load_ws_frames(path: str) -> List[Dict[str, Any]]:
+    """Trames {"stream": ..., "data": ...} d'un fichier JSONL."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+async def _serve(exchange: MockExchange, host: str, port: int) -> None:
+    url = await exchange.start(host, port)
+    print(f"🧪 mock exchange : {len(exchange.symbols)} symboles sur {url}")
+    print(f"   export BITGET_BASE_URL={url} BINANCE_FUTURES_URL={url} BINANCE_WS_URL={url} BINANCE_WS_ENABLED=true")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await exchange.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="local mock Bitget / Binance exchange")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8088)
+    ap.add_argument("--symbols", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--history-bars", type=int, default=1_000)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0, help="probabilité de 429 par requête")
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="probabilité d'erreur HTTP par requête")
+    ap.add_argument("--error-status", type=int, default=500)
+    ap.add_argument("--order-reject-rate", type=float, default=0.0)
+    ap.add_argument("--order-reject-code", default="40762")
+    ap.add_argument("--ws-interval-ms", type=float, default=1_000.0)
+    ap.add_argument("--ws-liq-rate", type=float, default=0.05, help="probabilité de liquidation par symbole et par trame")
+    ap.add_argument("--ws-drop-after", type=int, default=0, help="coupe le stream toutes les N trames")
+    ap.add_argument("--ws-frames", default="", help="JSONL de trames du stream combiné à rejouer")
+    args = ap.parse_args(argv)
+
+    cfg = MockConfig(
+        symbols=args.symbols,
+        seed=args.seed,
+        history_bars=args.history_bars,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        retry_after_s=args.retry_after,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        order_reject_rate=args.order_reject_rate,
+        order_reject_code=args.order_reject_code,
+        ws_interval_ms=args.ws_interval_ms,
+        ws_liq_rate=args.ws_liq_rate,
+        ws_drop_after=args.ws_drop_after,
+    )
+    frames = load_ws_frames(args.ws_frames) if args.ws_frames else None
+    try:
+        asyncio.run(_serve(MockExchange(cfg, ws_frames=frames), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
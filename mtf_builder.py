@@ -0,0 +1,133 @@
+# =====================================================================
+# mtf_builder.py — Multi-timeframe local (H4 / D1 dérivés du H1)
+# =====================================================================
+# Une bougie H4 est une agrégation fixe de 4 bougies H1 :
+#   open = 1er open, high = max, low = min, close = dernier close,
+#   volume = somme, alignées sur les frontières UTC de l'exchange.
+# On évite donc un appel REST H4 par symbole en rééchantillonnant une
+# série H1 profonde (déjà en cache dans BitgetClient).
+#
+# Opt-in : DERIVE_HTF_FROM_H1=true. Si l'historique H1 est trop court,
+# on retombe sur un fetch direct du H4.
+# =====================================================================
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kline_cache import INTERVAL_MS, OHLCV_COLUMNS
+from settings import (
+    DERIVE_HTF_FROM_H1,
+    MTF_H1_BARS,
+    MTF_MIN_HTF_BARS,
+    MTF_D1_OFFSET_H,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# Décalage des frontières de bucket par rapport à minuit UTC (ms)
+BUCKET_OFFSET_MS: Dict[str, int] = {
+    "4H": 0,
+    "1D": int(float(MTF_D1_OFFSET_H) * 3_600_000),
+}
+
+
+# =====================================================================
+# RESAMPLING VECTORISÉ
+# =====================================================================
+
+def resample_rows(rows: np.ndarray, src_tf: str, dst_tf: str) -> np.ndarray:
+    """
+    Agrège un array OHLCV (n x 6, trié) de `src_tf` vers `dst_tf`.
+
+    - Buckets alignés sur (ts - offset) // dst_ms.
+    - Le premier bucket est retiré s'il est incomplet (début d'historique
+      au milieu d'un bucket) ; le dernier est gardé même partiel, comme
+      la bougie ouverte renvoyée par l'exchange.
+    """
+    if rows is None or rows.shape[0] == 0:
+        return np.empty((0, 6), dtype=float)
+
+    src_ms = INTERVAL_MS[src_tf]
+    dst_ms = INTERVAL_MS[dst_tf]
+    if dst_ms % src_ms != 0:
+        raise ValueError(f"{dst_tf} is not a multiple of {src_tf}")
+
+    offset = BUCKET_OFFSET_MS.get(dst_tf, 0)
+    ts = rows[:, 0].astype(np.int64)
+    bucket = ((ts - offset) // dst_ms) * dst_ms + offset
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    out = np.empty((starts.size, 6), dtype=float)
+    out[:, 0] = bucket[starts]
+    out[:, 1] = rows[starts, 1]
+    out[:, 2] = np.maximum.reduceat(rows[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(rows[:, 3], starts)
+    out[:, 4] = rows[np.r_[starts[1:] - 1, rows.shape[0] - 1], 4]
+    out[:, 5] = np.add.reduceat(rows[:, 5], starts)
+
+    # premier bucket tronqué (l'historique H1 commence en cours de bucket)
+    if ts[0] != bucket[0]:
+        out = out[1:]
+
+    return out
+
+
+def resample_frame(df: pd.DataFrame, src_tf: str, dst_tf: str) -> pd.DataFrame:
+    """Version DataFrame de resample_rows (colonnes OHLCV standard)."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    rows = df[OHLCV_COLUMNS].to_numpy(dtype=float)
+    out = resample_rows(rows, src_tf, dst_tf)
+    if out.shape[0] == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(out, columns=OHLCV_COLUMNS)
+
+
+def derive_timeframes(df_h1: pd.DataFrame, tfs: Iterable[str] = ("4H",)) -> Dict[str, pd.DataFrame]:
+    """{tf: DataFrame} dérivés d'une série H1 (ex. ("4H", "1D"))."""
+    return {tf: resample_frame(df_h1, "1H", tf) for tf in tfs}
+
+
+# =====================================================================
+# FETCH H1 + H4 (opt-in local)
+# =====================================================================
+
+async def fetch_h1_h4(
+    client,
+    symbol: str,
+    h1_limit: int = 200,
+    h4_limit: int = 200,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Renvoie (df_h1, df_h4) pour le scanner.
+
+    - Mode classique : deux appels get_klines_df (1H et 4H).
+    - DERIVE_HTF_FROM_H1 : un seul H1 profond (MTF_H1_BARS), H4 dérivé
+      localement ; fetch direct du H4 si moins de MTF_MIN_HTF_BARS barres.
+    """
+    if not DERIVE_HTF_FROM_H1:
+        df_h1 = await client.get_klines_df(symbol, "1H", h1_limit)
+        df_h4 = await client.get_klines_df(symbol, "4H", h4_limit)
+        return df_h1, df_h4
+
+    deep = await client.get_klines_df(symbol, "1H", max(int(MTF_H1_BARS), h1_limit))
+    if deep.empty:
+        return deep, pd.DataFrame()
+
+    df_h4 = resample_frame(deep, "1H", "4H")
+    if len(df_h4) < int(MTF_MIN_HTF_BARS):
+        LOGGER.debug(
+            "[MTF] %s: %d H4 dérivées < %s → fetch direct",
+            symbol, len(df_h4), MTF_MIN_HTF_BARS,
+        )
+        df_h4 = await client.get_klines_df(symbol, "4H", h4_limit)
+    else:
+        df_h4 = df_h4.tail(h4_limit).reset_index(drop=True)
+
+    df_h1 = deep.tail(h1_limit).reset_index(drop=True)
+    return df_h1, df_h4
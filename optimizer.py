@@ -0,0 +1,474 @@
+# =====================================================================
+# optimizer.py — Balayage de paramètres + walk-forward sur le backtest
+# =====================================================================
+# Évalue une grille (ou un tirage aléatoire) de seuils des gates sur les
+# OHLCV stockés, avec le moteur de backtest.py :
+#
+#   rr_min_inst     RR minimum de base (RR_MIN_INST)        → gate RR
+#   atr_buffer      marge ATR du stop (STOP_ATR_BUFFER)     → SL / TP / RR
+#   ob_impulse_pct  impulsion d'order block (OB_IMPULSE_PCT) → structure
+#   entry_timeout / max_hold / fee_bps                      → simulation
+#
+# Rien de ce qui ne dépend pas du paramètre testé n'est recalculé :
+#   1. par symbole (une fois) : indicateurs globaux, pré-filtre, fenêtres
+#      et FeatureContext (backtest.prepare_frames / bar_inputs) ;
+#   2. par ob_impulse_pct : barres qui passent tendance / HTF / BOS /
+#      momentum / extension (+ régime de vol. et momentum composite) ;
+#   3. par atr_buffer : SL / TP1 / RR de ces barres ;
+#   4. par jeu complet : seuil RR dynamique + simulation (quelques µs).
+# Un process par symbole (ProcessPoolExecutor), chaque process évalue
+# tous les jeux de paramètres sur son symbole.
+#
+# Walk-forward : l'historique est découpé en (folds + 1) tranches ; le
+# fold k choisit le meilleur jeu sur la (les) tranche(s) d'entraînement
+# et le mesure sur la tranche k + 1 (hors échantillon).
+#
+# Résultats : .npz compressé en colonnes (param_*, métriques, wf_*),
+# classés selon l'objectif.
+#
+#   python optimizer.py --data ./ohlcv --grid rr_min_inst=1.2,1.3,1.5 \
+#       --grid atr_buffer=0.1,0.2,0.3 --folds 4 --out sweep.npz
+#   python optimizer.py --data ./ohlcv --random 64 \
+#       --space rr_min_inst=1.1:2.0 --space atr_buffer=0.05:0.5 --seed 7
+# =====================================================================
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analyze_signal import _compute_exits, _safe_rr, dynamic_rr_min, run_analysis
+from backtest import (
+    BacktestConfig,
+    _simulate,
+    bar_inputs,
+    discover_symbols,
+    gate_params,
+    load_symbol,
+    prepare_frames,
+)
+from gate_order import DEFAULT_GATE_ORDER
+
+LOGGER = logging.getLogger(__name__)
+
+# paramètres balayables (champs de BacktestConfig) → type
+SWEEPABLE: Dict[str, type] = {
+    "rr_min_inst": float,
+    "atr_buffer": float,
+    "ob_impulse_pct": float,
+    "entry_timeout": int,
+    "max_hold": int,
+    "fee_bps": float,
+}
+
+METRICS = ("trades", "win_rate", "avg_r", "total_r", "profit_factor", "max_drawdown_r")
+OBJECTIVES = ("total_r", "avg_r", "profit_factor", "win_rate")
+
+
+# =====================================================================
+# ESPACE DE RECHERCHE
+# =====================================================================
+
+def _split_spec(spec: str) -> Tuple[str, str]:
+    name, _, values = spec.partition("=")
+    name = name.strip()
+    if name not in SWEEPABLE:
+        raise ValueError(f"paramètre inconnu '{name}' (balayables : {', '.join(SWEEPABLE)})")
+    if not values.strip():
+        raise ValueError(f"aucune valeur pour '{name}'")
+    return name, values
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[Any]]:
+    """["rr_min_inst=1.2,1.3", ...] → {"rr_min_inst": [1.2, 1.3], ...}."""
+    axes: Dict[str, List[Any]] = {}
+    for spec in specs:
+        name, values = _split_spec(spec)
+        cast = SWEEPABLE[name]
+        axes[name] = [cast(v) for v in values.split(",") if v.strip()]
+    return axes
+
+
+def grid_space(axes: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Produit cartésien des axes."""
+    names = list(axes)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(axes[n] for n in names))]
+
+
+def parse_space(specs: Sequence[str]) -> Dict[str, Tuple[float, float]]:
+    """["atr_buffer=0.05:0.5", ...] → {"atr_buffer": (0.05, 0.5), ...}."""
+    bounds: Dict[str, Tuple[float, float]] = {}
+    for spec in specs:
+        name, values = _split_spec(spec)
+        lo, _, hi = values.partition(":")
+        lo_f, hi_f = float(lo), float(hi or lo)
+        bounds[name] = (min(lo_f, hi_f), max(lo_f, hi_f))
+    return bounds
+
+
+def random_space(bounds: Dict[str, Tuple[float, float]], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """n tirages uniformes (entiers pour les paramètres int), arrondis et dédoublonnés."""
+    rng = np.random.default_rng(seed)
+    out: List[Dict[str, Any]] = []
+    seen = set()
+    for _ in range(int(n)):
+        ps: Dict[str, Any] = {}
+        for name, (lo, hi) in bounds.items():
+            if SWEEPABLE[name] is int:
+                ps[name] = int(rng.integers(int(lo), int(hi) + 1))
+            else:
+                ps[name] = round(float(rng.uniform(lo, hi)), 4)
+        key = tuple(sorted(ps.items()))
+        if key not in seen:
+            seen.add(key)
+            out.append(ps)
+    return out
+
+
+# =====================================================================
+# ÉVALUATION D'UN SYMBOLE (process worker)
+# =====================================================================
+
+@dataclass
+class _Survivor:
+    """Barre qui passe toutes les gates sauf le RR (indépendant de atr_buffer / rr_min_inst)."""
+    i: int
+    bias: str
+    entry: float
+    w1: pd.DataFrame
+    ctx1: Any
+    vol_regime: str
+    comp_score: float
+    exits: Dict[str, Any]
+    rr: Optional[float]
+
+
+def _survivors(prep, cfg: BacktestConfig) -> List[_Survivor]:
+    out: List[_Survivor] = []
+    params = gate_params(cfg)
+    for i in np.flatnonzero(prep.mask):
+        w1, w4, ctx1, ctx4 = bar_inputs(prep, int(i), cfg)
+        res = run_analysis(prep.symbol, w1, w4, cfg.rr_min_inst, ctx1, ctx4, order=DEFAULT_GATE_ORDER, params=params)
+        # RR en dernier : une barre rejetée ailleurs ne peut devenir un signal
+        if res["gate"] not in (None, "rr"):
+            continue
+        out.append(_Survivor(
+            i=int(i),
+            bias=res["bias"],
+            entry=res["entry"],
+            w1=w1,
+            ctx1=ctx1,
+            vol_regime=res["vol_regime"],
+            comp_score=res["comp_score"],
+            exits=res["exits"],
+            rr=res["rr"],
+        ))
+    return out
+
+
+def _exits_for(surv: List[_Survivor], atr_buffer: float, base: float) -> List[Tuple[float, float, Optional[float]]]:
+    rows = []
+    for s in surv:
+        if atr_buffer == base:
+            exits, rr = s.exits, s.rr
+        else:
+            exits = _compute_exits(s.w1, s.entry, s.bias, tick=0.1, ctx=s.ctx1, atr_buffer=atr_buffer)
+            rr = _safe_rr(s.entry, exits["sl"], exits["tp1"], s.bias)
+        rows.append((exits["sl"], exits["tp1"], rr))
+    return rows
+
+
+def _sweep_frames(
+    symbol: str,
+    df_h1: pd.DataFrame,
+    df_h4: pd.DataFrame,
+    base: BacktestConfig,
+    param_sets: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Tous les jeux de paramètres sur un symbole → (signal_time, R) par jeu."""
+    t0 = time.perf_counter()
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+    result: Dict[str, Any] = {"symbol": symbol, "span": None, "runs": [empty] * len(param_sets), "elapsed_s": 0.0}
+
+    prep = prepare_frames(symbol, df_h1, df_h4, base)
+    if prep is None:
+        return result
+    result["span"] = (int(prep.t[0]), int(prep.t[-1]))
+
+    surv_cache: Dict[float, List[_Survivor]] = {}
+    exits_cache: Dict[Tuple[float, float], List[Tuple[float, float, Optional[float]]]] = {}
+
+    runs = []
+    for ps in param_sets:
+        cfg = replace(base, **ps)
+        surv = surv_cache.get(cfg.ob_impulse_pct)
+        if surv is None:
+            surv = surv_cache[cfg.ob_impulse_pct] = _survivors(prep, replace(base, ob_impulse_pct=cfg.ob_impulse_pct))
+        ek = (cfg.ob_impulse_pct, cfg.atr_buffer)
+        exits = exits_cache.get(ek)
+        if exits is None:
+            exits = exits_cache[ek] = _exits_for(surv, cfg.atr_buffer, base.atr_buffer)
+
+        times: List[int] = []
+        rs: List[float] = []
+        busy_until = -1
+        for s, (sl, tp1, rr) in zip(surv, exits):
+            if s.i <= busy_until:
+                continue
+            if rr is None or rr < dynamic_rr_min(cfg.rr_min_inst, s.vol_regime, s.comp_score):
+                continue
+            trade, busy_until = _simulate(symbol, s.i, s.bias, s.entry, sl, tp1, rr, prep.t, prep.h, prep.l, prep.c, cfg)
+            if trade is not None:
+                times.append(trade.signal_time)
+                rs.append(trade.r_multiple)
+        runs.append((np.asarray(times, dtype=np.int64), np.asarray(rs, dtype=float)))
+
+    result["runs"] = runs
+    result["elapsed_s"] = time.perf_counter() - t0
+    return result
+
+
+def _sweep_file(symbol: str, path: str, base: BacktestConfig, param_sets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Point d'entrée du process worker (charge lui-même ses données)."""
+    try:
+        df_h1, df_h4 = load_symbol(path)
+        return _sweep_frames(symbol, df_h1, df_h4, base, param_sets)
+    except Exception as exc:
+        LOGGER.error(f"[OPTIMIZER] {symbol}: {exc}")
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+        return {"symbol": symbol, "span": None, "runs": [empty] * len(param_sets), "elapsed_s": 0.0}
+
+
+def run_sweep(
+    files: Dict[str, str],
+    param_sets: List[Dict[str, Any]],
+    base: Optional[BacktestConfig] = None,
+    workers: int = 0,
+) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], Tuple[int, int]]:
+    """
+    Évalue `param_sets` sur {symbol: chemin H1} → par jeu (signal_time, R)
+    triés dans le temps, et l'étendue temporelle des données.
+    """
+    base = base or BacktestConfig()
+    workers = int(workers) if int(workers) > 0 else (os.cpu_count() or 1)
+
+    if workers == 1:
+        parts = [_sweep_file(s, p, base, param_sets) for s, p in files.items()]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_sweep_file, s, p, base, param_sets) for s, p in files.items()]
+            parts = [f.result() for f in futures]
+
+    runs: List[Tuple[np.ndarray, np.ndarray]] = []
+    for k in range(len(param_sets)):
+        t = np.concatenate([p["runs"][k][0] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        r = np.concatenate([p["runs"][k][1] for p in parts]) if parts else np.empty(0, dtype=float)
+        order = np.argsort(t, kind="stable")
+        runs.append((t[order], r[order]))
+
+    spans = [p["span"] for p in parts if p["span"] is not None]
+    span = (min(s[0] for s in spans), max(s[1] for s in spans)) if spans else (0, 0)
+    return runs, span
+
+
+# =====================================================================
+# MÉTRIQUES / WALK-FORWARD
+# =====================================================================
+
+def trade_metrics(r: np.ndarray) -> Dict[str, float]:
+    """Métriques en R d'une suite de trades ordonnée dans le temps."""
+    n = int(r.size)
+    if n == 0:
+        return {"trades": 0, "win_rate": 0.0, "avg_r": 0.0, "total_r": 0.0, "profit_factor": 0.0, "max_drawdown_r": 0.0}
+    wins = r[r > 0]
+    gross_loss = float(-r[r <= 0].sum())
+    equity = np.cumsum(r)
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+    return {
+        "trades": n,
+        "win_rate": float(wins.size / n),
+        "avg_r": float(r.mean()),
+        "total_r": float(r.sum()),
+        "profit_factor": float(wins.sum() / gross_loss) if gross_loss > 0 else float("inf"),
+        "max_drawdown_r": float(drawdown.max()),
+    }
+
+
+def _score(m: Dict[str, float], objective: str, min_trades: int) -> float:
+    return float(m[objective]) if m["trades"] >= min_trades else float("-inf")
+
+
+def walk_forward_splits(t_start: int, t_end: int, folds: int, anchored: bool = True) -> List[Tuple[int, int, int, int]]:
+    """
+    (train_a, train_b, test_a, test_b) en ms, bornes [a, b). (folds + 1)
+    tranches égales ; ancré : l'entraînement part toujours du début.
+    """
+    if folds <= 0 or t_end <= t_start:
+        return []
+    edges = np.linspace(t_start, t_end + 1, folds + 2).astype(np.int64)
+    out = []
+    for k in range(folds):
+        train_a = int(edges[0] if anchored else edges[k])
+        out.append((train_a, int(edges[k + 1]), int(edges[k + 1]), int(edges[k + 2])))
+    return out
+
+
+def _window(run: Tuple[np.ndarray, np.ndarray], a: int, b: int) -> np.ndarray:
+    t, r = run
+    lo, hi = np.searchsorted(t, [a, b], side="left")
+    return r[lo:hi]
+
+
+def walk_forward(
+    runs: List[Tuple[np.ndarray, np.ndarray]],
+    splits: List[Tuple[int, int, int, int]],
+    objective: str = "total_r",
+    min_trades: int = 1,
+) -> List[Dict[str, Any]]:
+    """Par fold : meilleur jeu sur l'entraînement et ses métriques hors échantillon."""
+    folds = []
+    for k, (ta, tb, sa, sb) in enumerate(splits):
+        train = [trade_metrics(_window(run, ta, tb)) for run in runs]
+        scores = np.array([_score(m, objective, min_trades) for m in train])
+        best = int(np.argmax(scores)) if scores.size else -1
+        test = trade_metrics(_window(runs[best], sa, sb)) if best >= 0 else trade_metrics(np.empty(0))
+        folds.append({
+            "fold": k,
+            "train": (ta, tb),
+            "test": (sa, sb),
+            "best": best,
+            "train_metrics": train[best] if best >= 0 else None,
+            "test_metrics": test,
+        })
+    return folds
+
+
+def rank_results(
+    runs: List[Tuple[np.ndarray, np.ndarray]],
+    objective: str = "total_r",
+    min_trades: int = 1,
+) -> Tuple[List[Dict[str, float]], np.ndarray]:
+    """Métriques par jeu + ordre de classement (meilleur d'abord, stable)."""
+    metrics = [trade_metrics(r) for _, r in runs]
+    scores = np.array([_score(m, objective, min_trades) for m in metrics])
+    return metrics, np.argsort(-scores, kind="stable")
+
+
+# =====================================================================
+# RÉSULTATS (.npz en colonnes)
+# =====================================================================
+
+def save_results(
+    path: str,
+    param_sets: List[Dict[str, Any]],
+    metrics: List[Dict[str, float]],
+    order: np.ndarray,
+    folds: List[Dict[str, Any]],
+    meta: Dict[str, Any],
+) -> None:
+    """Une colonne par paramètre / métrique, lignes dans l'ordre du classement."""
+    cols: Dict[str, np.ndarray] = {"set_id": order.astype(np.int32)}
+    names = sorted({k for ps in param_sets for k in ps})
+    for name in names:
+        dtype = np.int32 if SWEEPABLE[name] is int else np.float64
+        cols[f"param_{name}"] = np.array([param_sets[i].get(name, np.nan) for i in order], dtype=dtype)
+    for m in METRICS:
+        dtype = np.int32 if m == "trades" else np.float64
+        cols[m] = np.array([metrics[i][m] for i in order], dtype=dtype)
+
+    cols["wf_best"] = np.array([f["best"] for f in folds], dtype=np.int32)
+    cols["wf_train"] = np.array([f["train"] for f in folds], dtype=np.int64).reshape(-1, 2)
+    cols["wf_test"] = np.array([f["test"] for f in folds], dtype=np.int64).reshape(-1, 2)
+    for m in METRICS:
+        cols[f"wf_train_{m}"] = np.array([(f["train_metrics"] or {}).get(m, np.nan) for f in folds], dtype=np.float64)
+        cols[f"wf_test_{m}"] = np.array([f["test_metrics"][m] for f in folds], dtype=np.float64)
+    cols["meta"] = np.array(json.dumps(meta, default=str))
+    np.savez_compressed(path, **cols)
+
+
+def load_results(path: str) -> pd.DataFrame:
+    """Tableau classé (set_id, param_*, métriques) d'un fichier save_results."""
+    with np.load(path) as z:
+        cols = [k for k in z.files if not k.startswith("wf_") and k != "meta"]
+        return pd.DataFrame({k: z[k] for k in cols})
+
+
+# =====================================================================
+# CLI
+# =====================================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Balayage de paramètres + walk-forward (backtest des gates)")
+    ap.add_argument("--data", required=True, help="dossier des CSV OHLCV par symbole")
+    ap.add_argument("--symbols", default="", help="liste séparée par des virgules (défaut : tous)")
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--grid", action="append", default=[], help="nom=v1,v2,... (répétable)")
+    ap.add_argument("--random", type=int, default=0, help="nombre de tirages aléatoires (avec --space)")
+    ap.add_argument("--space", action="append", default=[], help="nom=min:max (répétable)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--objective", choices=OBJECTIVES, default="total_r")
+    ap.add_argument("--min-trades", type=int, default=10)
+    ap.add_argument("--folds", type=int, default=0, help="folds walk-forward (0 = aucun)")
+    ap.add_argument("--rolling", action="store_true", help="fenêtre d'entraînement glissante (défaut : ancrée)")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--out", default="sweep.npz")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+
+    files = discover_symbols(args.data)
+    if args.symbols:
+        wanted = {s.strip().upper() for s in args.symbols.split(",") if s.strip()}
+        files = {s: p for s, p in files.items() if s.upper() in wanted}
+
+    param_sets: List[Dict[str, Any]] = grid_space(parse_grid(args.grid)) if args.grid else []
+    if args.random:
+        param_sets += random_space(parse_space(args.space), args.random, args.seed)
+    if not param_sets:
+        param_sets = [{}]
+
+    base = BacktestConfig()
+    t0 = time.perf_counter()
+    runs, span = run_sweep(files, param_sets, base, workers=args.workers)
+    metrics, order = rank_results(runs, args.objective, args.min_trades)
+    splits = walk_forward_splits(span[0], span[1], args.folds, anchored=not args.rolling)
+    folds = walk_forward(runs, splits, args.objective, args.min_trades)
+    elapsed = time.perf_counter() - t0
+
+    meta = {
+        "objective": args.objective,
+        "min_trades": args.min_trades,
+        "symbols": len(files),
+        "param_sets": len(param_sets),
+        "span": span,
+        "anchored": not args.rolling,
+        "base": asdict(base),
+        "elapsed_s": round(elapsed, 2),
+    }
+    save_results(args.out, param_sets, metrics, order, folds, meta)
+
+    print(f"⚙️ {len(param_sets)} jeux x {len(files)} symboles en {elapsed:.1f}s → {args.out}")
+    for rank, i in enumerate(order[: args.top], 1):
+        m = metrics[i]
+        print(
+            f"#{rank:<3} {param_sets[i]}  trades={m['trades']} win={m['win_rate']:.0%} "
+            f"avgR={m['avg_r']:.3f} totR={m['total_r']:.2f} PF={m['profit_factor']:.2f} DD={m['max_drawdown_r']:.2f}"
+        )
+    for f in folds:
+        tm = f["test_metrics"]
+        best = param_sets[f["best"]] if f["best"] >= 0 else None
+        print(f"WF fold {f['fold']}: best={best} → test trades={tm['trades']} totR={tm['total_r']:.2f} avgR={tm['avg_r']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
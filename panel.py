@@ -0,0 +1,302 @@
+# =====================================================================
+# panel.py — Indicateurs de tout l'univers en une passe (symboles x barres)
+# =====================================================================
+# Au lieu de ~500 appels pandas (Series, astype, ewm) sur des séries de
+# 200 barres, on empile les OHLCV alignés à droite dans des matrices
+# numpy (S x T, complétées par des NaN à gauche) et on déroule chaque
+# récursion ewm une seule fois, vectorisée sur tous les symboles.
+#
+# Mêmes formules que indicators.py / structure_utils._trend_from_ema,
+# mêmes garde-fous de longueur par symbole → résultats identiques ;
+# un NaN de tête se comporte comme un début de série pour pandas ewm.
+#
+# Usage :
+#   panel = IndicatorPanel.from_frames({sym: df_h1, ...})
+#   panel.view("BTCUSDT")                 → labels + dernières valeurs
+#   panel.seed_context(ctx, "BTCUSDT")    → FeatureContext pré-rempli
+# =====================================================================
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from feature_context import get_feature_context
+from indicator_engine import ewm_alpha
+
+EMA_LENGTHS = (20, 50)
+RSI_LENGTH = 14
+MACD_PARAMS = (12, 26, 9)
+ATR_LENGTH = 14
+TREND_FAST, TREND_SLOW = 20, 50
+EXT_K = 1.5
+
+
+# =====================================================================
+# EWM VECTORISÉ (pandas adjust=False, ligne par ligne)
+# =====================================================================
+
+def ewm_panel(x: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """
+    pandas ewm(adjust=False).mean() appliqué à chaque ligne de `x` (R x T),
+    avec un alpha par ligne. Boucle sur T, vectorisée sur R.
+    """
+    rows, cols = x.shape
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (rows,))
+    factor = 1.0 - alpha
+    out = np.empty_like(x, dtype=float)
+    weighted = np.full(rows, np.nan)
+    old_wt = np.ones(rows)
+
+    for t in range(cols):
+        cur = x[:, t]
+        obs = cur == cur
+        has = weighted == weighted
+
+        old_wt = np.where(has, old_wt * factor, old_wt)
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(has & obs & (weighted != cur), blended, weighted)
+        old_wt = np.where(has & obs, 1.0, old_wt)
+        weighted = np.where(~has & obs, cur, weighted)
+        out[:, t] = weighted
+
+    return out
+
+
+# =====================================================================
+# PANEL
+# =====================================================================
+
+class IndicatorPanel:
+    """
+    OHLCV de S symboles alignés à droite sur T barres + indicateurs.
+
+    Attributs après compute() (matrices S x T) :
+        ema[L], rsi, macd, signal, hist, atr
+    et labels (S,) : trend, vol_regime, extension.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        lengths: np.ndarray,
+    ):
+        self.symbols: List[str] = list(symbols)
+        self.row = {s: i for i, s in enumerate(self.symbols)}
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.lengths = lengths
+
+        self.ema: Dict[int, np.ndarray] = {}
+        self.rsi: Optional[np.ndarray] = None
+        self.macd: Optional[np.ndarray] = None
+        self.signal: Optional[np.ndarray] = None
+        self.hist: Optional[np.ndarray] = None
+        self.atr: Optional[np.ndarray] = None
+        self.trend: Optional[np.ndarray] = None
+        self.vol_regime: Optional[np.ndarray] = None
+        self.extension: Optional[np.ndarray] = None
+
+    # ---------------------------------------------------------------
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], compute: bool = True) -> "IndicatorPanel":
+        """Empile des DataFrames OHLCV (longueurs libres) alignés sur la dernière barre."""
+        items = [(s, df) for s, df in frames.items() if df is not None and not df.empty]
+        symbols = [s for s, _ in items]
+        lengths = np.array([len(df) for _, df in items], dtype=np.int64)
+        width = int(lengths.max()) if lengths.size else 0
+
+        mats = {c: np.full((len(items), width), np.nan) for c in ("open", "high", "low", "close", "volume")}
+        for i, (_, df) in enumerate(items):
+            n = lengths[i]
+            for c, mat in mats.items():
+                mat[i, width - n:] = df[c].to_numpy(dtype=float)
+
+        panel = cls(symbols, mats["open"], mats["high"], mats["low"], mats["close"], mats["volume"], lengths)
+        if compute:
+            panel.compute()
+        return panel
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    # ---------------------------------------------------------------
+    # Calcul
+    # ---------------------------------------------------------------
+
+    def compute(self) -> "IndicatorPanel":
+        S = len(self.symbols)
+        if S == 0:
+            return self
+        c, h, l = self.close, self.high, self.low
+
+        prev_c = np.empty_like(c)
+        prev_c[:, 0] = np.nan
+        prev_c[:, 1:] = c[:, :-1]
+
+        delta = c - prev_c
+        with np.errstate(invalid="ignore"):
+            gain = np.where(delta >= 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+            loss = np.where(-delta >= 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+        tr = np.fmax(np.fmax(h - l, np.abs(h - prev_c)), np.abs(l - prev_c))
+
+        # première passe : toutes les récursions indépendantes empilées
+        fast, slow, sig = MACD_PARAMS
+        blocks = [c] * len(EMA_LENGTHS) + [c, c, gain, loss, tr]
+        alphas = (
+            [ewm_alpha(span=L) for L in EMA_LENGTHS]
+            + [ewm_alpha(span=fast), ewm_alpha(span=slow)]
+            + [ewm_alpha(alpha=1.0 / RSI_LENGTH)] * 2
+            + [ewm_alpha(alpha=1.0 / ATR_LENGTH)]
+        )
+        stacked = ewm_panel(np.vstack(blocks), np.repeat(alphas, S))
+        parts = [stacked[i * S:(i + 1) * S] for i in range(len(blocks))]
+
+        k = len(EMA_LENGTHS)
+        self.ema = {L: parts[i] for i, L in enumerate(EMA_LENGTHS)}
+        ema_fast, ema_slow, avg_gain, avg_loss, atr_raw = parts[k:k + 5]
+
+        # MACD (signal = seconde passe)
+        self.macd = ema_fast - ema_slow
+        self.signal = ewm_panel(self.macd, np.full(S, ewm_alpha(span=sig)))
+        self.hist = self.macd - self.signal
+
+        # RSI Wilder, fillna(50)
+        rs = avg_gain / (avg_loss + 1e-10)
+        rsi_val = 100.0 - (100.0 / (1.0 + rs))
+        self.rsi = np.where(np.isnan(rsi_val), 50.0, rsi_val)
+
+        # ATR : bfill sur la partie réelle puis 0
+        self.atr = pd.DataFrame(atr_raw).bfill(axis=1).fillna(0.0).to_numpy()
+
+        self._labels()
+        return self
+
+    def _labels(self) -> None:
+        n = self.lengths
+        last_c = self.close[:, -1]
+        ef, es = self.ema[TREND_FAST], self.ema[TREND_SLOW]
+
+        # trend EMA20/50 + pente sur 5 barres (_trend_from_ema)
+        slope = ef[:, -1] - ef[:, -5] if ef.shape[1] >= 5 else np.zeros(len(n))
+        trend = np.full(len(n), "RANGE", dtype=object)
+        trend[(ef[:, -1] > es[:, -1]) & (slope > 0)] = "LONG"
+        trend[(ef[:, -1] < es[:, -1]) & (slope < 0)] = "SHORT"
+        trend[n < TREND_SLOW + 5] = "RANGE"
+        self.trend = trend
+
+        # régime de volatilité (volatility_regime)
+        last_atr = self.atr[:, -1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            atr_pct = last_atr / last_c
+        regime = np.full(len(n), "HIGH", dtype=object)
+        regime[atr_pct < 0.03] = "MEDIUM"
+        regime[atr_pct < 0.01] = "LOW"
+        regime[(n < ATR_LENGTH + 2) | (last_c <= 0)] = "UNKNOWN"
+        self.vol_regime = regime
+
+        # extension EMA20/50 normalisée ATR (extension_signal)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist_fast = (last_c - ef[:, -1]) / last_atr
+            dist_slow = (last_c - es[:, -1]) / last_atr
+        ext = np.full(len(n), "NORMAL", dtype=object)
+        ext[(dist_fast > EXT_K) & (dist_slow > EXT_K)] = "OVEREXTENDED_LONG"
+        ext[(dist_fast < -EXT_K) & (dist_slow < -EXT_K)] = "OVEREXTENDED_SHORT"
+        ext[(n < max(TREND_SLOW, ATR_LENGTH) + 5) | (last_atr <= 0)] = "NORMAL"
+        self.extension = ext
+
+    # ---------------------------------------------------------------
+    # Vues par symbole
+    # ---------------------------------------------------------------
+
+    def view(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Labels + dernières valeurs d'un symbole."""
+        i = self.row.get(symbol)
+        if i is None or self.rsi is None:
+            return None
+        out: Dict[str, Any] = {
+            "bars": int(self.lengths[i]),
+            "trend": self.trend[i],
+            "vol_regime": self.vol_regime[i],
+            "extension": self.extension[i],
+            "close": float(self.close[i, -1]),
+            "rsi": float(self.rsi[i, -1]),
+            "macd": float(self.macd[i, -1]),
+            "signal": float(self.signal[i, -1]),
+            "hist": float(self.hist[i, -1]),
+            "atr": float(self.atr[i, -1]),
+        }
+        for L, mat in self.ema.items():
+            out[f"ema{L}"] = float(mat[i, -1])
+        return out
+
+    def series(self, symbol: str, index: Optional[pd.Index] = None) -> Optional[Dict[Any, Any]]:
+        """
+        Séries d'un symbole au format des clés de FeatureContext, avec les
+        garde-fous de longueur de indicators.py.
+        """
+        i = self.row.get(symbol)
+        if i is None or self.rsi is None:
+            return None
+        n = int(self.lengths[i])
+        if n < 2:
+            return None
+        idx = index if index is not None else pd.RangeIndex(n)
+        tail = slice(self.close.shape[1] - n, None)
+
+        def _s(mat: np.ndarray) -> pd.Series:
+            return pd.Series(mat[i, tail], index=idx)
+
+        values: Dict[Any, Any] = {("ema", L): _s(mat) for L, mat in self.ema.items()}
+        values[("rsi", RSI_LENGTH)] = pd.Series([50.0] * n, index=idx) if n <= RSI_LENGTH else _s(self.rsi)
+        if n < MACD_PARAMS[1] + MACD_PARAMS[2]:
+            nan = pd.Series([np.nan] * n, index=idx)
+            values[("macd",) + MACD_PARAMS] = (nan, nan, nan)
+        else:
+            values[("macd",) + MACD_PARAMS] = (_s(self.macd), _s(self.signal), _s(self.hist))
+        values[("atr", ATR_LENGTH)] = _s(self.atr)
+        values[("trend", TREND_FAST, TREND_SLOW)] = self.trend[i]
+        return values
+
+    def seed_context(self, ctx, symbol: str) -> bool:
+        """Pré-remplit un FeatureContext construit sur le même DataFrame."""
+        i = self.row.get(symbol)
+        df = ctx.df
+        if i is None or df is None or len(df) != int(self.lengths[i]):
+            return False
+        if float(df["close"].iloc[-1]) != float(self.close[i, -1]):
+            return False
+        values = self.series(symbol, index=df.index)
+        if values is None:
+            return False
+        ctx.seed(values)
+        return True
+
+
+def build_contexts(
+    frames: Dict[str, pd.DataFrame],
+    tf: str,
+) -> Dict[str, Any]:
+    """
+    Panel de tout l'univers pour un TF → {symbol: FeatureContext pré-rempli}.
+    """
+    panel = IndicatorPanel.from_frames(frames)
+    out: Dict[str, Any] = {}
+    for sym, df in frames.items():
+        if df is None or df.empty:
+            continue
+        ctx = get_feature_context(df, sym, tf)
+        panel.seed_context(ctx, sym)
+        out[sym] = ctx
+    return out
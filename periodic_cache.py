@@ -0,0 +1,148 @@
+# =====================================================================
+# periodic_cache.py — LRU cache aligned on exchange bucket boundaries
+# =====================================================================
+# Funding is settled every 8h, OI / long-short statistics are bucketed
+# (5m … 1d). A value fetched inside a bucket cannot change before the
+# next boundary, so entries expire exactly there (+ a small grace delay
+# for the exchange to publish the new bucket).
+#
+#   - key    : (symbol, metric, period)
+#   - expiry : next UTC boundary of `period` + grace_s
+#   - LRU eviction bounded by max_entries and an approximate memory cap
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+# Bucket length (seconds) per Binance period string
+PERIOD_SECONDS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "30m": 30 * 60,
+    "1h": 3600,
+    "2h": 2 * 3600,
+    "4h": 4 * 3600,
+    "6h": 6 * 3600,
+    "8h": 8 * 3600,
+    "12h": 12 * 3600,
+    "1d": 24 * 3600,
+}
+
+
+def next_boundary(period: str, now: Optional[float] = None) -> float:
+    """Epoch seconds of the next UTC boundary of `period` (strictly after now)."""
+    step = PERIOD_SECONDS[period]
+    now = time.time() if now is None else float(now)
+    return (int(now // step) + 1) * step
+
+
+def approx_size(value: Any) -> int:
+    """Cheap recursive size estimate (bytes) for cached payloads."""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes) + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class PeriodicCache:
+    """
+    Bounded LRU cache whose entries expire at the next bucket boundary
+    of their period.
+
+    `get_or_fetch` also de-duplicates concurrent fetches of the same key.
+    """
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024, grace_s: float = 30.0):
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = max(int(max_bytes), 1)
+        self.grace_s = float(grace_s)
+        # key → (expires_at, size, value)
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    # ---------------------------------------------------------------
+
+    def _pop(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        now = time.time() if now is None else now
+        if now >= entry[0]:
+            self._pop(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: Hashable, value: Any, period: str, now: Optional[float] = None) -> None:
+        expires = next_boundary(period, now) + self.grace_s
+        size = approx_size(value)
+        self._pop(key)
+        self._data[key] = (expires, size, value)
+        self._bytes += size
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, old_size, _) = self._data.popitem(last=False)
+            self._bytes -= old_size
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        period: str,
+        fetch: Callable[[], Awaitable[Any]],
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Cached value, or `await fetch()` stored until the next boundary.
+        Results rejected by `cache_if` (empty / failed fetches) are not stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value = await fetch()
+            if cache_if is None or cache_if(value):
+                self.put(key, value, period)
+            fut.set_result(value)
+            return value
+        except BaseException as exc:
+            fut.set_exception(exc)
+            # consume so an unawaited future does not log a warning
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
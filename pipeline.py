@@ -0,0 +1,128 @@
+# =====================================================================
+# pipeline.py — Pipeline producteur/consommateur par étapes (asyncio)
+# =====================================================================
+# fetch → analyze → [dup / risk] → notify
+#                                → execute
+#
+# Chaque étape a sa file bornée (backpressure : un producteur attend
+# quand la file suivante est pleine) et son propre nombre de workers.
+# Un envoi Telegram lent ou un ordre Bitget lent n'occupe plus un slot
+# de scan : le débit est limité par l'étape la plus lente, pas par la
+# somme des étapes.
+#
+# Métriques par étape : traités, transmis, erreurs, profondeur max de
+# file, temps cumulé → report() à chaque passe.
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# handler(item) → None (item consommé) | liste de (nom_étape_suivante, item)
+Handler = Callable[[Any], Awaitable[Optional[List[tuple]]]]
+
+
+class Stage:
+    """Une étape : file bornée + N workers + compteurs."""
+
+    def __init__(self, name: str, handler: Handler, concurrency: int, queue_size: int):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(int(concurrency), 1)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(int(queue_size), 1))
+        self.processed = 0
+        self.forwarded = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.busy_s = 0.0
+        self.blocked_s = 0.0      # temps passé à attendre une file aval pleine
+        self._tasks: List[asyncio.Task] = []
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def put(self, item: Any) -> None:
+        await self.queue.put(item)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "forwarded": self.forwarded,
+            "errors": self.errors,
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "busy_s": round(self.busy_s, 3),
+            "blocked_s": round(self.blocked_s, 3),
+            "avg_ms": round(self.busy_s / self.processed * 1000, 2) if self.processed else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    Étapes reliées par leurs handlers : un handler renvoie les items à
+    pousser vers d'autres étapes (fan-out possible).
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self._order: List[str] = []
+
+    def add_stage(self, name: str, handler: Handler, concurrency: int, queue_size: int) -> Stage:
+        stage = Stage(name, handler, concurrency, queue_size)
+        self.stages[name] = stage
+        self._order.append(name)
+        return stage
+
+    async def _worker(self, stage: Stage) -> None:
+        while True:
+            item = await stage.queue.get()
+            try:
+                t0 = time.perf_counter()
+                try:
+                    outputs = await stage.handler(item)
+                except Exception as exc:
+                    stage.errors += 1
+                    LOGGER.error(f"[PIPELINE] {stage.name} error: {exc}")
+                    outputs = None
+                finally:
+                    stage.processed += 1
+                    stage.busy_s += time.perf_counter() - t0
+
+                for target, out in outputs or ():
+                    t1 = time.perf_counter()
+                    await self.stages[target].put(out)
+                    stage.blocked_s += time.perf_counter() - t1
+                    stage.forwarded += 1
+            finally:
+                stage.queue.task_done()
+
+    async def run(self, items: Iterable[Any], entry: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Pousse `items` dans l'étape `entry` (la première par défaut) et
+        attend que toutes les files soient vidées. Renvoie report().
+        """
+        for stage in self.stages.values():
+            stage._tasks = [asyncio.create_task(self._worker(stage)) for _ in range(stage.concurrency)]
+        try:
+            first = self.stages[entry or self._order[0]]
+            for item in items:
+                await first.put(item)
+            # les étapes amont sont vidées avant les étapes aval
+            for name in self._order:
+                await self.stages[name].queue.join()
+        finally:
+            for stage in self.stages.values():
+                for t in stage._tasks:
+                    t.cancel()
+                await asyncio.gather(*stage._tasks, return_exceptions=True)
+                stage._tasks = []
+        return self.report()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.stages[name].metrics() for name in self._order}
@@ -0,0 +1,169 @@
+# =====================================================================
+# rate_limiter.py — Token buckets par endpoint (adaptatifs sur 429)
+# =====================================================================
+# Rôle :
+#   - Faire ATTENDRE les appelants quand le budget est consommé,
+#     au lieu de laisser partir la requête et de prendre un 429
+#   - Un bucket par endpoint + un bucket global (limite IP)
+#   - Adaptation :
+#       * 429 / Retry-After → pause du bucket + baisse du débit (x0.5)
+#       * succès            → remontée progressive vers le débit nominal
+#       * headers "remaining" → on recale les jetons disponibles
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket asynchrone.
+
+    - `rate`     : jetons rechargés par seconde (débit nominal)
+    - `capacity` : taille du bucket (burst max)
+
+    `acquire(weight)` bloque jusqu'à ce que `weight` jetons soient
+    disponibles ; les appelants sont servis dans l'ordre d'arrivée.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, name: str = ""):
+        self.name = name
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = self.base_rate * 0.25
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    # ---------------------------------------------------------------
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._last = now
+
+    async def acquire(self, weight: float = 1.0) -> float:
+        """Consomme `weight` jetons ; retourne le temps passé à attendre (s)."""
+        weight = min(float(weight), self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self.tokens >= weight:
+                    self.tokens -= weight
+                    return waited
+                else:
+                    delay = (weight - self.tokens) / max(self.rate, 1e-9)
+
+                waited += delay
+                await asyncio.sleep(delay)
+
+    # ---------------------------------------------------------------
+
+    def penalize(self, seconds: float) -> None:
+        """Vide le bucket et bloque toute sortie pendant `seconds`."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, now + max(float(seconds), 0.0))
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """429 reçu : on ralentit (x0.5) et on respecte Retry-After si fourni."""
+        self.rate = max(self.min_rate, self.rate * 0.5)
+        pause = retry_after if retry_after is not None else 1.0 / max(self.rate, 1e-9)
+        self.penalize(pause)
+        LOGGER.warning(
+            "⏳ RATE LIMIT %s → pause %.2fs, rate=%.2f/s (nominal %.2f/s)",
+            self.name, pause, self.rate, self.base_rate,
+        )
+
+    def on_success(self) -> None:
+        """Remontée additive vers le débit nominal après un 429."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def sync_remaining(self, remaining: float, limit: float) -> None:
+        """Recale les jetons sur la fraction de quota restante annoncée par l'exchange."""
+        if limit <= 0:
+            return
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, self.capacity * max(remaining, 0.0) / limit)
+
+
+# =====================================================================
+# LIMITEUR MULTI-ENDPOINTS
+# =====================================================================
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        v = headers.get(name)
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class EndpointRateLimiter:
+    """
+    Un TokenBucket par endpoint + un bucket global.
+
+    `limits` : {path: (rate_per_s, capacity)} ; les paths inconnus
+    utilisent `default`.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        default: Tuple[float, float],
+        global_limit: Optional[Tuple[float, float]] = None,
+        name: str = "",
+    ):
+        self.name = name
+        self._limits = dict(limits)
+        self._default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._global = (
+            TokenBucket(global_limit[0], global_limit[1], name=f"{name}:global")
+            if global_limit else None
+        )
+
+    def bucket(self, path: str) -> TokenBucket:
+        b = self._buckets.get(path)
+        if b is None:
+            rate, cap = self._limits.get(path, self._default)
+            b = TokenBucket(rate, cap, name=f"{self.name}:{path}")
+            self._buckets[path] = b
+        return b
+
+    async def acquire(self, path: str, weight: float = 1.0) -> float:
+        waited = 0.0
+        if self._global is not None:
+            waited += await self._global.acquire(weight)
+        waited += await self.bucket(path).acquire(weight)
+        return waited
+
+    def on_throttled(self, path: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        retry_after = _header_float(headers, "Retry-After") if headers else None
+        self.bucket(path).on_throttled(retry_after)
+
+    def on_response(self, path: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        bucket = self.bucket(path)
+        bucket.on_success()
+        if not headers:
+            return
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        limit = _header_float(headers, "X-RateLimit-Limit")
+        if remaining is not None and limit:
+            bucket.sync_remaining(remaining, limit)
@@ -0,0 +1,112 @@
+# =====================================================================
+# scan_scheduler.py — Scans alignés sur la clôture des bougies
+# =====================================================================
+# SCAN_MODE=interval  : comportement historique (pause SCAN_INTERVAL_MIN)
+# SCAN_MODE=bar_close : réveil à chaque clôture H1 (+ BAR_CLOSE_SETTLE_S
+#                       pour laisser l'exchange publier la bougie) ; les
+#                       clôtures H4 tombent sur des clôtures H1.
+#
+# ClosedBarTracker : on n'analyse un symbole que si sa dernière bougie
+# clôturée a changé depuis la dernière analyse.
+#
+# Entre deux clôtures (INTRABAR_RECHECK_S > 0), seuls les symboles proches
+# d'un déclenchement (SignalAnalyzer.watchlist) sont re-vérifiés.
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+from kline_cache import INTERVAL_MS
+
+LOGGER = logging.getLogger(__name__)
+
+
+def next_bar_close(tf: str = "1H", now: Optional[float] = None) -> float:
+    """Epoch (s) de la prochaine clôture de `tf`, strictement après now (UTC)."""
+    step = INTERVAL_MS[tf] / 1000.0
+    now = time.time() if now is None else float(now)
+    return (int(now // step) + 1) * step
+
+
+def is_bar_open(df: pd.DataFrame, tf: str, now_ms: Optional[float] = None) -> bool:
+    """True si la dernière ligne de df est une bougie encore en formation."""
+    if df is None or df.empty:
+        return False
+    now_ms = time.time() * 1000 if now_ms is None else now_ms
+    return float(df["time"].iloc[-1]) + INTERVAL_MS[tf] > now_ms
+
+
+def last_closed_bar_ts(df: pd.DataFrame, tf: str, now_ms: Optional[float] = None) -> Optional[int]:
+    if df is None or df.empty:
+        return None
+    if is_bar_open(df, tf, now_ms):
+        if len(df) < 2:
+            return None
+        return int(df["time"].iloc[-2])
+    return int(df["time"].iloc[-1])
+
+
+def drop_open_bar(df: pd.DataFrame, tf: str, now_ms: Optional[float] = None) -> pd.DataFrame:
+    """Retire la bougie en formation (analyse sur bougies clôturées uniquement)."""
+    if is_bar_open(df, tf, now_ms):
+        return df.iloc[:-1].reset_index(drop=True)
+    return df
+
+
+class ClosedBarTracker:
+    """Dernière bougie clôturée analysée, par symbole."""
+
+    def __init__(self, tf: str = "1H"):
+        self.tf = tf
+        self._seen: Dict[str, int] = {}
+        self.changed = 0
+        self.skipped = 0
+
+    def update(self, symbol: str, df: pd.DataFrame, now_ms: Optional[float] = None) -> bool:
+        """True (et mémorise) si la dernière bougie clôturée est nouvelle."""
+        ts = last_closed_bar_ts(df, self.tf, now_ms)
+        if ts is None:
+            return True
+        if self._seen.get(symbol) == ts:
+            self.skipped += 1
+            return False
+        self._seen[symbol] = ts
+        self.changed += 1
+        return True
+
+    def reset_counters(self) -> None:
+        self.changed = 0
+        self.skipped = 0
+
+
+class BarCloseScheduler:
+    """Attente de la prochaine clôture `tf` + délai de stabilisation."""
+
+    def __init__(self, tf: str = "1H", settle_s: float = 5.0):
+        self.tf = tf
+        self.settle_s = float(settle_s)
+
+    def next_wakeup(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        target = next_bar_close(self.tf, now) + self.settle_s
+        # encore dans la fenêtre de stabilisation de la clôture précédente
+        if target - INTERVAL_MS[self.tf] / 1000.0 > now:
+            target -= INTERVAL_MS[self.tf] / 1000.0
+        return target
+
+    async def sleep_until(self, wakeup: float) -> None:
+        delay = wakeup - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def closed_timeframes(wakeup: float, settle_s: float) -> str:
+        """"1H" ou "1H+4H" selon la clôture atteinte (pour les logs)."""
+        boundary = int(round((wakeup - settle_s) * 1000))
+        return "1H+4H" if boundary % INTERVAL_MS["4H"] == 0 else "1H"
@@ -4,12 +4,19 @@
 
 import asyncio
 import logging
+import time
 import pandas as pd
 
 from settings import (
     API_KEY, API_SECRET, API_PASSPHRASE,
     TELEGRAM_CHAT_ID, TELEGRAM_BOT_TOKEN,
-    SCAN_INTERVAL_MIN,
+    SCAN_INTERVAL_MIN, SCAN_CONCURRENCY,
+    BINANCE_WS_ENABLED, HTTP_RECORD_MODE,
+    PANEL_MODE, SCREEN_ENABLED,
+    SCAN_MODE, BAR_CLOSE_SETTLE_S, SCAN_CLOSED_BARS_ONLY, INTRABAR_RECHECK_S,
+    PIPELINE_MODE, PIPELINE_QUEUE_SIZE,
+    PIPELINE_FETCH_CONCURRENCY, PIPELINE_ANALYZE_CONCURRENCY,
+    PIPELINE_NOTIFY_CONCURRENCY, PIPELINE_EXEC_CONCURRENCY,
 )
 
 from bitget_client import get_client
@@ -18,7 +25,18 @@ from analyze_signal import SignalAnalyzer
 from telegram.ext import Application
 from duplicate_guard import DuplicateGuard
 from risk_manager import RiskManager
-from retry_utils import retry_async
+from institutional_data import (
+    close_binance_client,
+    refresh_universe_snapshot,
+    refresh_symbol_index,
+)
+from binance_stream import start_market_stream, stop_market_stream
+from mtf_builder import fetch_h1_h4
+from panel import build_contexts
+from analysis_worker import get_analysis_executor, shutdown_analysis_executor
+from scan_scheduler import BarCloseScheduler, ClosedBarTracker, drop_open_bar
+from pipeline import Pipeline
+from coarse_screen import coarse_screen
 
 LOGGER = logging.getLogger(__name__)
 
@@ -67,115 +85,211 @@ def to_df(raw):
     return df.sort_values("time").reset_index(drop=True)
 
 
+# =====================================================================
+# SIGNAL → DUP / RISK → TELEGRAM / ORDRES
+# =====================================================================
+
+def build_signal(symbol: str, result):
+    """Résultat SignalAnalyzer → signal normalisé (None si invalide)."""
+    if not result or not result.get("valid"):
+        return None
+
+    side = result["side"]
+    tp1 = result.get("tp1")
+
+    # Normalisation LONG/SHORT pour RiskManager / DuplicateGuard
+    side_upper = str(side).upper()
+    direction = "LONG" if side_upper in ("BUY", "LONG") else "SHORT"
+
+    return {
+        "symbol": symbol,
+        "side": side,
+        "direction": direction,
+        "entry": float(result["entry"]),
+        "sl": float(result["sl"]),
+        "tp1": tp1,
+        "tp2": result.get("tp2"),
+        "qty": float(result["qty"]),
+        "inst_score": result.get("institutional_score", None),
+        "rr": result.get("rr"),
+    }
+
+
+def admit_signal(signal) -> bool:
+    """Anti-doublon puis risk manager (avant tout envoi / ordre)."""
+    symbol = signal["symbol"]
+    direction = signal["direction"]
+    entry = signal["entry"]
+    sl = signal["sl"]
+    tp1 = signal["tp1"]
+
+    # Anti-doublon : même symbole / même direction / même zone (entry/SL/TP1)
+    fp_tp1 = tp1 if tp1 is not None else 0.0
+    fingerprint = f"{symbol}-{direction}-{round(entry, 4)}-{round(sl, 4)}-{round(float(fp_tp1), 4)}"
+    if DUP_GUARD.seen(fingerprint):
+        LOGGER.info(f"[DUP] Skip {symbol} {direction} — déjà envoyé récemment")
+        return False
+
+    # Risk manager : filtre institutionnel global
+    can_trade, reason = RISK_MANAGER.can_trade(direction)
+    if not can_trade:
+        LOGGER.info(f"[RISK] REJECT {symbol} {direction} → {reason}")
+        return False
+
+    LOGGER.warning(f"🎯 SIGNAL {symbol} → {signal['side']} @ {entry} (RR={signal['rr']})")
+    return True
+
+
+def format_signal_message(signal) -> str:
+    tp1, tp2 = signal["tp1"], signal["tp2"]
+    inst_score, rr = signal["inst_score"], signal["rr"]
+
+    msg = (
+        "🚀 *Signal détecté*\n"
+        f"• **{signal['symbol']}**\n"
+        f"• Direction: *{signal['side']}*\n"
+        f"• Entrée: `{signal['entry']}`\n"
+        f"• SL: `{signal['sl']}`\n"
+    )
+    if tp1 is not None or tp2 is not None:
+        msg += f"• TP1: `{tp1}` | TP2: `{tp2}`\n"
+    msg += f"• Qty: `{signal['qty']}`\n"
+    if inst_score is not None:
+        msg += f"• Inst Score: `{inst_score}`\n"
+    if rr is not None:
+        msg += f"• RR: `{round(rr, 3)}`\n"
+    return msg
+
+
+async def execute_signal(trader: BitgetTrader, signal) -> None:
+    """Entrée LIMIT puis SL / TP1 / TP2 sur Bitget."""
+    symbol, side, qty = signal["symbol"], signal["side"], signal["qty"]
+    sl, tp1, tp2 = signal["sl"], signal["tp1"], signal["tp2"]
+
+    # Entrée
+    entry_res = await trader.place_limit(symbol, side, signal["entry"], qty)
+    if not entry_res.get("ok", False):
+        LOGGER.error(f"Entry error {symbol}: {entry_res}")
+        return
+
+    # On enregistre la position ouverte dans le RiskManager
+    RISK_MANAGER.register_trade(signal["direction"])
+
+    # Stop loss
+    sl_res = await trader.place_stop_loss(symbol, side, sl, qty)
+    if not sl_res.get("ok", False):
+        LOGGER.error(f"SL error {symbol}: {sl_res}")
+
+    # Take profits
+    if tp1 is not None:
+        tp1_res = await trader.place_take_profit(symbol, side, float(tp1), qty * 0.5)
+        if not tp1_res.get("ok", False):
+            LOGGER.error(f"TP1 error {symbol}: {tp1_res}")
+
+    if tp2 is not None:
+        tp2_res = await trader.place_take_profit(symbol, side, float(tp2), qty * 0.5)
+        if not tp2_res.get("ok", False):
+            LOGGER.error(f"TP2 error {symbol}: {tp2_res}")
+
+
 # =====================================================================
 # PROCESSING SYMBOL
 # =====================================================================
 
-async def process_symbol(symbol: str, analyzer: SignalAnalyzer, trader: BitgetTrader, client):
+def _prepare_frames(symbol: str, df_h1, df_h4, tracker=None, closed_only: bool = False):
+    """
+    Filtre commun aux modes normal et panel :
+      - données insuffisantes → None
+      - bougie clôturée déjà analysée (tracker) → None
+      - closed_only → retire les bougies en formation
+    """
+    if df_h1.empty or df_h4.empty or len(df_h1) < 80:
+        return None
+    if tracker is not None and not tracker.update(symbol, df_h1):
+        return None
+    if closed_only:
+        df_h1 = drop_open_bar(df_h1, "1H")
+        df_h4 = drop_open_bar(df_h4, "4H")
+    return df_h1, df_h4
+
+
+async def process_symbol(
+    symbol: str,
+    analyzer: SignalAnalyzer,
+    trader: BitgetTrader,
+    client,
+    frames=None,
+    contexts=None,
+    tracker=None,
+    closed_only: bool = False,
+):
     """
     Pipeline complet pour un symbole :
-      - Récup H1 / H4
+      - Récup H1 / H4 (ou `frames` déjà chargés et filtrés en mode panel)
+      - Skip si la dernière bougie clôturée a déjà été analysée (tracker)
       - Analyse structure + insti (analyze_signal.SignalAnalyzer)
       - Envoi Telegram
       - Placement LIMIT + TP / SL sur Bitget
     """
     try:
         # ====== MARKETDATA H1 / H4 ======
-        async def _fetch_h1():
-            return await client.get_klines_df(symbol, "1H", 200)
-
-        async def _fetch_h4():
-            return await client.get_klines_df(symbol, "4H", 200)
-
-        df_h1 = await retry_async(_fetch_h1)
-        df_h4 = await retry_async(_fetch_h4)
-
-        if df_h1.empty or df_h4.empty or len(df_h1) < 80:
-            return
+        # retry + rate limit gérés dans BitgetClient._request
+        # H4 dérivé du H1 si DERIVE_HTF_FROM_H1 (mtf_builder)
+        if frames is None:
+            df_h1, df_h4 = await fetch_h1_h4(client, symbol, 200, 200)
+            frames = _prepare_frames(symbol, df_h1, df_h4, tracker, closed_only)
+            if frames is None:
+                return
+        df_h1, df_h4 = frames
+        ctx_h1, ctx_h4 = contexts if contexts is not None else (None, None)
 
         macro = {}  # placeholder : BTC / TOTAL / DOMINANCE plus tard
 
         # ====== ANALYSE INSTITUTIONNELLE + STRUCTURE ======
-        result = await analyzer.analyze(symbol, df_h1, df_h4, macro)
+        result = await analyzer.analyze(symbol, df_h1, df_h4, macro, ctx_h1=ctx_h1, ctx_h4=ctx_h4)
 
         # analyze_signal 2025 renvoie un dict avec "valid": True si signal OK
-        if not result or not result.get("valid"):
+        signal = build_signal(symbol, result)
+        if signal is None or not admit_signal(signal):
             return
 
-        side = result["side"]
-        entry = float(result["entry"])
-        sl = float(result["sl"])
-        tp1 = result.get("tp1")
-        tp2 = result.get("tp2")
-        qty = float(result["qty"])
-        inst_score = result.get("institutional_score", None)
-        rr = result.get("rr")
-
-        # Normalisation LONG/SHORT pour RiskManager / DuplicateGuard
-        side_upper = str(side).upper()
-        direction = "LONG" if side_upper in ("BUY", "LONG") else "SHORT"
-
-        # Anti-doublon : même symbole / même direction / même zone (entry/SL/TP1)
-        fp_tp1 = tp1 if tp1 is not None else 0.0
-        fingerprint = f"{symbol}-{direction}-{round(entry, 4)}-{round(sl, 4)}-{round(float(fp_tp1), 4)}"
-        if DUP_GUARD.seen(fingerprint):
-            LOGGER.info(f"[DUP] Skip {symbol} {direction} — déjà envoyé récemment")
-            return
+        await send_telegram(format_signal_message(signal))
+        await execute_signal(trader, signal)
 
-        # Risk manager : filtre institutionnel global
-        can_trade, reason = RISK_MANAGER.can_trade(direction)
-        if not can_trade:
-            LOGGER.info(f"[RISK] REJECT {symbol} {direction} → {reason}")
-            return
+    except Exception as e:
+        LOGGER.error(f"[{symbol}] process_symbol error: {e}")
 
-        LOGGER.warning(f"🎯 SIGNAL {symbol} → {side} @ {entry} (RR={rr})")
 
-        # ====== TELEGRAM ======
-        msg = (
-            "🚀 *Signal détecté*\n"
-            f"• **{symbol}**\n"
-            f"• Direction: *{side}*\n"
-            f"• Entrée: `{entry}`\n"
-            f"• SL: `{sl}`\n"
-        )
-        if tp1 is not None or tp2 is not None:
-            msg += f"• TP1: `{tp1}` | TP2: `{tp2}`\n"
-        msg += f"• Qty: `{qty}`\n"
-        if inst_score is not None:
-            msg += f"• Inst Score: `{inst_score}`\n"
-        if rr is not None:
-            msg += f"• RR: `{round(rr, 3)}`\n"
-
-        await send_telegram(msg)
-
-        # ====== EXÉCUTION ORDRES BITGET ======
-        # Entrée
-        entry_res = await trader.place_limit(symbol, side, entry, qty)
-        if not entry_res.get("ok", False):
-            LOGGER.error(f"Entry error {symbol}: {entry_res}")
-            return
+# =====================================================================
+# PANEL MODE (fetch univers → indicateurs en une passe)
+# =====================================================================
 
-        # On enregistre la position ouverte dans le RiskManager
-        RISK_MANAGER.register_trade(direction)
+async def fetch_universe_frames(symbols, client, semaphore, tracker=None, closed_only: bool = False):
+    """{symbol: (df_h1, df_h4)} pour tout l'univers (symboles à analyser uniquement)."""
 
-        # Stop loss
-        sl_res = await trader.place_stop_loss(symbol, side, sl, qty)
-        if not sl_res.get("ok", False):
-            LOGGER.error(f"SL error {symbol}: {sl_res}")
+    async def _fetch(sym: str):
+        async with semaphore:
+            try:
+                return sym, await fetch_h1_h4(client, sym, 200, 200)
+            except Exception as e:
+                LOGGER.error(f"[{sym}] fetch error: {e}")
+                return sym, None
 
-        # Take profits
-        if tp1 is not None:
-            tp1_res = await trader.place_take_profit(symbol, side, float(tp1), qty * 0.5)
-            if not tp1_res.get("ok", False):
-                LOGGER.error(f"TP1 error {symbol}: {tp1_res}")
+    out = {}
+    for sym, frames in await asyncio.gather(*[_fetch(s) for s in symbols]):
+        if frames is None:
+            continue
+        frames = _prepare_frames(sym, frames[0], frames[1], tracker, closed_only)
+        if frames is not None:
+            out[sym] = frames
+    return out
 
-        if tp2 is not None:
-            tp2_res = await trader.place_take_profit(symbol, side, float(tp2), qty * 0.5)
-            if not tp2_res.get("ok", False):
-                LOGGER.error(f"TP2 error {symbol}: {tp2_res}")
 
-    except Exception as e:
-        LOGGER.error(f"[{symbol}] process_symbol error: {e}")
+def build_universe_contexts(frames):
+    """{symbol: (ctx_h1, ctx_h4)} pré-remplis par un panel par timeframe."""
+    ctx_h1 = build_contexts({s: f[0] for s, f in frames.items()}, "1H")
+    ctx_h4 = build_contexts({s: f[1] for s, f in frames.items()}, "4H")
+    return {s: (ctx_h1.get(s), ctx_h4.get(s)) for s in frames}
 
 
 # =====================================================================
@@ -187,15 +301,33 @@ async def run_scanner():
     Boucle principale :
       - Récupère la liste des contrats USDT-FUTURES
       - Scan H1/H4 pour chaque symbole avec une concurrence limitée
-      - Pause entre deux scans selon SCAN_INTERVAL_MIN
+      - Pause entre deux scans selon SCAN_INTERVAL_MIN, ou réveil aux
+        clôtures H1 (SCAN_MODE=bar_close, scan_scheduler)
     """
     client = await get_client(API_KEY, API_SECRET, API_PASSPHRASE)
     trader = BitgetTrader(API_KEY, API_SECRET, API_PASSPHRASE)
-    analyzer = SignalAnalyzer(API_KEY, API_SECRET, API_PASSPHRASE)
-
-    # Limite la pression sur l'API Bitget (429)
-    MAX_CONCURRENT = 8
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+    # Analyse CPU déportée (thread / process) selon ANALYSIS_EXECUTOR
+    analyzer = SignalAnalyzer(API_KEY, API_SECRET, API_PASSPHRASE, executor=get_analysis_executor())
+
+    # Liquidations + mark price de tout le marché en continu (WebSocket) ;
+    # jamais en record / replay HTTP (le stream n'est pas archivé)
+    if BINANCE_WS_ENABLED and HTTP_RECORD_MODE == "off":
+        start_market_stream()
+    elif BINANCE_WS_ENABLED:
+        LOGGER.info(f"📼 HTTP_RECORD_MODE={HTTP_RECORD_MODE} : stream Binance désactivé")
+
+    # Concurrence des symboles ; la pression API (429) est régulée par
+    # les token buckets de BitgetClient
+    semaphore = asyncio.Semaphore(max(int(SCAN_CONCURRENCY), 1))
+
+    # SCAN_MODE=bar_close : réveil aux clôtures H1, symboles inchangés ignorés
+    scheduler = None
+    tracker = None
+    closed_only = False
+    if SCAN_MODE == "bar_close":
+        scheduler = BarCloseScheduler("1H", BAR_CLOSE_SETTLE_S)
+        tracker = ClosedBarTracker("1H")
+        closed_only = bool(SCAN_CLOSED_BARS_ONLY)
 
     while True:
         try:
@@ -209,20 +341,160 @@ async def run_scanner():
 
             LOGGER.info(f"📊 Nombre de symboles à scanner : {len(symbols)}")
 
-            async def _worker(sym: str):
-                async with semaphore:
-                    await process_symbol(sym, analyzer, trader, client)
-
-            tasks = [_worker(sym) for sym in symbols]
-            await asyncio.gather(*tasks)
+            # Funding / mark / volume Binance de tout l'univers en 2 appels
+            snapshot = await refresh_universe_snapshot(max_age_s=0)
+            if snapshot is not None:
+                LOGGER.info(f"🌐 Snapshot Binance : {len(snapshot)} contrats")
+
+            # Correspondance Bitget → Binance (cache négatif pour les orphelins)
+            index = await refresh_symbol_index(symbols)
+            LOGGER.info(f"🔗 Mapping Bitget→Binance : {index.stats()}")
+
+            await scan_universe(
+                symbols, analyzer, trader, client, semaphore,
+                tracker=tracker, closed_only=closed_only,
+            )
+            if tracker is not None:
+                LOGGER.info(
+                    f"🕐 Bougies clôturées : {tracker.changed} nouvelles, {tracker.skipped} inchangées"
+                )
+                tracker.reset_counters()
 
             LOGGER.info("=== END SCAN ===")
 
         except Exception as e:
             LOGGER.error(f"SCAN ERROR: {e}")
 
-        # Pause globale entre 2 scans
-        await asyncio.sleep(SCAN_INTERVAL_MIN * 60)
+        if scheduler is None:
+            # Pause globale entre 2 scans
+            await asyncio.sleep(SCAN_INTERVAL_MIN * 60)
+        else:
+            await wait_next_close(scheduler, analyzer, trader, client, semaphore)
+
+
+async def scan_universe(symbols, analyzer, trader, client, semaphore, tracker=None, closed_only: bool = False):
+    """Une passe complète sur `symbols` (mode normal, panel et/ou pipeline)."""
+    try:
+        await _scan_universe(symbols, analyzer, trader, client, semaphore, tracker, closed_only)
+    finally:
+        LOGGER.info(f"🔎 [PHASES] {analyzer.phase_stats.report()}")
+        LOGGER.info(f"⏱️ [GATES] ordre={analyzer.gates.order()} | {analyzer.gates.report()}")
+        if analyzer.memo is not None:
+            LOGGER.info(f"♻️ [MEMO] {analyzer.memo.stats()}")
+        analyzer.phase_stats.reset()
+        analyzer.gates.reset_cycle()
+
+
+async def _scan_universe(symbols, analyzer, trader, client, semaphore, tracker=None, closed_only: bool = False):
+    # Phase 1 : screen tendance sur fenêtre courte → fetch profond des survivants seulement
+    if SCREEN_ENABLED:
+        symbols = await coarse_screen(symbols, client, semaphore, analyzer.phase_stats, tracker, closed_only)
+        tracker = None  # déjà appliqué pendant le screen
+
+    universe = contexts = None
+    if PANEL_MODE:
+        universe = await fetch_universe_frames(symbols, client, semaphore, tracker, closed_only)
+        contexts = build_universe_contexts(universe)
+        LOGGER.info(f"🧮 Panel indicateurs : {len(universe)} symboles")
+
+    if PIPELINE_MODE:
+        await run_pipeline(symbols, analyzer, trader, client, tracker, closed_only, universe, contexts)
+        return
+
+    if PANEL_MODE:
+        async def _worker(sym: str):
+            async with semaphore:
+                await process_symbol(
+                    sym, analyzer, trader, client,
+                    frames=universe[sym], contexts=contexts[sym],
+                )
+
+        tasks = [_worker(sym) for sym in universe]
+    else:
+        async def _worker(sym: str):
+            async with semaphore:
+                await process_symbol(
+                    sym, analyzer, trader, client,
+                    tracker=tracker, closed_only=closed_only,
+                )
+
+        tasks = [_worker(sym) for sym in symbols]
+
+    await asyncio.gather(*tasks)
+
+
+async def run_pipeline(
+    symbols, analyzer, trader, client,
+    tracker=None, closed_only: bool = False,
+    universe=None, contexts=None,
+):
+    """
+    Passe en pipeline : chaque étape a sa file bornée et sa concurrence ;
+    dup / risk sont vérifiés avant le fan-out notify + execute.
+    """
+    pipe = Pipeline()
+
+    async def _fetch(sym: str):
+        df_h1, df_h4 = await fetch_h1_h4(client, sym, 200, 200)
+        frames = _prepare_frames(sym, df_h1, df_h4, tracker, closed_only)
+        return None if frames is None else [("analyze", (sym, frames, None))]
+
+    async def _analyze(item):
+        sym, (df_h1, df_h4), ctxs = item
+        ctx_h1, ctx_h4 = ctxs if ctxs is not None else (None, None)
+        result = await analyzer.analyze(sym, df_h1, df_h4, {}, ctx_h1=ctx_h1, ctx_h4=ctx_h4)
+        signal = build_signal(sym, result)
+        if signal is None or not admit_signal(signal):
+            return None
+        return [("notify", signal), ("execute", signal)]
+
+    async def _notify(signal):
+        await send_telegram(format_signal_message(signal))
+
+    async def _execute(signal):
+        await execute_signal(trader, signal)
+
+    qsize = int(PIPELINE_QUEUE_SIZE)
+    pipe.add_stage("fetch", _fetch, PIPELINE_FETCH_CONCURRENCY, qsize)
+    pipe.add_stage("analyze", _analyze, PIPELINE_ANALYZE_CONCURRENCY, qsize)
+    pipe.add_stage("notify", _notify, PIPELINE_NOTIFY_CONCURRENCY, qsize)
+    pipe.add_stage("execute", _execute, PIPELINE_EXEC_CONCURRENCY, qsize)
+
+    if universe is not None:
+        # mode panel : données déjà chargées → on entre directement à l'analyse
+        items = [(s, universe[s], contexts.get(s)) for s in universe]
+        report = await pipe.run(items, entry="analyze")
+    else:
+        report = await pipe.run(symbols)
+
+    for name, m in report.items():
+        LOGGER.info(
+            f"📈 [PIPELINE] {name}: {m['processed']} traités, {m['forwarded']} transmis, "
+            f"{m['errors']} erreurs, file max {m['max_depth']}, "
+            f"{m['avg_ms']} ms/item, attente aval {m['blocked_s']}s"
+        )
+    return report
+
+
+async def wait_next_close(scheduler, analyzer, trader, client, semaphore):
+    """
+    Attend la prochaine clôture H1 (+ settle). Si INTRABAR_RECHECK_S > 0,
+    re-vérifie entre-temps les symboles proches d'un déclenchement.
+    """
+    wakeup = scheduler.next_wakeup()
+    recheck_s = float(INTRABAR_RECHECK_S)
+
+    while recheck_s > 0 and time.time() + recheck_s < wakeup:
+        await asyncio.sleep(recheck_s)
+        watch = list(analyzer.watchlist)
+        if not watch:
+            continue
+        LOGGER.info(f"🔁 Re-check intra-bougie : {len(watch)} symboles proches d'un trigger")
+        await scan_universe(watch, analyzer, trader, client, semaphore)
+
+    await scheduler.sleep_until(wakeup)
+    tfs = scheduler.closed_timeframes(wakeup, scheduler.settle_s)
+    LOGGER.info(f"🕐 Clôture {tfs} → scan")
 
 
 # =====================================================================
@@ -230,7 +502,12 @@ async def run_scanner():
 # =====================================================================
 
 async def start_scanner():
-    await run_scanner()
+    try:
+        await run_scanner()
+    finally:
+        await stop_market_stream()
+        await close_binance_client()
+        shutdown_analysis_executor()
 
 
 # =====================================================================
@@ -64,6 +64,8 @@ if not TELEGRAM_CHAT_ID:
 ENV = os.getenv("ENV", "production")
 TZ = os.getenv("TZ", "Europe/Paris")
 SCAN_INTERVAL_MIN = _get("SCAN_INTERVAL_MIN", 5)
+# Symboles analysés en parallèle (le débit réel est borné par le rate limiter)
+SCAN_CONCURRENCY = _get("SCAN_CONCURRENCY", 32)
 
 TOP_N_SYMBOLS = _get("TOP_N_SYMBOLS", 80)
 
@@ -93,12 +95,16 @@ REQUIRE_HTF_ALIGN = _get_bool("REQUIRE_HTF_ALIGN", "true")
 REQUIRE_BOS_QUALITY = _get_bool("REQUIRE_BOS_QUALITY", "true")
 
 STRUCT_LOOKBACK = _get("STRUCT_LOOKBACK", 20)
+# impulsion minimale (close-to-close ~5 barres) d'un order block
+OB_IMPULSE_PCT = _get_float("OB_IMPULSE_PCT", 0.03)
 
 
 # ============================================================
 # RR PARAMETERS
 # ============================================================
 
+# RR minimum de base de SignalAnalyzer (ajusté ensuite par régime / momentum)
+RR_MIN_INST = _get_float("RR_MIN_INST", 1.3)
 RR_MIN_STRICT = _get_float("RR_MIN_STRICT", 1.5)
 RR_MIN_TOLERATED_WITH_INST = _get_float("RR_MIN_TOLERATED_WITH_INST", 1.20)
 
@@ -117,6 +123,8 @@ TP2_R_TARGET = _get_float("TP2_R_TARGET", 2.8)
 ATR_LEN = _get("ATR_LEN", 14)
 ATR_MULT_SL = _get_float("ATR_MULT_SL", 2.5)
 ATR_MULT_SL_CAP = _get_float("ATR_MULT_SL_CAP", 3.5)
+# marge du stop protecteur au-delà du swing / de la liquidité (x ATR)
+STOP_ATR_BUFFER = _get_float("STOP_ATR_BUFFER", 0.2)
 
 SL_BUFFER_PCT = _get_float("SL_BUFFER_PCT", 0.0020)
 SL_BUFFER_TICKS = _get("SL_BUFFER_TICKS", 3)
@@ -154,10 +162,102 @@ DESK_EV_MODE = _get_bool("DESK_EV_MODE", "true")
 # RETRY / NETWORK
 # ============================================================
 
+# URLs REST (mock_exchange.py pour les tests de charge hors ligne)
+BITGET_BASE_URL = os.getenv("BITGET_BASE_URL", "https://api.bitget.com").rstrip("/")
+BINANCE_FUTURES_URL = os.getenv("BINANCE_FUTURES_URL", "https://fapi.binance.com").rstrip("/")
+
+# Enregistrement / rejeu HTTP (http_recorder.py) : off | record | replay
+HTTP_RECORD_MODE = os.getenv("HTTP_RECORD_MODE", "off").strip().lower()
+HTTP_ARCHIVE_PATH = os.getenv("HTTP_ARCHIVE_PATH", "http_archive.jsonl.gz")
+# replay : durées d'origine divisées par ce facteur (0 = sans attente)
+HTTP_REPLAY_SPEED = _get_float("HTTP_REPLAY_SPEED", 1.0)
+
 BINANCE_MIN_INTERVAL_S = _get_float("BINANCE_MIN_INTERVAL_S", 0.35)
 BINANCE_HTTP_TIMEOUT_S = _get_float("BINANCE_HTTP_TIMEOUT_S", 7.0)
 BINANCE_HTTP_RETRIES = _get("BINANCE_HTTP_RETRIES", 2)
 BINANCE_SYMBOLS_TTL_S = _get("BINANCE_SYMBOLS_TTL_S", 900)
+# Alias Bitget → Binance explicites, ex. "LUNAUSDT:LUNA2USDT,FOOUSDT:BARUSDT"
+BINANCE_SYMBOL_ALIASES = os.getenv("BINANCE_SYMBOL_ALIASES", "")
+BINANCE_HTTP_POOL_PER_HOST = _get("BINANCE_HTTP_POOL_PER_HOST", 20)
+BINANCE_DNS_TTL_S = _get("BINANCE_DNS_TTL_S", 300)
+# Budget de poids REQUEST_WEIGHT Binance USDⓈ-M (par IP / minute)
+BINANCE_WEIGHT_LIMIT_1M = _get_float("BINANCE_WEIGHT_LIMIT_1M", 2400)
+BINANCE_WEIGHT_SAFETY = _get_float("BINANCE_WEIGHT_SAFETY", 0.9)
+
+# Cache des métriques institutionnelles lentes (funding / OI / long-short)
+INST_CACHE_MAX_ENTRIES = _get("INST_CACHE_MAX_ENTRIES", 5000)
+INST_CACHE_MAX_MB = _get_float("INST_CACHE_MAX_MB", 32.0)
+INST_CACHE_GRACE_S = _get_float("INST_CACHE_GRACE_S", 30.0)
+
+# Snapshot univers Binance (premiumIndex + ticker/24hr tous symboles)
+UNIVERSE_SNAPSHOT_TTL_S = _get_float("UNIVERSE_SNAPSHOT_TTL_S", 300.0)
+# après un échec : pas de nouvel essai (hors refresh forcé) avant ce délai
+UNIVERSE_SNAPSHOT_RETRY_S = _get_float("UNIVERSE_SNAPSHOT_RETRY_S", 60.0)
+
+# Stream WebSocket Binance (liquidations + mark price de tout le marché)
+# opt-in : mock_exchange.py sert /stream pour le valider hors ligne
+BINANCE_WS_ENABLED = _get_bool("BINANCE_WS_ENABLED", "false")
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://fstream.binance.com")
+LIQ_STREAM_WINDOW_S = _get_float("LIQ_STREAM_WINDOW_S", 3600.0)
+LIQ_STREAM_MAX_EVENTS = _get("LIQ_STREAM_MAX_EVENTS", 500)
+LIQ_STREAM_WARMUP_S = _get_float("LIQ_STREAM_WARMUP_S", 900.0)
+
+# Limite globale Bitget par IP (toutes routes confondues)
+BITGET_IP_LIMIT_PER_MIN = _get_float("BITGET_IP_LIMIT_PER_MIN", 6000)
+
+# Cache incrémental des bougies (BitgetClient.get_klines_df)
+KLINE_CACHE_ENABLED = _get_bool("KLINE_CACHE_ENABLED", "true")
+KLINE_CACHE_BARS = _get("KLINE_CACHE_BARS", 300)
+# Historique profond : pages de 100 bougies demandées en parallèle
+KLINE_PAGE_CONCURRENCY = _get("KLINE_PAGE_CONCURRENCY", 4)
+
+# Multi-timeframe local : H4 dérivé d'un H1 profond (mtf_builder)
+DERIVE_HTF_FROM_H1 = _get_bool("DERIVE_HTF_FROM_H1", "false")
+MTF_H1_BARS = _get("MTF_H1_BARS", 800)
+MTF_MIN_HTF_BARS = _get("MTF_MIN_HTF_BARS", 60)
+# Frontière des bougies D1 (heures après minuit UTC)
+MTF_D1_OFFSET_H = _get_float("MTF_D1_OFFSET_H", 0.0)
+
+# Contextes de features mémoïsées (feature_context), un par (symbole, TF)
+FEATURE_CTX_CACHE_SIZE = _get("FEATURE_CTX_CACHE_SIZE", 512)
+# EMA / RSI / MACD / ATR incrémentaux (indicator_engine) au lieu du recalcul ewm
+INDICATOR_ENGINE_ENABLED = _get_bool("INDICATOR_ENGINE_ENABLED", "false")
+INDICATOR_ENGINE_HISTORY = _get("INDICATOR_ENGINE_HISTORY", 256)
+# Panel : fetch de tout l'univers puis indicateurs calculés en une passe (panel.py)
+PANEL_MODE = _get_bool("PANEL_MODE", "false")
+# Pré-filtre tendance H1 / H4 sur une fenêtre courte avant l'analyse profonde (coarse_screen)
+SCREEN_ENABLED = _get_bool("SCREEN_ENABLED", "false")
+SCREEN_H1_BARS = _get("SCREEN_H1_BARS", 100)
+SCREEN_H4_BARS = _get("SCREEN_H4_BARS", 100)
+
+# Analyse CPU hors event loop (analysis_worker) : inline | thread | process
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "inline").strip().lower()
+ANALYSIS_WORKERS = _get("ANALYSIS_WORKERS", 0)  # 0 = nombre de cœurs
+
+# Planification des scans (scan_scheduler) : interval | bar_close
+SCAN_MODE = os.getenv("SCAN_MODE", "interval").strip().lower()
+BAR_CLOSE_SETTLE_S = _get_float("BAR_CLOSE_SETTLE_S", 5.0)
+# n'analyser que les bougies clôturées (retire la bougie en formation)
+SCAN_CLOSED_BARS_ONLY = _get_bool("SCAN_CLOSED_BARS_ONLY", "false")
+# re-check intra-bougie des symboles proches d'un trigger (0 = désactivé)
+INTRABAR_RECHECK_S = _get_float("INTRABAR_RECHECK_S", 0.0)
+NEAR_TRIGGER_ATR = _get_float("NEAR_TRIGGER_ATR", 0.5)
+
+# Ordre des gates CPU de SignalAnalyzer selon coût / taux de rejet (gate_order)
+GATE_ORDER_ADAPTIVE = _get_bool("GATE_ORDER_ADAPTIVE", "true")
+GATE_EWMA_ALPHA = _get_float("GATE_EWMA_ALPHA", 0.1)
+# Résultats d'analyse mémoïsés tant que les bougies H1 / H4 n'ont pas changé (analysis_memo)
+ANALYSIS_MEMO_ENABLED = _get_bool("ANALYSIS_MEMO_ENABLED", "false")
+ANALYSIS_MEMO_SIZE = _get("ANALYSIS_MEMO_SIZE", 1024)
+INST_MEMO_TTL_S = _get_float("INST_MEMO_TTL_S", 300.0)
+
+# Pipeline par étapes (pipeline.py) : fetch → analyze → notify / execute
+PIPELINE_MODE = _get_bool("PIPELINE_MODE", "false")
+PIPELINE_QUEUE_SIZE = _get("PIPELINE_QUEUE_SIZE", 64)
+PIPELINE_FETCH_CONCURRENCY = _get("PIPELINE_FETCH_CONCURRENCY", SCAN_CONCURRENCY)
+PIPELINE_ANALYZE_CONCURRENCY = _get("PIPELINE_ANALYZE_CONCURRENCY", 8)
+PIPELINE_NOTIFY_CONCURRENCY = _get("PIPELINE_NOTIFY_CONCURRENCY", 2)
+PIPELINE_EXEC_CONCURRENCY = _get("PIPELINE_EXEC_CONCURRENCY", 2)
 
 RETRY_300011_MAX = _get("RETRY_300011_MAX", 3)
 RETRY_BACKOFF_MS_BASE = _get("RETRY_BACKOFF_MS_BASE", 250)
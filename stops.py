@@ -35,8 +35,8 @@ def _round_to_tick(price: float, tick: float) -> float:
 # Internal helpers — structural references & ATR
 # =====================================================================
 
-def _get_last_swing_low(df: pd.DataFrame) -> float:
-    swings = find_swings(df)
+def _get_last_swing_low(df: pd.DataFrame, ctx=None) -> float:
+    swings = find_swings(df, ctx=ctx)
     lows = swings.get("lows", []) or []
     if not lows:
         # fallback: recent min low
@@ -45,8 +45,8 @@ def _get_last_swing_low(df: pd.DataFrame) -> float:
     return float(lows[-1][1])
 
 
-def _get_last_swing_high(df: pd.DataFrame) -> float:
-    swings = find_swings(df)
+def _get_last_swing_high(df: pd.DataFrame, ctx=None) -> float:
+    swings = find_swings(df, ctx=ctx)
     highs = swings.get("highs", []) or []
     if not highs:
         # fallback: recent max high
@@ -55,13 +55,13 @@ def _get_last_swing_high(df: pd.DataFrame) -> float:
     return float(highs[-1][1])
 
 
-def _get_liquidity_low(df: pd.DataFrame, entry: float) -> float:
+def _get_liquidity_low(df: pd.DataFrame, entry: float, ctx=None) -> float:
     """Return the most relevant equal-lows level below price.
 
     We look for the *highest* equal low strictly below entry. If none,
     return np.nan and let the caller fallback to swing.
     """
-    liq = detect_equal_levels(df)
+    liq = detect_equal_levels(df, ctx=ctx)
     eq_lows = liq.get("eq_lows", []) or []
     below = [lvl for lvl in eq_lows if lvl < entry]
     if not below:
@@ -70,13 +70,13 @@ def _get_liquidity_low(df: pd.DataFrame, entry: float) -> float:
     return float(max(below))
 
 
-def _get_liquidity_high(df: pd.DataFrame, entry: float) -> float:
+def _get_liquidity_high(df: pd.DataFrame, entry: float, ctx=None) -> float:
     """Return the most relevant equal-highs level above price.
 
     We look for the *lowest* equal high strictly above entry. If none,
     return np.nan and let the caller fallback to swing.
     """
-    liq = detect_equal_levels(df)
+    liq = detect_equal_levels(df, ctx=ctx)
     eq_highs = liq.get("eq_highs", []) or []
     above = [lvl for lvl in eq_highs if lvl > entry]
     if not above:
@@ -85,10 +85,10 @@ def _get_liquidity_high(df: pd.DataFrame, entry: float) -> float:
     return float(min(above))
 
 
-def _get_atr_value(df: pd.DataFrame, length: int = 14) -> float:
+def _get_atr_value(df: pd.DataFrame, length: int = 14, ctx=None) -> float:
     """Return latest true ATR value with robust fallbacks."""
     try:
-        atr_series = true_atr(df, length=length)
+        atr_series = true_atr(df, length=length, ctx=ctx)
         val = float(atr_series.iloc[-1])
         if np.isnan(val) or not np.isfinite(val):
             raise ValueError("ATR nan")
@@ -111,6 +111,8 @@ def protective_stop_long(
     entry: float,
     tick: float = 0.1,
     return_meta: bool = False,
+    ctx=None,
+    atr_buffer: float = 0.2,
 ) -> Tuple[float, Dict[str, Any]]:
     """Institutional protective stop for LONGs.
 
@@ -118,7 +120,7 @@ def protective_stop_long(
     - Take last swing low (structural reference).
     - Look for equal-lows (liquidity) below price.
     - Base reference = min(swing_low, liq_low) when liq exists, else swing_low.
-    - Add small ATR buffer below that reference.
+    - Add small ATR buffer (atr_buffer * ATR) below that reference.
     - Ensure stop < entry.
     - Round to tick.
     """
@@ -138,17 +140,17 @@ def protective_stop_long(
 
         entry_f = float(entry)
 
-        last_swing_low = _get_last_swing_low(df)
-        liq_low = _get_liquidity_low(df, entry_f)
+        last_swing_low = _get_last_swing_low(df, ctx)
+        liq_low = _get_liquidity_low(df, entry_f, ctx)
 
         if np.isnan(liq_low):
             base_ref = last_swing_low
         else:
             base_ref = min(last_swing_low, liq_low)
 
-        atr_val = _get_atr_value(df, length=14)
-        # buffer: 0.2 * ATR below the structural / liquidity level
-        sl_raw = base_ref - atr_val * 0.2
+        atr_val = _get_atr_value(df, length=14, ctx=ctx)
+        # buffer: atr_buffer (0.2 par défaut) * ATR below the structural / liquidity level
+        sl_raw = base_ref - atr_val * float(atr_buffer)
 
         # Guard rails: ensure SL is below entry
         if sl_raw >= entry_f:
@@ -189,6 +191,8 @@ def protective_stop_short(
     entry: float,
     tick: float = 0.1,
     return_meta: bool = False,
+    ctx=None,
+    atr_buffer: float = 0.2,
 ) -> Tuple[float, Dict[str, Any]]:
     """Institutional protective stop for SHORTs.
 
@@ -196,7 +200,7 @@ def protective_stop_short(
     - Take last swing high (structural reference).
     - Look for equal-highs (liquidity) above price.
     - Base reference = max(swing_high, liq_high) when liq exists, else swing_high.
-    - Add small ATR buffer above that reference.
+    - Add small ATR buffer (atr_buffer * ATR) above that reference.
     - Ensure stop > entry.
     - Round to tick.
     """
@@ -216,18 +220,18 @@ def protective_stop_short(
 
         entry_f = float(entry)
 
-        last_swing_high = _get_last_swing_high(df)
-        liq_high = _get_liquidity_high(df, entry_f)
+        last_swing_high = _get_last_swing_high(df, ctx)
+        liq_high = _get_liquidity_high(df, entry_f, ctx)
 
         if np.isnan(liq_high):
             base_ref = last_swing_high
         else:
             base_ref = max(last_swing_high, liq_high)
 
-        atr_val = _get_atr_value(df, length=14)
+        atr_val = _get_atr_value(df, length=14, ctx=ctx)
 
-        # buffer: 0.2 * ATR au-dessus du niveau structurel/liquidité
-        sl_raw = base_ref + atr_val * 0.2
+        # buffer: atr_buffer (0.2 par défaut) * ATR au-dessus du niveau structurel/liquidité
+        sl_raw = base_ref + atr_val * float(atr_buffer)
 
         # Guard rails: ensure SL is above entry
         if sl_raw <= entry_f:
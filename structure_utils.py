@@ -9,11 +9,55 @@ import numpy as np
 import pandas as pd
 
 
+def _ctx_ok(ctx, df) -> bool:
+    """True si le FeatureContext `ctx` porte bien sur ce DataFrame."""
+    return ctx is not None and ctx.covers(df)
+
+
 # =====================================================================
 # SWINGS (pivot highs / lows)
 # =====================================================================
 
-def find_swings(df: pd.DataFrame, left: int = 3, right: int = 3) -> Dict[str, List[Tuple[int, float]]]:
+def find_swing_indices(
+    df: pd.DataFrame,
+    left: int = 3,
+    right: int = 3,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized pivot detection, compact output.
+
+    Same rule as find_swings: a pivot high at i is where high[i] is the max
+    of [i-left, i+right] (ties included), a pivot low where low[i] is the min.
+    The rolling max / min is taken over all windows at once with a strided
+    view, so there is no Python loop over bars.
+
+    Returns:
+        (high_idx, low_idx) — int64 arrays of bar positions, ascending.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if df is None or len(df) < left + right + 3:
+        return empty, empty
+
+    h = df["high"].to_numpy(dtype=float)
+    l = df["low"].to_numpy(dtype=float)
+    width = left + right + 1
+    end = len(h) - right
+
+    win_max = np.lib.stride_tricks.sliding_window_view(h, width).max(axis=1)
+    win_min = np.lib.stride_tricks.sliding_window_view(l, width).min(axis=1)
+
+    # NaN in a window → comparison False, as in the scalar version
+    high_idx = np.flatnonzero(h[left:end] >= win_max) + left
+    low_idx = np.flatnonzero(l[left:end] <= win_min) + left
+    return high_idx, low_idx
+
+
+def find_swings(
+    df: pd.DataFrame,
+    left: int = 3,
+    right: int = 3,
+    ctx=None,
+) -> Dict[str, List[Tuple[int, float]]]:
     """
     Detect basic swing highs / lows (pivot highs / lows).
 
@@ -26,27 +70,19 @@ def find_swings(df: pd.DataFrame, left: int = 3, right: int = 3) -> Dict[str, Li
           "lows" : [(idx, price), ...],
         }
     """
-    highs: List[Tuple[int, float]] = []
-    lows: List[Tuple[int, float]] = []
+    if _ctx_ok(ctx, df):
+        return ctx.swings(left, right)
 
-    if df is None or len(df) < left + right + 3:
-        return {"highs": highs, "lows": lows}
+    high_idx, low_idx = find_swing_indices(df, left=left, right=right)
+    if high_idx.size == 0 and low_idx.size == 0:
+        return {"highs": [], "lows": []}
 
     h = df["high"].to_numpy(dtype=float)
     l = df["low"].to_numpy(dtype=float)
-
-    for i in range(left, len(df) - right):
-        window_h = h[i - left : i + right + 1]
-        window_l = l[i - left : i + right + 1]
-        hi = h[i]
-        lo = l[i]
-
-        if hi >= window_h.max():
-            highs.append((i, float(hi)))
-        if lo <= window_l.min():
-            lows.append((i, float(lo)))
-
-    return {"highs": highs, "lows": lows}
+    return {
+        "highs": list(zip(high_idx.tolist(), h[high_idx].tolist())),
+        "lows": list(zip(low_idx.tolist(), l[low_idx].tolist())),
+    }
 
 
 # =====================================================================
@@ -89,6 +125,7 @@ def detect_equal_levels(
     left: int = 3,
     right: int = 3,
     max_window: int = 200,
+    ctx=None,
 ) -> Dict[str, List[float]]:
     """
     Detect institutional liquidity pools (equal highs / equal lows) using swings.
@@ -102,6 +139,9 @@ def detect_equal_levels(
           "eq_lows" : [price1, price2, ...],
         }
     """
+    if _ctx_ok(ctx, df):
+        return ctx.equal_levels(left, right, max_window)
+
     if df is None or len(df) < left + right + 3:
         return {"eq_highs": [], "eq_lows": []}
 
@@ -152,7 +192,11 @@ def _trend_from_ema(close: pd.Series, fast: int = 20, slow: int = 50) -> str:
     c = close.astype(float)
     ema_fast = c.ewm(span=fast, adjust=False).mean()
     ema_slow = c.ewm(span=slow, adjust=False).mean()
+    return _trend_label(ema_fast, ema_slow)
+
 
+def _trend_label(ema_fast: pd.Series, ema_slow: pd.Series) -> str:
+    """LONG / SHORT / RANGE à partir des deux EMA déjà calculées."""
     ef = ema_fast.iloc[-5:]
     es = ema_slow.iloc[-5:]
     if len(ef) < 5 or len(es) < 5:
@@ -167,6 +211,13 @@ def _trend_from_ema(close: pd.Series, fast: int = 20, slow: int = 50) -> str:
     return "RANGE"
 
 
+def _trend(df: pd.DataFrame, ctx=None) -> str:
+    """_trend_from_ema(df["close"]), via le contexte si disponible."""
+    if _ctx_ok(ctx, df):
+        return ctx.trend()
+    return _trend_from_ema(df["close"])
+
+
 # =====================================================================
 # BOS / CHOCH : external vs internal
 # =====================================================================
@@ -249,7 +300,7 @@ def _classify_bos(
     return res
 
 
-def _detect_bos_choch_cos(df: pd.DataFrame) -> Dict[str, Any]:
+def _detect_bos_choch_cos(df: pd.DataFrame, ctx=None) -> Dict[str, Any]:
     """
     High-level BOS / CHOCH / COS classification.
 
@@ -271,12 +322,12 @@ def _detect_bos_choch_cos(df: pd.DataFrame) -> Dict[str, Any]:
     close = df["close"].astype(float)
     last_close = float(close.iloc[-1])
 
-    swings = find_swings(df)
+    swings = find_swings(df, ctx=ctx)
     bos_info = _classify_bos(swings, last_close)
     if not bos_info["bos"]:
         return bos_info
 
-    trend = _trend_from_ema(close)
+    trend = _trend(df, ctx)
     direction = bos_info["direction"]
 
     bos = True
@@ -305,7 +356,7 @@ def _detect_bos_choch_cos(df: pd.DataFrame) -> Dict[str, Any]:
 # HTF trend alignment (H4 vs H1)
 # =====================================================================
 
-def htf_trend_ok(df_htf: pd.DataFrame, bias: str) -> bool:
+def htf_trend_ok(df_htf: pd.DataFrame, bias: str, ctx=None) -> bool:
     """
     Ensures H4 trend does not contradict H1 bias.
 
@@ -318,7 +369,7 @@ def htf_trend_ok(df_htf: pd.DataFrame, bias: str) -> bool:
         return True
 
     bias = (bias or "").upper()
-    trend_htf = _trend_from_ema(df_htf["close"])
+    trend_htf = _trend(df_htf, ctx)
 
     if trend_htf == "LONG" and bias == "SHORT":
         return False
@@ -341,6 +392,7 @@ def bos_quality_details(
     df_liq: Optional[pd.DataFrame] = None,
     price: Optional[float] = None,
     tick: float = 0.1,
+    ctx=None,
 ) -> Dict[str, Any]:
     """
     Evaluate BOS quality using multiple institutional signals:
@@ -408,7 +460,11 @@ def bos_quality_details(
     if df_liq is None:
         df_liq = df
     try:
-        levels = detect_equal_levels(df_liq.tail(200))
+        if _ctx_ok(ctx, df_liq):
+            # detect_equal_levels se limite déjà aux 200 dernières barres
+            levels = detect_equal_levels(df_liq, ctx=ctx)
+        else:
+            levels = detect_equal_levels(df_liq.tail(200))
         eq_highs = levels.get("eq_highs", []) or []
         eq_lows = levels.get("eq_lows", []) or []
         ref_price = float(price) if price is not None else last_close
@@ -457,9 +513,12 @@ def bos_quality_details(
 # ORDER BLOCKS & FAIR VALUE GAPS (lightweight)
 # =====================================================================
 
-def _detect_order_blocks(df: pd.DataFrame, lookback: int = 80) -> Dict[str, Any]:
+def _detect_order_blocks(df: pd.DataFrame, lookback: int = 80, impulse_pct: float = 0.03) -> Dict[str, Any]:
     """Very lightweight last-impulse order block detection.
 
+    An impulse is a close-to-close move over the last ~5 bars larger than
+    `impulse_pct` (3% by default).
+
     - Bullish OB: last bearish candle before an impulsive move up.
     - Bearish OB: last bullish candle before an impulsive move down.
 
@@ -492,7 +551,7 @@ def _detect_order_blocks(df: pd.DataFrame, lookback: int = 80) -> Dict[str, Any]
 
     idx_offset = len(df) - len(sub)
 
-    if impulse_ret > 0.03:  # > 3% up move
+    if impulse_ret > impulse_pct:  # > 3% up move (default)
         # last bearish candle in the impulse window
         for i in range(len(sub) - N - 1, len(sub) - 1):
             if c[i] < o[i]:  # bearish
@@ -501,7 +560,7 @@ def _detect_order_blocks(df: pd.DataFrame, lookback: int = 80) -> Dict[str, Any]
                     "low": float(min(o[i], c[i])),
                     "high": float(max(o[i], c[i])),
                 }
-    elif impulse_ret < -0.03:  # > 3% down move
+    elif impulse_ret < -impulse_pct:  # > 3% down move (default)
         for i in range(len(sub) - N - 1, len(sub) - 1):
             if c[i] > o[i]:  # bullish
                 bearish_ob = {
@@ -563,7 +622,7 @@ def _detect_fvg(df: pd.DataFrame, lookback: int = 80) -> List[Dict[str, Any]]:
 # STRUCTURE ENGINE (H1)
 # =====================================================================
 
-def analyze_structure(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_structure(df: pd.DataFrame, ctx=None, ob_impulse_pct: float = 0.03) -> Dict[str, Any]:
     """
     Main structure analysis entrypoint for H1.
 
@@ -598,11 +657,11 @@ def analyze_structure(df: pd.DataFrame) -> Dict[str, Any]:
             "oi_series": None,
         }
 
-    trend = _trend_from_ema(df["close"])
-    swings = find_swings(df)
-    levels = detect_equal_levels(df)
-    bos_block = _detect_bos_choch_cos(df)
-    ob = _detect_order_blocks(df)
+    trend = _trend(df, ctx)
+    swings = find_swings(df, ctx=ctx)
+    levels = detect_equal_levels(df, ctx=ctx)
+    bos_block = _detect_bos_choch_cos(df, ctx=ctx)
+    ob = _detect_order_blocks(df, impulse_pct=ob_impulse_pct)
     fvg_zones = _detect_fvg(df)
 
     oi_series = df["oi"] if "oi" in df.columns else None
@@ -0,0 +1,151 @@
+# =====================================================================
+# symbol_map.py — Index de correspondance Bitget → Binance USDⓈ-M
+# =====================================================================
+# Construit une fois à partir des deux listes de contrats :
+#   1) alias explicites                   (BINANCE_SYMBOL_ALIASES)
+#                                         prioritaires ; multiplicateur
+#                                         déduit des préfixes des deux côtés
+#   2) correspondance exacte              BTCUSDT      → BTCUSDT
+#   3) règles de multiplicateur           PEPEUSDT     → 1000PEPEUSDT (x1000)
+#                                         1000SATSUSDT → SATSUSDT     (x0.001)
+# Les symboles sans contrepartie sont mis en cache négatif : l'analyse
+# institutionnelle les court-circuite avant tout appel HTTP.
+# =====================================================================
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from settings import BINANCE_SYMBOLS_TTL_S, BINANCE_SYMBOL_ALIASES
+
+QUOTE = "USDT"
+
+# préfixes de multiplicateur utilisés par les exchanges
+MULTIPLIER_PREFIXES: List[Tuple[str, float]] = [
+    ("1000000", 1_000_000.0),
+    ("100000", 100_000.0),
+    ("10000", 10_000.0),
+    ("1000", 1_000.0),
+    ("1M", 1_000_000.0),
+    ("", 1.0),
+]
+
+_PREFIX_RE = re.compile(r"^(1000000|100000|10000|1000|1M)(?=[A-Z])")
+
+
+def _parse_aliases(raw: Optional[str]) -> Dict[str, str]:
+    """"LUNAUSDT:LUNA2USDT,XBTUSDT:BTCUSDT" → dict."""
+    out: Dict[str, str] = {}
+    for part in (raw or "").split(","):
+        if ":" not in part:
+            continue
+        src, dst = part.split(":", 1)
+        if src.strip() and dst.strip():
+            out[src.strip().upper()] = dst.strip().upper()
+    return out
+
+
+def _split_multiplier(symbol: str) -> Tuple[str, float]:
+    """"1000PEPEUSDT" → ("PEPEUSDT", 1000.0)."""
+    m = _PREFIX_RE.match(symbol)
+    if not m:
+        return symbol, 1.0
+    prefix = m.group(1)
+    mult = dict(MULTIPLIER_PREFIXES)[prefix]
+    return symbol[len(prefix):], mult
+
+
+class SymbolMapIndex:
+    """
+    Bitget symbol → (Binance symbol, price multiplier) with a negative
+    cache for symbols that have no Binance counterpart.
+
+    multiplier = Binance units / Bitget units
+      (ex. PEPEUSDT → 1000PEPEUSDT : multiplier = 1000)
+    """
+
+    def __init__(self, ttl_s: float = BINANCE_SYMBOLS_TTL_S, aliases: Optional[Dict[str, str]] = None):
+        self.ttl_s = float(ttl_s)
+        self.aliases = dict(aliases if aliases is not None else _parse_aliases(BINANCE_SYMBOL_ALIASES))
+        self._binance: Set[str] = set()
+        self._mapped: Dict[str, Tuple[str, float]] = {}
+        self._unmapped: Dict[str, float] = {}
+        self.built_at = 0.0
+
+    # ---------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._binance)
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        if not self.ready:
+            # échec précédent : on réessaie au plus une fois par minute
+            return now - self.built_at >= min(self.ttl_s, 60.0)
+        return now - self.built_at >= self.ttl_s
+
+    def note_failure(self) -> None:
+        """La liste Binance n'a pas pu être chargée : on garde l'état courant."""
+        self.built_at = time.time()
+
+    def build(self, binance_symbols: Iterable[str], bitget_symbols: Iterable[str] = ()) -> None:
+        """(Re)construit l'index et pré-résout les symboles Bitget fournis."""
+        self._binance = {s.upper() for s in binance_symbols if s}
+        self._mapped.clear()
+        self._unmapped.clear()
+        self.built_at = time.time()
+        for sym in bitget_symbols:
+            self.resolve(sym)
+
+    # ---------------------------------------------------------------
+
+    def _match(self, symbol: str) -> Optional[Tuple[str, float]]:
+        target = self.aliases.get(symbol)
+        if target is not None and target in self._binance:
+            # ex. PEPEUSDT:1000PEPEUSDT → x1000 (mêmes préfixes que l'étape 3)
+            _, bitget_mult = _split_multiplier(symbol)
+            _, binance_mult = _split_multiplier(target)
+            return target, binance_mult / bitget_mult
+        if symbol in self._binance:
+            return symbol, 1.0
+
+        base, bitget_mult = _split_multiplier(symbol)
+        if not base.endswith(QUOTE):
+            return None
+        for prefix, binance_mult in MULTIPLIER_PREFIXES:
+            candidate = prefix + base
+            if candidate in self._binance:
+                return candidate, binance_mult / bitget_mult
+        return None
+
+    def resolve(self, symbol: str) -> Optional[Tuple[str, float]]:
+        """(binance_symbol, multiplier) ou None si pas de contrepartie."""
+        sym = (symbol or "").upper().replace("-", "")
+        hit = self._mapped.get(sym)
+        if hit is not None:
+            return hit
+        if sym in self._unmapped:
+            return None
+        if not self.ready:
+            # index pas encore construit : mapping naïf, sans cache négatif
+            return sym, 1.0
+
+        match = self._match(sym)
+        if match is None:
+            self._unmapped[sym] = time.time()
+            return None
+        self._mapped[sym] = match
+        return match
+
+    def is_unmapped(self, symbol: str) -> bool:
+        return (symbol or "").upper().replace("-", "") in self._unmapped
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "binance": len(self._binance),
+            "mapped": len(self._mapped),
+            "unmapped": len(self._unmapped),
+        }
@@ -0,0 +1,121 @@
+# =====================================================================
+# test_binance_stream.py — BinanceMarketStream contre le /stream local
+# =====================================================================
+# mock_exchange.MockExchange(ws_frames=...) rejoue des trames combinées
+# enregistrées, horodatées au présent (décalage mock._ws_shift).
+# =====================================================================
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from binance_stream import BinanceMarketStream, LiquidationWindow
+from mock_exchange import MockConfig, MockExchange
+from settings import LIQ_STREAM_MAX_EVENTS, LIQ_STREAM_WINDOW_S
+
+T0 = 1_700_000_000_000
+
+
+def _liq(ts: int, symbol: str, side: str, qty: float) -> Dict[str, Any]:
+    return {
+        "stream": "!forceOrder@arr",
+        "data": {"e": "forceOrder", "E": ts, "o": {"s": symbol, "S": side, "q": str(qty), "T": ts}},
+    }
+
+
+def _marks(ts: int, rows: List[Tuple[str, float, float]]) -> Dict[str, Any]:
+    return {
+        "stream": "!markPrice@arr@1s",
+        "data": [
+            {"e": "markPriceUpdate", "E": ts, "s": s, "p": str(p), "i": str(p), "r": str(r), "T": T0 + 3_600_000}
+            for s, p, r in rows
+        ],
+    }
+
+
+async def _consume(frames: List[Dict[str, Any]], cfg: MockConfig, **stream_kw):
+    """Lance run() contre le mock jusqu'à consommation de toutes les trames."""
+    mock = MockExchange(cfg, symbols=["BTCUSDT", "ETHUSDT"], ws_frames=frames)
+    base = await mock.start()
+    stream = BinanceMarketStream(url=base, warmup_s=0, **stream_kw)
+    stream.start()
+    try:
+        for _ in range(200):
+            if stream.messages >= len(frames):
+                break
+            await asyncio.sleep(0.05)
+        return mock, stream, stream.is_warm()
+    finally:
+        await stream.stop()
+        await mock.stop()
+
+
+def test_sums_and_marks_with_out_of_order_frame():
+    frames = [
+        _marks(T0, [("BTCUSDT", 100.0, 0.0001), ("ETHUSDT", 10.0, -0.0002)]),
+        _liq(T0 + 10, "BTCUSDT", "BUY", 1.5),
+        _liq(T0 + 30, "BTCUSDT", "SELL", 2.0),
+        _liq(T0 + 20, "BTCUSDT", "BUY", 0.5),      # hors ordre
+        _liq(T0 + 40, "ETHUSDT", "SELL", 4.0),
+        _marks(T0 + 1_000, [("BTCUSDT", 101.0, 0.0003)]),
+    ]
+    mock, stream, _ = asyncio.run(_consume(frames, MockConfig(ws_interval_ms=10)))
+    now = (T0 + mock._ws_shift + 2_000) / 1000
+
+    assert stream.messages == len(frames)
+    assert stream.liquidations("BTCUSDT", now=now) == {"liq_buy": 2.0, "liq_sell": 2.0, "liq_count": 3.0}
+    assert stream.liquidations("ETHUSDT", now=now) == {"liq_buy": 0.0, "liq_sell": 4.0, "liq_count": 1.0}
+
+    btc = stream.mark("BTCUSDT", now=now)
+    eth = stream.mark("ETHUSDT", now=now)
+    assert btc["mark_price"] == 101.0 and btc["funding_rate"] == 0.0003
+    assert eth["mark_price"] == 10.0 and eth["funding_rate"] == -0.0002
+
+    # la trame hors ordre est bornée à la queue : elle sort avec elle
+    events = [ts for ts, _, _ in stream._liq["BTCUSDT"].events]
+    assert events == sorted(events)
+    later = (T0 + mock._ws_shift + 30 + stream.window_ms + 1) / 1000
+    assert stream.liquidations("BTCUSDT", now=later) == {"liq_buy": 0.0, "liq_sell": 0.0, "liq_count": 0.0}
+
+
+def test_window_bounds():
+    default = BinanceMarketStream()
+    assert default.window_ms == int(LIQ_STREAM_WINDOW_S * 1000)
+    assert default.max_events == int(LIQ_STREAM_MAX_EVENTS)
+
+    frames = [_liq(T0 + k * 1_000, "BTCUSDT", "BUY", float(k + 1)) for k in range(5)]
+    frames.append(_liq(T0 + 4_000 - 61_000, "BTCUSDT", "SELL", 100.0))   # plus vieille que la fenêtre
+    mock, stream, _ = asyncio.run(_consume(frames, MockConfig(ws_interval_ms=10), window_s=60, max_events=3))
+    shift = mock._ws_shift
+
+    # plafond max_events : seules les 3 dernières (3 + 4 + 5)
+    now = (T0 + shift + 5_000) / 1000
+    assert stream.liquidations("BTCUSDT", now=now) == {"liq_buy": 12.0, "liq_sell": 0.0, "liq_count": 3.0}
+
+    # fenêtre de 60 s : ne reste que l'événement de T0 + 4 s
+    now = (T0 + shift + 3_500 + 60_000) / 1000
+    assert stream.liquidations("BTCUSDT", now=now) == {"liq_buy": 5.0, "liq_sell": 0.0, "liq_count": 1.0}
+
+
+def test_reconnect_after_drop():
+    frames = [_liq(T0 + k, "BTCUSDT", "BUY" if k % 2 else "SELL", 1.0) for k in range(5)]
+    mock, stream, warm = asyncio.run(_consume(frames, MockConfig(ws_interval_ms=10, ws_drop_after=2)))
+
+    # 2 + 2 + 1 trames : deux coupures, trois connexions, rien de perdu
+    assert mock.ws_connections == 3
+    assert mock.injected["ws_drop"] == 2
+    assert stream.messages == len(frames)
+    assert warm
+    now = (T0 + mock._ws_shift + 10) / 1000
+    assert stream.liquidations("BTCUSDT", now=now) == {"liq_buy": 2.0, "liq_sell": 3.0, "liq_count": 5.0}
+
+
+def test_window_out_of_order_evicts_with_tail():
+    win = LiquidationWindow(window_ms=1_000, max_events=10)
+    win.add(5_000, True, 1.0)
+    win.add(4_500, False, 2.0)
+    win.add(5_200, True, 3.0)
+    assert [ts for ts, _, _ in win.events] == [5_000, 5_000, 5_200]
+    win.evict(6_100)
+    assert (win.buy, win.sell, len(win.events)) == (3.0, 0.0, 1)
@@ -35,7 +35,7 @@ def _round_to_tick(price: float, tick: float) -> float:
 # Helper — ATR local (en utilisant true_atr pour cohérence)
 # ============================================================
 
-def _atr(df: pd.DataFrame, length: int = 14) -> float:
+def _atr(df: pd.DataFrame, length: int = 14, ctx=None) -> float:
     """
     Renvoie la dernière valeur d'ATR (true range lissé).
     Fallback range simple si les données sont insuffisantes.
@@ -43,7 +43,7 @@ def _atr(df: pd.DataFrame, length: int = 14) -> float:
     try:
         if df is None or len(df) < length + 3:
             raise ValueError("not enough data")
-        atr_series = true_atr(df, length=length)
+        atr_series = true_atr(df, length=length, ctx=ctx)
         val = float(atr_series.iloc[-1])
         if not np.isfinite(val) or val <= 0:
             raise ValueError("atr nan")
@@ -66,6 +66,7 @@ def compute_tp1(
     bias: str,
     df: pd.DataFrame,
     tick: float = 0.1,
+    ctx=None,
 ) -> Tuple[float, float]:
     """
     Calcule un TP1 institutionnel basé sur:
@@ -99,7 +100,7 @@ def compute_tp1(
     # -----------------------------
     # 1) Volatilité & risk%
     # -----------------------------
-    atr_val = _atr(df)
+    atr_val = _atr(df, ctx=ctx)
     atrp = atr_val / max(abs(entry), 1e-8)   # ATR en % relatif
     riskp = risk / max(abs(entry), 1e-8)    # taille du stop en %
 
@@ -183,6 +184,7 @@ def compute_tp2(
     df: pd.DataFrame,
     tick: float = 0.1,
     rr1: Optional[float] = None,
+    ctx=None,
 ) -> float:
     """
     Calcule un TP2 de type "runner" basé sur le même risk que TP1.
@@ -205,7 +207,7 @@ def compute_tp2(
         return float(entry)
 
     # Volatilité pour calibrer jusqu'où on peut viser
-    atr_val = _atr(df)
+    atr_val = _atr(df, ctx=ctx)
     atrp = atr_val / max(abs(entry), 1e-8)
 
     # Base RR2 à partir de rr1 ou de 2.0